@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+效能評估：compare-data.py 讀取 Git 舊版本的方式
+1. 每個檔案各執行一次 git show HEAD:data/<file>（原本的做法）
+2. 一次 git ls-tree + 單一 git cat-file --batch 行程（GitBlobReader）
+
+在暫存的 Git 倉庫中產生 200／1000／5000 個每日檔案後量測
+
+使用: python3 bench-compare-git.py [檔案數 ...]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from git_blobs import GitBlobReader, git_blob_id
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+def make_repo(repo, count):
+    """產生 count 個每日檔案並提交，再修改其中 5%"""
+    data_dir = os.path.join(repo, 'data')
+    os.makedirs(data_dir)
+    names = []
+    for i in range(count):
+        name = f'flight-data-{i:05d}.json'
+        flights = [{"time": f"{h:02d}:{m:02d}", "gate": f"D{11 + (h + m) % 8}", "flight_code": f"BR{i}{h}{m}",
+                    "status": "出發DEPARTED"} for h in range(5, 23) for m in (5, 35)]
+        with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as f:
+            json.dump({"date": str(i), "flights": flights}, f, ensure_ascii=False, indent=2)
+        names.append(name)
+    git(repo, 'init', '-q')
+    git(repo, 'add', 'data')
+    git(repo, 'commit', '-q', '-m', 'data')
+
+    for name in names[::20]:
+        path = os.path.join(data_dir, name)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['flights'][0]['status'] = '延誤DELAY'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return names
+
+
+def read_with_git_show(repo, names):
+    old = {}
+    for name in names:
+        result = subprocess.run(['git', 'show', f'HEAD:data/{name}'], capture_output=True,
+                                text=True, cwd=repo, timeout=10)
+        if result.returncode == 0:
+            old[name] = json.loads(result.stdout)
+    return old
+
+
+def read_with_batch(repo, names):
+    old = {}
+    with GitBlobReader(repo) as reader:
+        for name in names:
+            raw = reader.read(f'data/{name}')
+            if raw is not None:
+                old[name] = json.loads(raw)
+    return old
+
+
+def read_changed_with_batch(repo, names):
+    """只讀取 blob id 與工作目錄不同的檔案（compare-data.py 實際的流程）"""
+    old = {}
+    with GitBlobReader(repo) as reader:
+        for name in names:
+            with open(os.path.join(repo, 'data', name), 'rb') as f:
+                blob_id = reader.blob_id(f'data/{name}')
+                if blob_id == git_blob_id(f.read()):
+                    continue
+            old[name] = json.loads(reader.read_blob(blob_id))
+    return old
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f'   {label:<36} {elapsed * 1000:>9.1f} ms  ({len(result)} 個檔案)')
+    return result, elapsed
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [200, 1000, 5000]
+    for count in counts:
+        print(f'📊 {count} 個檔案')
+        with tempfile.TemporaryDirectory() as repo:
+            names = make_repo(repo, count)
+            expected, show_time = timed('git show（每個檔案一個行程）', read_with_git_show, repo, names)
+            result, batch_time = timed('ls-tree + cat-file --batch', read_with_batch, repo, names)
+            changed, _ = timed('ls-tree + cat-file --batch（只讀變更）', read_changed_with_batch, repo, names)
+            ok = result == expected and set(changed) == set(names[::20])
+            print(f'   結果一致: {"✅" if ok else "❌"}  加速: {show_time / batch_time:.1f}x\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+效能評估：compare-data.py --jobs N
+在暫存的 Git 倉庫中產生 365／1000 個每日檔案並全部修改（最壞情況：每個檔案都要解析並逐班比較），
+量測不同行程數的執行時間，並確認輸出與逐一比較相同
+
+使用: python3 bench-compare-jobs.py [檔案數 ...]
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+def make_repo(repo, count):
+    """複製腳本、產生 count 個每日檔案並提交，再修改每個檔案的一個航班"""
+    shutil.copytree(SCRIPT_DIR, os.path.join(repo, 'scripts', 'scraper'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    data_dir = os.path.join(repo, 'data')
+    os.makedirs(data_dir)
+    names = []
+    for i in range(count):
+        name = f'flight-data-{i:05d}.json'
+        flights = [{"time": f"{h:02d}:{m:02d}", "gate": f"D{11 + (h + m) % 8}", "flight_code": f"BR{i}{h}{m}",
+                    "airline_code": "BR", "destination": "東京成田NRT", "status": "出發DEPARTED",
+                    "codeshare_flights": [{"airline_code": "NH", "flight_code": f"NH{h}{m}"}]}
+                   for h in range(5, 23) for m in range(0, 60, 5)]
+        data = {"date": str(i), "flights": flights,
+                "summary": {"total_flights": len(flights), "before_17:00": 0, "after_17:00": 0}}
+        with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        names.append(name)
+    git(repo, 'init', '-q')
+    git(repo, 'add', 'data')
+    git(repo, 'commit', '-q', '-m', 'data')
+
+    for name in names:
+        path = os.path.join(data_dir, name)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['flights'][0]['status'] = '延誤DELAY'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def run(repo, jobs):
+    output_path = os.path.join(repo, f'github-output-{jobs}')
+    env = dict(os.environ, GITHUB_OUTPUT=output_path)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, 'scripts/scraper/compare-data.py', '--jobs', str(jobs)],
+                          cwd=repo, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    with open(output_path, 'r') as f:
+        return (proc.returncode, proc.stdout, f.read()), elapsed
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [365, 1000]
+    cpus = os.cpu_count() or 1
+    job_counts = sorted({1, 2, 4, cpus})
+    print(f'CPU 數: {cpus}\n')
+    for count in counts:
+        print(f'📊 {count} 個檔案（全部有變化）')
+        with tempfile.TemporaryDirectory() as repo:
+            make_repo(repo, count)
+            baseline, base_time = run(repo, 1)
+            for jobs in job_counts:
+                result, elapsed = (baseline, base_time) if jobs == 1 else run(repo, jobs)
+                ok = result == baseline
+                print(f'   --jobs {jobs:<3} {elapsed * 1000:>9.1f} ms  加速: {base_time / elapsed:.2f}x  '
+                      f'輸出一致: {"✅" if ok else "❌"}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+效能評估：Firestore 寫入吞吐量（份文件/秒）
+1. 每個日期一次 set（原本的做法，相當於 batch_size=1、max_in_flight=1）
+2. FirestoreBatchWriter 的批次與並行設定
+
+文件使用 data/ 中實際的每日 JSON；預設寫入 InMemoryFirestore 並模擬每次提交的往返延遲，
+設定 FIRESTORE_EMULATOR_HOST 時改為寫入本機 Firestore emulator
+
+使用: python3 bench-firestore-writer.py [每次提交的模擬延遲毫秒數]
+"""
+
+import glob
+import json
+import os
+import sys
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from firestore_writer import FirestoreBatchWriter, InMemoryFirestore
+
+CONFIGS = [
+    ('每個日期一次 set', 1, 1),
+    ('批次 50、並行 1', 50, 1),
+    ('批次 20、並行 4', 20, 4),
+    ('批次 50、並行 4', 50, 4),
+]
+
+
+def load_docs():
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data')
+    docs = []
+    for path in sorted(glob.glob(os.path.join(data_dir, 'flight-data-*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        docs.append((data.get('date') or os.path.basename(path)[12:22], data))
+    return docs
+
+
+def make_client(latency):
+    if os.environ.get('FIRESTORE_EMULATOR_HOST'):
+        from google.cloud import firestore
+        return firestore.Client(project='brainless-schedule')
+    return InMemoryFirestore(commit_latency=latency)
+
+
+def main():
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    docs = load_docs()
+    target = (f'Firestore emulator ({os.environ["FIRESTORE_EMULATOR_HOST"]})'
+              if os.environ.get('FIRESTORE_EMULATOR_HOST') else f'InMemoryFirestore（每次提交 {latency_ms:.0f} ms）')
+    print(f'📊 {len(docs)} 份文件 → {target}\n')
+
+    baseline = None
+    for label, batch_size, in_flight in CONFIGS:
+        client = make_client(latency_ms / 1000)
+        writer = FirestoreBatchWriter(client, 'benchFlightData', batch_size=batch_size, max_in_flight=in_flight)
+        result = writer.write_all(docs)
+        baseline = baseline or result.docs_per_sec
+        ok = not result.failed and len(result.written) == len(docs)
+        print(f'   {label:<18} {result.batches:>4} 批次 {result.elapsed * 1000:>9.1f} ms '
+              f'{result.docs_per_sec:>9.1f} 份/秒  加速: {result.docs_per_sec / baseline:.1f}x  '
+              f'{"✅" if ok else "❌"}')
+
+
+if __name__ == '__main__':
+    main()
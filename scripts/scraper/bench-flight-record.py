@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+記憶體效能評估：字典 vs FlightRecord
+以 tracemalloc 量測全機場文字檔（所有登機門的離境航班）解析後保留的記憶體
+
+使用: python3 bench-flight-record.py [行數]
+"""
+
+import os
+import re
+import sys
+import tracemalloc
+from datetime import datetime
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 fetch-from-txt-api.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("fetch_from_txt_api", os.path.join(os.path.dirname(__file__), "fetch-from-txt-api.py"))
+fetch_from_txt_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_from_txt_api)
+
+from synthetic_feed import ALL_GATES, build_feed_lines
+
+
+def parse_as_dicts(lines, target_gates):
+    """原本的字典表示法（每筆 17 個 key，含 datetime 與重複的日期時間字串）"""
+    flights = []
+    for line_num, line in enumerate(lines, 1):
+        parts = [p.strip() for p in line.strip().split(',')]
+        if len(parts) < 13 or parts[5] not in target_gates or parts[1] != 'D':
+            continue
+        date_match = re.match(r'(\d{4})/(\d{1,2})/(\d{1,2})', parts[6])
+        time_match = re.match(r'(\d{1,2}):(\d{2}):(\d{2})', parts[7])
+        year, month, day = map(int, date_match.groups())
+        hour, minute, _ = map(int, time_match.groups())
+        flights.append({
+            'terminal': parts[0],
+            'type': 'departure',
+            'airline_code': parts[2],
+            'airline_name': parts[3],
+            'flight_code': f"{parts[2]}{parts[4]}",
+            'flight_number': parts[4],
+            'gate': parts[5],
+            'scheduled_datetime': datetime(year, month, day, hour, minute),
+            'scheduled_date': parts[6],
+            'scheduled_time': parts[7],
+            'actual_date': parts[8],
+            'actual_time': parts[9],
+            'airport_code': parts[10],
+            'city': parts[11],
+            'status': parts[13],
+            'aircraft': parts[14],
+            'raw_line': line_num
+        })
+    return flights
+
+
+def parse_as_records(lines, target_gates):
+    """FlightRecord 表示法"""
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+    return list(scraper.iter_flight_data(lines, target_gates=target_gates))
+
+
+def measure(label, parse, lines, target_gates):
+    tracemalloc.start()
+    result = parse(lines, target_gates)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_row = retained / len(result) if result else 0
+    print(f'{label:<14} {len(result):>8} 筆  保留 {retained / 1024 / 1024:>7.2f} MiB  '
+          f'峰值 {peak / 1024 / 1024:>7.2f} MiB  每筆 {per_row:>6.0f} B')
+    return retained
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    target_gates = list(ALL_GATES)
+
+    print(f'📊 產生模擬全機場文字檔：{rows} 行（所有登機門）')
+    lines = build_feed_lines(rows, target_ratio=0.0, days=3)
+    print()
+
+    dict_bytes = measure('dict', parse_as_dicts, lines, target_gates)
+    record_bytes = measure('FlightRecord', parse_as_records, lines, target_gates)
+
+    print(f'\n✅ FlightRecord 保留記憶體為字典的 {record_bytes / dict_bytes:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+效能評估：FlightTable 欄式運算 vs 字典迴圈
+1. 全機場文字檔：篩選登機門、共掛班號分組、每日統計
+2. 一整年的每日 JSON 封存檔：載入後重新分組與統計
+
+使用: python3 bench-flight-table.py [文字檔行數] [封存天數]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 fetch-from-txt-api.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("fetch_from_txt_api", os.path.join(os.path.dirname(__file__), "fetch-from-txt-api.py"))
+fetch_from_txt_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_from_txt_api)
+
+# 原本以字典迴圈實作的 organize_by_date（fetch-from-txt-api.py 現在改用 FlightTable）
+spec = importlib.util.spec_from_file_location("test_flight_table", os.path.join(os.path.dirname(__file__), "test-flight-table.py"))
+test_flight_table = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(test_flight_table)
+
+import flight_table
+from flight_table import FlightTable
+from synthetic_feed import build_feed_lines
+
+TARGET_GATES = [f'D{i}' for i in range(11, 19)] + [f'D{i}R' for i in range(11, 19)]
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f'   {label:<32} {elapsed * 1000:>9.1f} ms')
+    return result, elapsed
+
+
+def bench_feed(rows):
+    print(f'📊 全機場文字檔：{rows} 行（D11-D18 約 10%）')
+    lines = build_feed_lines(rows, target_ratio=0.1, days=3)
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+
+    records = list(scraper.iter_flight_data(lines))
+    expected, _ = timed('字典：organize_by_date',
+                        lambda: test_flight_table.reference_organize_by_date(records))
+    timed('FlightTable：organize_by_date', lambda: fetch_from_txt_api.organize_by_date(records))
+    table, _ = timed('FlightTable：建表（全部資料）', lambda: FlightTable.from_feed_lines(lines))
+    result, _ = timed('FlightTable：篩選 + 分組 + 統計', lambda: table.organize_by_date(gates=TARGET_GATES))
+    print(f'   結果一致: {"✅" if result == expected else "❌"}')
+
+
+def write_archive(directory, days):
+    """以模擬資料產生每日 JSON 封存檔"""
+    lines = build_feed_lines(days * 400, target_ratio=0.5, days=days)
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+    date_data = fetch_from_txt_api.organize_by_date(scraper.iter_flight_data(lines))
+    paths = []
+    for date_key, data in date_data.items():
+        path = os.path.join(directory, f'flight-data-{date_key}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'date': date_key, 'flights': data['flights'], 'summary': data['summary']},
+                      f, ensure_ascii=False, indent=2)
+        paths.append(path)
+    return sorted(paths)
+
+
+def summarize_with_dicts(paths):
+    """字典迴圈版本：逐檔載入並以 Python 迴圈統計"""
+    summaries = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        before = sum(1 for flight in data['flights'] if flight['time'] < '17:00')
+        summaries[data['date']] = {
+            'total_flights': len(data['flights']),
+            'before_17:00': before,
+            'after_17:00': len(data['flights']) - before,
+        }
+    return summaries
+
+
+def bench_archive(days):
+    print(f'\n📊 每日 JSON 封存：{days} 天')
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_archive(tmp, days)
+        rows = sum(len(json.load(open(p, encoding='utf-8'))['flights']) for p in paths)
+        print(f'   檔案數: {len(paths)}，航班條目: {rows}')
+
+        expected, _ = timed('字典：載入 + 每日統計', lambda: summarize_with_dicts(paths))
+        table, load_time = timed('FlightTable：載入', lambda: FlightTable.from_date_files(paths))
+
+        def regroup():
+            leaders, _ = table.group_codeshares(table.select(types=['departure']))
+            return table.daily_summary(leaders)
+
+        result, group_time = timed('FlightTable：重新分組 + 每日統計', regroup)
+        print(f'   結果一致: {"✅" if result == expected else "❌"}')
+        print(f'   一年封存總計: {load_time + group_time:.2f} 秒')
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    print(f'NumPy: {"已安裝（向量化）" if flight_table.np is not None else "未安裝（純 Python 迴圈）"}\n')
+    bench_feed(rows)
+    bench_archive(days)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+效能評估：網頁爬蟲的 HTML 解析（每秒解析的航班列數）
+1. html.parser：解析整個頁面（原本的做法，作為基準）
+2. lxml：BeautifulSoup + lxml 解析整個頁面
+3. strainer：BeautifulSoup 只為航班表格建立樹（SoupStrainer）
+4. fast：直接以 lxml 解析，預先編譯的 XPath 取出表格與儲存格
+
+頁面預設為 synthetic_pages 產生的模擬頁面；也可以指定另存的實際頁面：
+    python3 bench-html-parse.py --yuann yuann.html --official flight_depart.html
+    python3 bench-html-parse.py --rows 600 --save fixtures/   # 另存模擬頁面
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_scraper import TaoyuanAirportFlightScraper
+from html_parse import ENGINES, HAS_LXML, TREE_BUILDER
+from synthetic_pages import build_official_page, build_yuann_page
+from taoyuan_airport_official_scraper import TaoyuanAirportOfficialScraper
+
+ENGINE_LABELS = {
+    'strainer': f'strainer ({TREE_BUILDER})',
+    'fast': 'fast (lxml + XPath)' if HAS_LXML else f'fast → strainer ({TREE_BUILDER})',
+}
+
+
+def parse_yuann(engine):
+    return TaoyuanAirportFlightScraper(delay=0, parser=engine).parse_tables
+
+
+def parse_official(engine):
+    scraper = TaoyuanAirportOfficialScraper(delay=0, parser=engine)
+    return lambda html: (scraper.parse_flight_table(html, 'departure'),)
+
+
+def row_count(result):
+    return sum(len(table.get('data', [])) for table in result)
+
+
+def bench(label, pages, make_parser, repeat):
+    print(f'📊 {label}：{len(pages)} 個頁面，共 {sum(len(p) for p in pages) / 1024:.0f} KB')
+    expected = baseline = None
+    for engine in ENGINES:
+        parse = make_parser(engine)
+        results = [parse(html) for html in pages]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                parse(html)
+        elapsed = (time.perf_counter() - start) / repeat
+        rows = sum(row_count(r) for r in results)
+        expected = expected if expected is not None else results
+        baseline = baseline or elapsed
+        same = '✅' if results == expected else '❌'
+        name = ENGINE_LABELS.get(engine, engine)
+        print(f'   {name:<22} {elapsed * 1000:>8.1f} ms  {rows / elapsed:>10.0f} 列/秒  '
+              f'{baseline / elapsed:>5.1f}x  結果一致: {same}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML 解析效能評估')
+    parser.add_argument('--rows', type=int, default=300, help='模擬頁面的航班列數')
+    parser.add_argument('--repeat', type=int, default=5, help='重複次數')
+    parser.add_argument('--yuann', action='append', default=[], help='另存的 yuann.tw 頁面')
+    parser.add_argument('--official', action='append', default=[], help='另存的官網出發航班頁面')
+    parser.add_argument('--save', help='將模擬頁面另存到此目錄')
+    args = parser.parse_args()
+
+    def load(paths):
+        pages = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+        return pages
+
+    yuann = load(args.yuann) or [build_yuann_page(args.rows, seed=seed) for seed in range(3)]
+    official = load(args.official) or [build_official_page('departure', args.rows, seed=seed) for seed in range(3)]
+
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+        for name, pages in (('yuann', yuann), ('official', official)):
+            for i, html in enumerate(pages):
+                with open(os.path.join(args.save, f'{name}-{i}.html'), 'w', encoding='utf-8') as f:
+                    f.write(html)
+        print(f'💾 已另存到 {args.save}\n')
+
+    bench('yuann.tw（TaoyuanAirportFlightScraper）', yuann, parse_yuann, args.repeat)
+    print()
+    bench('官網（TaoyuanAirportOfficialScraper）', official, parse_official, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
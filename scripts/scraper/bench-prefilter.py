@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+效能評估：文字檔解析的預先篩選
+全機場文字檔中超過 90% 的行是抵達航班或非目標登機門；
+比較「每行完整切割後再以 list 判斷登機門」與「先檢查類型與登機門欄位再切割」的每秒行數
+
+使用: python3 bench-prefilter.py [行數]
+"""
+
+import os
+import sys
+import time
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 fetch-from-txt-api.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("fetch_from_txt_api", os.path.join(os.path.dirname(__file__), "fetch-from-txt-api.py"))
+fetch_from_txt_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_from_txt_api)
+
+from synthetic_feed import build_feed_lines
+
+TARGET_GATES = [f'D{i}' for i in range(11, 19)] + [f'D{i}R' for i in range(11, 19)]
+
+
+def parse_without_prefilter(lines, target_gates):
+    """原本的流程：每行都完整切割、strip，再以 list 判斷登機門與類型"""
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+    kept = []
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 13:
+            continue
+        if parts[5] not in target_gates or parts[1] != 'D':
+            continue
+        kept.append((line_num, line))
+    # 保留下來的行交給目前的解析器產生相同格式的結果
+    records = []
+    for line_num, line in kept:
+        for record in scraper.iter_flight_data([line], target_gates=target_gates):
+            records.append(record._replace(raw_line=line_num))
+    return records
+
+
+def parse_with_prefilter(lines, target_gates):
+    """目前的流程：iter_flight_data（frozenset + 原始字串預先篩選）"""
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+    return list(scraper.iter_flight_data(lines, target_gates=target_gates))
+
+
+def measure(label, parse, lines, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(lines, TARGET_GATES)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'   {label:<20} {best * 1000:>9.1f} ms  {len(lines) / best:>12,.0f} 行/秒  ({len(result)} 筆)')
+    return result, best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    lines = build_feed_lines(rows, target_ratio=0.05, days=3)
+    relevant = sum(1 for line in lines
+                   if line.split(',')[1] == 'D' and line.split(',')[5] in TARGET_GATES)
+    print(f'📊 全機場文字檔：{rows} 行，其中 {rows - relevant} 行（{1 - relevant / rows:.1%}）為不相關的行\n')
+
+    before, before_time = measure('完整切割後篩選', parse_without_prefilter, lines)
+    after, after_time = measure('預先篩選', parse_with_prefilter, lines)
+
+    print(f'\n   結果一致: {"✅" if before == after else "❌"}')
+    print(f'   加速: {before_time / after_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,35 +7,22 @@
 import json
 import os
 import sys
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_record import normalize_flight_record
+from flight_store import INDEX_FILE, comparison_hash, load_index
+from git_blobs import GitBlobReader, git_blob_id
+from sealed_days import SealedDays
 
 def normalize_flight(flight: Dict) -> Dict:
     """
     標準化航班資料，移除會影響比較的欄位（如 updated_at）
     只保留核心資料欄位，確保比較的準確性
     """
-    # 處理 codeshare_flights，確保順序一致（按 flight_code 排序）
-    codeshare_flights = flight.get("codeshare_flights", [])
-    if isinstance(codeshare_flights, list):
-        # 排序共掛班號，確保順序不影響比較
-        codeshare_flights_sorted = sorted(
-            codeshare_flights,
-            key=lambda x: x.get("flight_code", "") if isinstance(x, dict) else str(x)
-        )
-    else:
-        codeshare_flights_sorted = []
-    
-    return {
-        "time": str(flight.get("time", "")).strip(),
-        "gate": str(flight.get("gate", "")).strip(),
-        "flight_code": str(flight.get("flight_code", "")).strip(),
-        "airline_name": str(flight.get("airline_name", "")).strip(),
-        "airline_code": str(flight.get("airline_code", "")).strip(),
-        "destination": str(flight.get("destination", "")).strip(),
-        "status": str(flight.get("status", "")).strip(),
-        "aircraft": str(flight.get("aircraft", flight.get("aircraft_type", ""))).strip(),  # 支援兩種欄位名稱
-        "codeshare_flights": codeshare_flights_sorted  # 包含共掛班號資訊
-    }
+    return normalize_flight_record(flight).to_dict()
 
 def compare_flights(old_flights: List[Dict], new_flights: List[Dict]) -> Tuple[bool, Dict]:
     """
@@ -56,7 +43,7 @@ def compare_flights(old_flights: List[Dict], new_flights: List[Dict]) -> Tuple[b
             if key in old_normalized:
                 print(f"⚠️  警告: 發現重複的 time+gate 組合: {key}，使用第一個條目")
             else:
-                old_normalized[key] = normalize_flight(f)
+                old_normalized[key] = normalize_flight_record(f)
         except Exception as e:
             print(f"⚠️  處理舊航班資料時出錯: {e}")
             continue
@@ -70,7 +57,7 @@ def compare_flights(old_flights: List[Dict], new_flights: List[Dict]) -> Tuple[b
             if key in new_normalized:
                 print(f"⚠️  警告: 發現重複的 time+gate 組合: {key}，使用第一個條目")
             else:
-                new_normalized[key] = normalize_flight(f)
+                new_normalized[key] = normalize_flight_record(f)
         except Exception as e:
             print(f"⚠️  處理新航班資料時出錯: {e}")
             continue
@@ -104,9 +91,13 @@ def compare_flights(old_flights: List[Dict], new_flights: List[Dict]) -> Tuple[b
         "removed": len(removed),
         "modified": len(modified),
         "details": {
-            "added": added[:5],  # 只保留前5個作為示例
-            "removed": removed[:5],
-            "modified": modified[:5]
+            # 只保留前5個作為示例（轉回字典格式）
+            "added": [f.to_dict() for f in added[:5]],
+            "removed": [f.to_dict() for f in removed[:5]],
+            "modified": [
+                {"old": m["old"].to_dict(), "new": m["new"].to_dict()}
+                for m in modified[:5]
+            ]
         }
     }
     
@@ -168,11 +159,271 @@ def compare_data_files(old_file: str, new_file: str) -> Tuple[bool, Dict]:
     
     return has_changes, changes_info
 
+def index_by_file(index_dates: Dict) -> Dict[str, Dict]:
+    """index.json 的 dates（以日期為 key）轉為以檔名為 key"""
+    return {
+        entry['file']: entry
+        for entry in index_dates.values()
+        if isinstance(entry, dict) and entry.get('file')
+    }
+
+def load_index_blob(reader: GitBlobReader) -> Dict[str, Dict]:
+    """讀取 Git 中舊版本的 data/index.json（沒有或無法解析時回傳空字典）"""
+    try:
+        raw = reader.read(f'data/{INDEX_FILE}')
+        dates = json.loads(raw.decode('utf-8')).get('dates') if raw else None
+        return index_by_file(dates) if isinstance(dates, dict) else {}
+    except Exception:
+        return {}
+
+def indexed_compare_hash(index_files: Dict[str, Dict], json_file: str, blob_id: Optional[str]) -> Optional[str]:
+    """
+    從索引取得檔案的比較雜湊；只有索引記錄的 blob id 與實際檔案相同時才採用
+    （檔案在索引更新後又被修改時回傳 None，改為重新計算）
+    """
+    entry = index_files.get(json_file)
+    if blob_id and entry and entry.get('blob') == blob_id:
+        return entry.get('compare_hash')
+    return None
+
+def compare_file(task: Tuple) -> Tuple[str, Optional[bool], Dict, List[str]]:
+    """
+    比較單一檔案的新舊版本（只依賴參數，可以在子行程中執行）
+
+    Args:
+        task: (檔名, 新內容（bytes，或已解析的 dict）, Git 中的舊內容或 None,
+               舊版本的比較雜湊或 None, 新版本的比較雜湊或 None)
+
+    Returns:
+        (檔名, 是否有變化（無法讀取新文件時為 None）, 變化詳情, 依序要輸出的訊息)
+    """
+    json_file, new_raw, old_raw, old_hash, new_hash = task
+    messages = []
+
+    # 解析新文件（剛生成的）
+    try:
+        new_data = new_raw if isinstance(new_raw, dict) else json.loads(new_raw.decode('utf-8'))
+    except Exception as e:
+        messages.append(f"⚠️  無法讀取 {json_file}: {e}")
+        return json_file, None, {}, messages
+
+    has_changes = False
+    changes_info = {}
+
+    try:
+        # 比較雜湊相同即沒有實質變化，不需要逐班比較
+        if old_hash is not None:
+            if new_hash is None:
+                new_hash = comparison_hash(new_data)
+            if old_hash == new_hash:
+                messages.append(f"⏭️  {json_file}: 無變化")
+                return json_file, False, changes_info, messages
+
+        if old_raw is not None and old_raw.strip():
+            # 成功獲取舊版本，進行比較
+            try:
+                old_data = json.loads(old_raw.decode('utf-8'))
+                if old_hash is None and comparison_hash(old_data) == (new_hash or comparison_hash(new_data)):
+                    messages.append(f"⏭️  {json_file}: 無變化")
+                    return json_file, False, changes_info, messages
+                has_changes, changes_info = compare_data_files_content(old_data, new_data)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                messages.append(f"⚠️  {json_file}: Git 中的舊版本格式錯誤: {e}")
+                has_changes = True  # 格式錯誤，視為有變化
+                changes_info = {"reason": "Git 中的舊版本格式錯誤"}
+        elif new_raw:
+            # Git 中沒有舊版本，可能是新文件
+            # 如果有航班資料，視為新文件（需要部署）
+            if new_data.get("flights") and len(new_data.get("flights", [])) > 0:
+                messages.append(f"✅ {json_file}: Git 中沒有舊版本，但文件有實際內容，視為新文件（需要部署）")
+                has_changes = True
+                changes_info = {"reason": "Git 中沒有舊版本，但文件有實際內容，視為新文件"}
+            else:
+                messages.append(f"ℹ️  {json_file}: Git 中沒有舊版本，但文件為空，視為無變化")
+                has_changes = False
+                changes_info = {"reason": "Git 中沒有舊版本，但文件為空，視為無變化"}
+        else:
+            messages.append(f"ℹ️  {json_file}: Git 中沒有舊版本，且文件不存在或為空，視為無變化")
+            has_changes = False
+            changes_info = {"reason": "Git 中沒有舊版本，且文件不存在或為空，視為無變化"}
+    except Exception as e:
+        # 無法比較，視為無變化（避免不必要的部署）
+        messages.append(f"ℹ️  {json_file}: 無法從 Git 獲取舊版本: {e}，視為無變化（避免不必要的部署）")
+        has_changes = False
+        changes_info = {"reason": "無法從 Git 獲取舊版本，無法比較，視為無變化"}
+
+    if has_changes:
+        messages.append(f"✅ {json_file}: 有變化")
+        if "flight_changes" in changes_info:
+            fc = changes_info["flight_changes"]
+            messages.append(f"   - 新增: {fc.get('added', 0)} 班")
+            messages.append(f"   - 移除: {fc.get('removed', 0)} 班")
+            messages.append(f"   - 修改: {fc.get('modified', 0)} 班")
+        if "summary_changed" in changes_info and changes_info["summary_changed"]:
+            messages.append(f"   - 摘要資訊有變化")
+    else:
+        messages.append(f"⏭️  {json_file}: 無變化")
+    return json_file, has_changes, changes_info, messages
+
+def prepare_compare(reader: GitBlobReader, data_dir: str, json_file: str,
+                    old_index: Dict[str, Dict], new_index: Dict[str, Dict], document: Optional[Dict] = None):
+    """
+    在主行程中完成不需要解析 JSON 的檢查（blob id、索引雜湊），並讀取 Git 中的舊版本
+
+    Args:
+        document: 已在記憶體中的新內容（flights.py pipeline 使用）；
+                  此時新版本的 blob id 取自 new_index，不讀取 data/ 中的檔案
+
+    Returns:
+        (結果, 工作)：能直接判定時結果為 compare_file 格式的 tuple、工作為 None；
+        否則結果為 None、工作為要交給 compare_file 的參數
+    """
+    import subprocess
+
+    if document is not None:
+        new_raw = document
+    else:
+        file_path = os.path.join(data_dir, json_file)
+        try:
+            with open(file_path, 'rb') as f:
+                new_raw = f.read()
+        except Exception as e:
+            return (json_file, None, {}, [f"⚠️  無法讀取 {json_file}: {e}"]), None
+
+    try:
+        # 內容與 Git 中的版本完全相同（blob id 一致），不需要讀取舊版本
+        if document is not None:
+            new_blob_id = (new_index.get(json_file) or {}).get('blob')
+        else:
+            new_blob_id = git_blob_id(new_raw)
+        old_blob_id = reader.blob_id(f'data/{json_file}')
+        if old_blob_id is not None and old_blob_id == new_blob_id:
+            return (json_file, False, {}, [f"⏭️  {json_file}: 無變化"]), None
+
+        # 新舊兩版的比較雜湊都記錄在索引中且相同，不需要解析檔案
+        old_hash = indexed_compare_hash(old_index, json_file, old_blob_id)
+        new_hash = indexed_compare_hash(new_index, json_file, new_blob_id)
+        if old_hash is not None and old_hash == new_hash:
+            return (json_file, False, {}, [f"⏭️  {json_file}: 無變化"]), None
+
+        # 嘗試從 Git 獲取舊版本
+        old_raw = reader.read_blob(old_blob_id) if old_blob_id else None
+    except subprocess.TimeoutExpired:
+        return (json_file, False, {"reason": "從 Git 獲取舊版本超時，視為無變化"},
+                [f"⚠️  {json_file}: 從 Git 獲取舊版本超時，視為無變化（避免不必要的部署）"]), None
+    except Exception as e:
+        # 如果無法從 Git 獲取，無法比較，視為無變化（避免不必要的部署）
+        return (json_file, False, {"reason": "無法從 Git 獲取舊版本，無法比較，視為無變化"},
+                [f"ℹ️  {json_file}: 無法從 Git 獲取舊版本: {e}，視為無變化（避免不必要的部署）"]), None
+
+    return None, (json_file, new_raw, old_raw, old_hash, new_hash)
+
+def iter_compare_results(json_files: List[str], reader: GitBlobReader, data_dir: str,
+                         old_index: Dict[str, Dict], new_index: Dict[str, Dict], jobs: int = 1):
+    """
+    依檔名順序逐一產生比較結果
+
+    jobs > 1 時，需要解析與逐班比較的檔案交給行程池平行處理，
+    結果仍依檔名順序串流輸出；進行中的工作數量有上限，避免一次讀入所有檔案
+    """
+    from collections import deque
+
+    if jobs <= 1:
+        for json_file in sorted(json_files):
+            result, task = prepare_compare(reader, data_dir, json_file, old_index, new_index)
+            yield result if task is None else compare_file(task)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = None  # 真的有需要比較的檔案時才啟動行程池
+    pending = deque()
+    try:
+        for json_file in sorted(json_files):
+            result, task = prepare_compare(reader, data_dir, json_file, old_index, new_index)
+            if task is not None:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=jobs)
+                result = executor.submit(compare_file, task)
+            pending.append(result)
+            while len(pending) > jobs * 4:
+                item = pending.popleft()
+                yield item if isinstance(item, tuple) else item.result()
+        while pending:
+            item = pending.popleft()
+            yield item if isinstance(item, tuple) else item.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def compare_documents(repo_root: str, documents: Dict[str, Dict], new_index: Dict[str, Dict]):
+    """
+    比較記憶體中的每日資料與 Git 中的版本（flights.py pipeline 使用，不重新讀取 data/ 中的檔案）
+
+    Args:
+        repo_root: Git 儲存庫根目錄
+        documents: {檔名: 每日 JSON 內容}
+        new_index: 本次更新後的索引（以檔名為 key，見 index_by_file）
+
+    Returns:
+        依檔名排序的 compare_file 格式結果列表
+    """
+    results = []
+    with GitBlobReader(repo_root) as reader:
+        old_index = load_index_blob(reader)
+        for json_file in sorted(documents):
+            result, task = prepare_compare(reader, os.path.join(repo_root, 'data'), json_file,
+                                           old_index, new_index, document=documents[json_file])
+            results.append(result if task is None else compare_file(task))
+    return results
+
+def report_results(results) -> Tuple[int, List[Dict]]:
+    """
+    依序輸出比較訊息
+
+    Returns:
+        (有變化的文件數, 變化的文件與詳情列表)
+    """
+    total_changes = 0
+    changed_files = []
+    for json_file, has_changes, changes_info, messages in results:
+        for message in messages:
+            print(message)
+        if has_changes:
+            total_changes += 1
+            changed_files.append({
+                "file": json_file,
+                "changes": changes_info
+            })
+    return total_changes, changed_files
+
+def write_compare_output(total_changes: int):
+    """輸出比較結果（用於 GitHub Actions）"""
+    output_file = os.environ.get('GITHUB_OUTPUT', '/dev/stdout')
+    
+    if total_changes > 0:
+        print(f"\n📊 總計: {total_changes} 個文件有變化")
+        with open(output_file, 'a') as f:
+            f.write(f"has_changes=true\n")
+            f.write(f"changed_count={total_changes}\n")
+    else:
+        print("\n✅ 所有文件都沒有實質變化")
+        with open(output_file, 'a') as f:
+            f.write(f"has_changes=false\n")
+            f.write(f"changed_count=0\n")
+
 def main():
     """
     主函數：比較所有日期的資料文件
     """
-    import subprocess
+    import argparse
+
+    parser = argparse.ArgumentParser(description='比較新舊航班資料，檢測是否有實質變化')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='平行比較的行程數（預設 1，逐一比較；0 表示使用所有 CPU）')
+    parser.add_argument('--force', action='store_true', help='連同已封存的日期一起比較')
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
     # 獲取資料目錄
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -195,111 +446,29 @@ def main():
             f.write(f"changed_count=0\n")
         sys.exit(1)
     
-    # 比較每個文件
-    total_changes = 0
-    changed_files = []
+    # 已封存的日期不會再變動，不需要比較
+    if not args.force:
+        json_files, sealed_files = SealedDays.for_data_dir(data_dir).split_files(json_files)
+        if sealed_files:
+            print(f"🔒 略過 {len(sealed_files)} 個已封存的日期（--force 可強制比較）")
     
-    for json_file in sorted(json_files):
-        file_path = os.path.join(data_dir, json_file)
-        
-        # 讀取新文件（剛生成的）
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                new_data = json.load(f)
-        except Exception as e:
-            print(f"⚠️  無法讀取 {json_file}: {e}")
-            continue
-        
-        # 檢查是否有實質變化（與 Git 中的版本比較）
-        has_changes = False
-        changes_info = {}
-        
-        try:
-            # 嘗試從 Git 獲取舊版本
-            result = subprocess.run(
-                ['git', 'show', f'HEAD:data/{json_file}'],
-                capture_output=True,
-                text=True,
-                cwd=repo_root,
-                timeout=10
-            )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                # 成功獲取舊版本，進行比較
-                try:
-                    old_data = json.loads(result.stdout)
-                    has_changes, changes_info = compare_data_files_content(old_data, new_data)
-                except json.JSONDecodeError as e:
-                    print(f"⚠️  {json_file}: Git 中的舊版本格式錯誤: {e}")
-                    has_changes = True  # 格式錯誤，視為有變化
-                    changes_info = {"reason": "Git 中的舊版本格式錯誤"}
-            else:
-                # Git 中沒有舊版本，可能是新文件
-                # 檢查文件是否真的存在且不為空
-                if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                    # 檢查文件是否有實際內容（不只是空結構）
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            test_data = json.load(f)
-                            # 如果有航班資料，視為新文件（需要部署）
-                            if test_data.get("flights") and len(test_data.get("flights", [])) > 0:
-                                print(f"✅ {json_file}: Git 中沒有舊版本，但文件有實際內容，視為新文件（需要部署）")
-                                has_changes = True
-                                changes_info = {"reason": "Git 中沒有舊版本，但文件有實際內容，視為新文件"}
-                            else:
-                                print(f"ℹ️  {json_file}: Git 中沒有舊版本，但文件為空，視為無變化")
-                                has_changes = False
-                                changes_info = {"reason": "Git 中沒有舊版本，但文件為空，視為無變化"}
-                    except Exception as e:
-                        print(f"⚠️  {json_file}: 無法讀取文件內容: {e}，視為無變化")
-                        has_changes = False
-                        changes_info = {"reason": f"無法讀取文件內容: {e}，視為無變化"}
-                else:
-                    print(f"ℹ️  {json_file}: Git 中沒有舊版本，且文件不存在或為空，視為無變化")
-                    has_changes = False
-                    changes_info = {"reason": "Git 中沒有舊版本，且文件不存在或為空，視為無變化"}
-        except subprocess.TimeoutExpired:
-            print(f"⚠️  {json_file}: 從 Git 獲取舊版本超時，視為無變化（避免不必要的部署）")
-            has_changes = False
-            changes_info = {"reason": "從 Git 獲取舊版本超時，視為無變化"}
-        except Exception as e:
-            # 如果無法從 Git 獲取，無法比較，視為無變化（避免不必要的部署）
-            print(f"ℹ️  {json_file}: 無法從 Git 獲取舊版本: {e}，視為無變化（避免不必要的部署）")
-            has_changes = False
-            changes_info = {"reason": "無法從 Git 獲取舊版本，無法比較，視為無變化"}
-        
-        if has_changes:
-            total_changes += 1
-            changed_files.append({
-                "file": json_file,
-                "changes": changes_info
-            })
-            print(f"✅ {json_file}: 有變化")
-            if "flight_changes" in changes_info:
-                fc = changes_info["flight_changes"]
-                print(f"   - 新增: {fc.get('added', 0)} 班")
-                print(f"   - 移除: {fc.get('removed', 0)} 班")
-                print(f"   - 修改: {fc.get('modified', 0)} 班")
-            if "summary_changed" in changes_info and changes_info["summary_changed"]:
-                print(f"   - 摘要資訊有變化")
-        else:
-            print(f"⏭️  {json_file}: 無變化")
+    # 所有舊版本透過同一個 git cat-file --batch 行程讀取
+    reader = GitBlobReader(repo_root)
     
-    # 輸出結果（用於 GitHub Actions）
-    output_file = os.environ.get('GITHUB_OUTPUT', '/dev/stdout')
+    # 新舊兩版的 index.json 記錄了各檔案的比較雜湊（compare_hash）
+    new_index = index_by_file(load_index(data_dir)['dates'])
+    old_index = load_index_blob(reader)
     
-    if total_changes > 0:
-        print(f"\n📊 總計: {total_changes} 個文件有變化")
-        with open(output_file, 'a') as f:
-            f.write(f"has_changes=true\n")
-            f.write(f"changed_count={total_changes}\n")
-        sys.exit(0)  # 有變化，應該觸發部署
-    else:
-        print("\n✅ 所有文件都沒有實質變化")
-        with open(output_file, 'a') as f:
-            f.write(f"has_changes=false\n")
-            f.write(f"changed_count=0\n")
-        sys.exit(1)  # 無變化，不觸發部署
+    try:
+        # 比較每個文件
+        total_changes, changed_files = report_results(iter_compare_results(
+            json_files, reader, data_dir, old_index, new_index, jobs))
+    finally:
+        reader.close()
+    
+    write_compare_output(total_changes)
+    # 有變化（0）應該觸發部署；無變化（1）不觸發部署
+    sys.exit(0 if total_changes > 0 else 1)
 
 def compare_data_files_content(old_data: Dict, new_data: Dict) -> Tuple[bool, Dict]:
     """
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+原始資料來源快取
+記錄每個來源最後一次成功處理時的 ETag、Last-Modified 與內容雜湊，
+讓下一次執行可以送出條件式請求，並在內容未變時直接跳過後續流程
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+
+def content_digest(raw: bytes) -> str:
+    """計算原始內容的 SHA-256 雜湊"""
+    return hashlib.sha256(raw).hexdigest()
+
+
+class FeedCache:
+    """原始資料來源快取（以 URL 為 key 儲存於 JSON 狀態檔）"""
+
+    def __init__(self, path: str):
+        """
+        初始化快取
+
+        Args:
+            path: 狀態檔路徑（如 data/.feed-cache.json）
+        """
+        self.path = path
+        self.entries = self._load()
+        self._pending = {}
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, url: str) -> Dict:
+        """取得指定來源的快取記錄（不存在時返回空字典）"""
+        return self.entries.get(url, {})
+
+    def conditional_headers(self, url: str) -> Dict:
+        """
+        建立條件式請求標頭
+
+        Args:
+            url: 資料來源 URL
+
+        Returns:
+            包含 If-None-Match / If-Modified-Since 的標頭字典
+        """
+        entry = self.get(url)
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        """內容雜湊是否與上次成功處理時相同"""
+        return bool(digest) and self.get(url).get('sha256') == digest
+
+    def stage(self, url: str, etag: Optional[str], last_modified: Optional[str], digest: str, **extra):
+        """
+        暫存本次下載的資訊，等整個流程成功後再以 commit() 寫入
+
+        Args:
+            url: 資料來源 URL
+            etag: 回應的 ETag 標頭
+            last_modified: 回應的 Last-Modified 標頭
+            digest: 內容雜湊
+            **extra: 其他要一併記錄的欄位（如 encoding）
+        """
+        entry = dict(self.get(url))
+        entry.update({
+            'etag': etag,
+            'last_modified': last_modified,
+            'sha256': digest,
+        })
+        entry.update(extra)
+        self._pending[url] = entry
+
+    def commit(self):
+        """將暫存的記錄寫入狀態檔（原子性替換）"""
+        if not self._pending:
+            return
+        self.entries.update(self._pending)
+        self._pending = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
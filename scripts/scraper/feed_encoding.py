@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+文字檔編碼判斷
+直接檢查原始位元組（BOM、UTF-8 合法性、Big5 前導／後隨位元組範圍），
+只需掃描一次樣本即可決定編碼，之後每一行只解碼一次
+"""
+
+import codecs
+from typing import List, Optional
+
+# 判斷編碼時取樣的位元組數
+DETECT_SAMPLE_SIZE = 64 * 1024
+
+# Big5 樣本中允許的不合法雙位元組比例（容忍少量亂碼）
+BIG5_MAX_INVALID_RATIO = 0.01
+
+# 樣本中完全沒有非 ASCII 字元、也沒有記憶的編碼時使用（官方檔案為 Big5）
+DEFAULT_ENCODING = 'big5'
+
+
+def is_valid_utf8(sample: bytes) -> bool:
+    """樣本是否為合法 UTF-8（允許結尾被截斷的多位元組字元）"""
+    try:
+        codecs.getincrementaldecoder('utf-8')('strict').decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def is_valid_big5(sample: bytes) -> bool:
+    """
+    樣本是否符合 Big5 結構：前導位元組 0x81-0xFE，後隨位元組 0x40-0x7E 或 0xA1-0xFE
+
+    Args:
+        sample: 原始位元組
+
+    Returns:
+        不合法雙位元組比例低於 BIG5_MAX_INVALID_RATIO 時返回 True
+    """
+    pairs = 0
+    invalid = 0
+    i = 0
+    end = len(sample)
+    while i < end:
+        byte = sample[i]
+        if byte < 0x80:
+            i += 1
+            continue
+        if i + 1 >= end:
+            # 結尾被截斷的雙位元組字元
+            break
+        trail = sample[i + 1]
+        pairs += 1
+        if not (0x81 <= byte <= 0xFE and (0x40 <= trail <= 0x7E or 0xA1 <= trail <= 0xFE)):
+            invalid += 1
+            i += 1
+            continue
+        i += 2
+    return pairs > 0 and invalid <= pairs * BIG5_MAX_INVALID_RATIO
+
+
+def detect_encoding(sample: bytes, preferred: Optional[str] = None) -> str:
+    """
+    從原始位元組判斷編碼
+
+    Args:
+        sample: 文字檔開頭的位元組（建議至少 DETECT_SAMPLE_SIZE）
+        preferred: 上次成功使用的編碼；若樣本仍符合則直接沿用
+
+    Returns:
+        編碼名稱
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    sample = sample[:DETECT_SAMPLE_SIZE]
+    if sample.isascii():
+        return preferred or DEFAULT_ENCODING
+
+    validators = {'utf-8': is_valid_utf8, 'big5': is_valid_big5}
+    if preferred in validators and validators[preferred](sample):
+        return preferred
+    # UTF-8 的結構最嚴格（Big5 內容幾乎不可能剛好是合法 UTF-8），所以先檢查
+    for encoding, is_valid in validators.items():
+        if is_valid(sample):
+            return encoding
+    return 'latin1'
+
+
+def decode_line(raw: bytes, encoding: str, line_num: int,
+                decode_errors: Optional[List[int]] = None) -> str:
+    """
+    解碼單一行；失敗時以替代字元解碼並記錄行號
+
+    Args:
+        raw: 該行的原始位元組
+        encoding: 編碼名稱
+        line_num: 行號（從 1 開始）
+        decode_errors: 若提供，解碼失敗的行號會加入此列表
+
+    Returns:
+        解碼後的文字
+    """
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        if decode_errors is not None:
+            decode_errors.append(line_num)
+        return raw.decode(encoding, errors='replace')
+
+
+def decode_feed(raw: bytes, encoding: str, decode_errors: Optional[List[int]] = None) -> str:
+    """
+    解碼整份文字檔；正常情況只解碼一次，失敗時才逐行解碼以找出有問題的行
+
+    Args:
+        raw: 原始位元組
+        encoding: 編碼名稱
+        decode_errors: 若提供，解碼失敗的行號會加入此列表
+
+    Returns:
+        解碼後的文字
+    """
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        return '\n'.join(
+            decode_line(line, encoding, line_num, decode_errors)
+            for line_num, line in enumerate(raw.split(b'\n'), 1)
+        )
@@ -30,7 +30,7 @@ def main():
     print(f'📡 將獲取 {len(gates)} 個登機門: {", ".join(gates)}')
     print()
     
-    all_data = scraper.get_all_gates(gates)
+    all_data = scraper.sweep_gates(gates)
     
     # 建立 data 目錄
     data_dir = os.path.join(current_dir, '../../data')
@@ -19,6 +19,7 @@ sys.path.insert(0, current_dir)
 
 try:
     from flight_scraper import TaoyuanAirportFlightScraper
+    from flight_time import format_cache_stats, parse_display_time
 except ImportError as e:
     print("❌ 無法匯入模組，請先安裝依賴：")
     print("   pip3 install requests beautifulsoup4 lxml")
@@ -28,44 +29,11 @@ except ImportError as e:
 def parse_time(time_str):
     """
     解析時間字串，例如 "2/1 17:10" 或 "2/1 17:45(實際抵達: 17:45)"
-    返回 datetime 物件（使用當前年份）
+    返回 datetime 物件（使用當前年份，結果有快取）
     """
-    try:
-        # 處理格式如 "2/1 17:10" 或 "2/1 17:45(實際抵達: 17:45)"
-        time_str = time_str.strip()
-        
-        # 如果有括號，提取括號前的時間
-        if '(' in time_str:
-            time_str = time_str.split('(')[0].strip()
-        
-        parts = time_str.split()
-        if len(parts) < 2:
-            return None
-        
-        date_part = parts[0]  # "2/1" 或 "1/31"
-        time_part = parts[1]   # "17:10"
-        
-        # 解析日期
-        date_parts = date_part.split('/')
-        if len(date_parts) != 2:
-            return None
-        
-        month = int(date_parts[0])
-        day = int(date_parts[1])
-        
-        # 解析時間
-        time_parts = time_part.split(':')
-        if len(time_parts) != 2:
-            return None
-        
-        hour = int(time_parts[0])
-        minute = int(time_parts[1])
-        
-        # 使用當前年份
-        current_year = datetime.now().year
-        return datetime(current_year, month, day, hour, minute)
-    except Exception as e:
+    if not isinstance(time_str, str):
         return None
+    return parse_display_time(time_str, datetime.now().year)
 
 def format_time_for_display(dt):
     """格式化時間為顯示格式"""
@@ -199,11 +167,12 @@ def main():
     print(f'📡 正在獲取 {len(gates)} 個登機門: {", ".join(gates)}')
     print()
     
-    all_data = scraper.get_all_gates(gates)
+    all_data = scraper.sweep_gates(gates)
     
     # 按日期組織資料
     print('📅 正在按日期組織資料...')
     date_data = organize_by_date(all_data)
+    print(f'   時間解析快取命中率: {format_cache_stats() or "無"}')
     
     # 建立 data 目錄
     data_dir = os.path.join(current_dir, '../../data')
@@ -5,14 +5,27 @@
 """
 
 import requests
-import json
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
-import re
-from collections import defaultdict
+from typing import List, Dict, Optional, Iterable, Iterator
+import hashlib
+import sys
 import urllib3
 
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_cache import FeedCache, content_digest
+from feed_encoding import DETECT_SAMPLE_SIZE, decode_feed, decode_line, detect_encoding
+from flight_record import FlightRecord, make_flight_record
+from flight_rollup import refresh_rollups
+from flight_table import FlightTable
+from flight_store import (INDEX_FILE, WriteReport, canonical_hash, date_file_name, load_json, refresh_index,
+                          write_json_if_changed)
+from flight_time import format_cache_stats, parse_feed_datetime
+from sealed_days import SealedDays
+from stress_slots import stress_slots_for_day
+
 # 禁用 SSL 警告（如果使用 verify=False）
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -27,48 +40,137 @@ class TaoyuanAirportTxtAPIScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
             'Accept': 'text/plain,*/*',
+            'Accept-Encoding': 'gzip, deflate',
         })
+        # 最近一次串流下載的內容雜湊（讀取完畢後才有值）
+        self.last_digest = None
+        # 最近一次下載的 Last-Modified 標頭（資料來源發布這一版的時間）
+        self.last_modified = None
+        # 最近一次下載使用的編碼與解碼失敗的行號
+        self.last_encoding = None
+        self.last_decode_errors = []
     
-    def fetch_flight_data(self, verify_ssl: bool = True) -> str:
+    def fetch_flight_data(self, verify_ssl: bool = True, cache: Optional[FeedCache] = None) -> Optional[str]:
         """
         獲取原始文字檔資料
         
         Args:
             verify_ssl: 是否驗證 SSL 證書（預設為 True）
+            cache: 原始資料快取；提供時會送出條件式請求（If-None-Match / If-Modified-Since）
         
         Returns:
-            文字檔內容
+            文字檔內容；若提供 cache 且伺服器回應 304 或內容雜湊與上次相同，返回 None
         """
+        headers = cache.conditional_headers(self.TXT_API_URL) if cache else {}
+        
         try:
             # 如果 SSL 驗證失敗，嘗試禁用驗證
-            response = self.session.get(self.TXT_API_URL, timeout=10, verify=verify_ssl)
+            response = self.session.get(self.TXT_API_URL, headers=headers, timeout=10, verify=verify_ssl)
+            
+            # 304：伺服器確認檔案未重新發布
+            if cache and response.status_code == 304:
+                return None
             response.raise_for_status()
+            self.last_modified = response.headers.get('Last-Modified')
             
-            # 嘗試多種編碼方式
-            encodings = ['big5', 'utf-8', 'utf-8-sig', 'latin1']
-            for encoding in encodings:
-                try:
-                    response.encoding = encoding
-                    text = response.text
-                    # 檢查是否成功解碼（簡單檢查：是否包含預期的關鍵字）
-                    if 'D11' in text or 'D12' in text or 'A,' in text or 'D,' in text:
-                        return text
-                except:
-                    continue
+            raw = response.content
+            preferred = cache.get(self.TXT_API_URL).get('encoding') if cache else None
+            encoding = detect_encoding(raw[:DETECT_SAMPLE_SIZE], preferred=preferred)
+            self.last_encoding = encoding
+            
+            if cache:
+                digest = content_digest(raw)
+                if cache.is_unchanged(self.TXT_API_URL, digest):
+                    return None
+                # 暫存快取資訊（含本次判斷出的編碼），待整個流程成功後才寫入
+                cache.stage(
+                    self.TXT_API_URL,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    digest,
+                    encoding=encoding
+                )
             
-            # 如果所有編碼都失敗，返回原始文字
-            return response.text
+            # 依位元組判斷出的編碼只解碼一次
+            self.last_decode_errors = []
+            return decode_feed(raw, encoding, self.last_decode_errors)
         except requests.exceptions.SSLError:
             # SSL 驗證失敗，嘗試禁用驗證
             if verify_ssl:
                 print('   ⚠️  SSL 證書驗證失敗，嘗試禁用驗證...')
-                return self.fetch_flight_data(verify_ssl=False)
+                return self.fetch_flight_data(verify_ssl=False, cache=cache)
             else:
                 raise Exception("無法獲取資料：SSL 證書驗證失敗")
         except Exception as e:
             raise Exception(f"無法獲取資料: {str(e)}")
     
-    def parse_flight_data(self, text: str, target_gates: List[str] = None) -> List[Dict]:
+    def fetch_flight_stream(self, verify_ssl: bool = True, cache: Optional[FeedCache] = None) -> Optional[Iterator[str]]:
+        """
+        以串流方式獲取文字檔資料，逐塊下載、增量解碼並逐行產出
+        
+        Args:
+            verify_ssl: 是否驗證 SSL 證書（預設為 True）
+            cache: 原始資料快取；提供時會送出條件式請求，並在讀取完畢後暫存內容雜湊
+        
+        Returns:
+            文字行的迭代器；若提供 cache 且伺服器回應 304，返回 None
+            （內容雜湊需讀完才能得知，讀取完畢後可透過 self.last_digest 與快取比對）
+        """
+        headers = cache.conditional_headers(self.TXT_API_URL) if cache else {}
+        
+        try:
+            response = self.session.get(self.TXT_API_URL, headers=headers, timeout=10,
+                                        verify=verify_ssl, stream=True)
+        except requests.exceptions.SSLError:
+            if verify_ssl:
+                print('   ⚠️  SSL 證書驗證失敗，嘗試禁用驗證...')
+                return self.fetch_flight_stream(verify_ssl=False, cache=cache)
+            raise Exception("無法獲取資料：SSL 證書驗證失敗")
+        except Exception as e:
+            raise Exception(f"無法獲取資料: {str(e)}")
+        
+        if cache and response.status_code == 304:
+            response.close()
+            return None
+        try:
+            response.raise_for_status()
+        except Exception as e:
+            response.close()
+            raise Exception(f"無法獲取資料: {str(e)}")
+        
+        self.last_modified = response.headers.get('Last-Modified')
+        return self._iter_response_lines(response, cache)
+    
+    def _iter_response_lines(self, response, cache: Optional[FeedCache]) -> Iterator[str]:
+        """逐塊讀取回應內容，邊計算雜湊邊解碼成文字行"""
+        digest = hashlib.sha256()
+        self.last_digest = None
+        self.last_decode_errors = []
+        report = {'decode_errors': self.last_decode_errors}
+        preferred = cache.get(self.TXT_API_URL).get('encoding') if cache else None
+        
+        def chunks():
+            for chunk in response.iter_content(chunk_size=FEED_CHUNK_SIZE):
+                digest.update(chunk)
+                yield chunk
+        
+        try:
+            yield from iter_feed_lines(chunks(), preferred=preferred, report=report)
+        finally:
+            response.close()
+        
+        self.last_digest = digest.hexdigest()
+        self.last_encoding = report.get('encoding')
+        if cache and not cache.is_unchanged(self.TXT_API_URL, self.last_digest):
+            cache.stage(
+                self.TXT_API_URL,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                self.last_digest,
+                encoding=self.last_encoding
+            )
+    
+    def parse_flight_data(self, text: str, target_gates: List[str] = None) -> List[FlightRecord]:
         """
         解析文字檔資料
         
@@ -77,7 +179,23 @@ class TaoyuanAirportTxtAPIScraper:
             target_gates: 目標登機門列表（如 ['D11', 'D12', ...]），如果為 None 則獲取所有
         
         Returns:
-            解析後的航班資料列表
+            解析後的航班資料列表（FlightRecord）
+        """
+        return list(self.iter_flight_data(text.strip().split('\n'), target_gates=target_gates))
+    
+    def iter_flight_data(self, lines: Iterable[str], target_gates: List[str] = None,
+                         stats: Optional[Dict] = None) -> Iterator[FlightRecord]:
+        """
+        逐行解析文字檔資料（串流模式），每解析出一筆航班即 yield
+        
+        Args:
+            lines: 文字行的可迭代物件（可為 list，或 iter_feed_lines 產生的串流）
+            target_gates: 目標登機門列表（如 ['D11', 'D12', ...]），如果為 None 則獲取所有
+            stats: 若提供，會寫入 'lines'（讀取行數）、'flights'（產出筆數）統計，
+                   以及 'garbled'（airline_name／city_zh 含替代字元 U+FFFD 的行號列表）
+        
+        Yields:
+            解析後的航班資料（FlightRecord）
         """
         if target_gates is None:
             # 包含 D11-D18 以及 D11R-D18R
@@ -85,15 +203,26 @@ class TaoyuanAirportTxtAPIScraper:
             for i in range(11, 19):
                 target_gates.append(f'D{i}')      # D11, D12, ..., D18
                 target_gates.append(f'D{i}R')     # D11R, D12R, ..., D18R
+        gate_set = frozenset(target_gates)
         
-        flights = []
-        lines = text.strip().split('\n')
+        if stats is None:
+            stats = {}
+        stats.setdefault('lines', 0)
+        stats.setdefault('flights', 0)
+        stats.setdefault('garbled', [])
         
         for line_num, line in enumerate(lines, 1):
+            stats['lines'] = line_num
             line = line.strip()
             if not line:
                 continue
             
+            # 預先篩選：只切出前 7 個欄位檢查類型與登機門，
+            # 抵達航班與非目標登機門（全機場資料的絕大多數）不做完整切割
+            head = line.split(',', 6)
+            if len(head) < 7 or head[1].strip() != 'D' or head[5].strip() not in gate_set:
+                continue
+            
             # 解析 CSV 格式（使用逗號分隔）
             # 格式：航廈,類型,航空公司代碼,航空公司名稱,航班號,登機門,日期,時間,實際日期,實際時間,機場代碼,城市,狀態,機型,...
             parts = [p.strip() for p in line.split(',')]
@@ -103,7 +232,6 @@ class TaoyuanAirportTxtAPIScraper:
             
             try:
                 terminal = parts[0]  # 航廈（1或2）
-                flight_type = parts[1]  # A=抵達, D=出發
                 airline_code = parts[2]  # 航空公司代碼
                 airline_name = parts[3].strip()  # 航空公司名稱（可能有編碼問題）
                 flight_number = parts[4].strip()  # 航班號
@@ -121,235 +249,316 @@ class TaoyuanAirportTxtAPIScraper:
                 # 優先使用中文城市名稱，如果沒有則使用英文
                 city = city_zh if city_zh and not city_zh.startswith('') else city_en
                 
-                # 只處理目標登機門
-                if gate not in target_gates:
-                    continue
+                # 只處理目標登機門的離境（出發）航班（已在預先篩選確認）
                 
-                # 只處理離境（出發）航班，忽略抵達航班
-                if flight_type != 'D':
-                    continue
+                # 解碼失敗的字元會變成替代字元，記錄下來而不是靜默寫入
+                if '\ufffd' in airline_name or '\ufffd' in city_zh:
+                    stats['garbled'].append(line_num)
                 
                 # 建立航班代碼（航空公司代碼 + 航班號）
                 flight_code = f"{airline_code}{flight_number}".strip()
                 
-                # 解析日期時間
-                try:
-                    # 日期格式：2026/01/31，時間格式：00:05:00
-                    date_match = re.match(r'(\d{4})/(\d{1,2})/(\d{1,2})', scheduled_date)
-                    time_match = re.match(r'(\d{1,2}):(\d{2}):(\d{2})', scheduled_time)
-                    
-                    if date_match and time_match:
-                        year, month, day = map(int, date_match.groups())
-                        hour, minute, _ = map(int, time_match.groups())
-                        
-                        dt = datetime(year, month, day, hour, minute)
-                        
-                        flight_data = {
-                            'terminal': terminal,
-                            'type': 'departure',  # 只處理離境航班
-                            'airline_code': airline_code,
-                            'airline_name': airline_name,
-                            'flight_code': flight_code,
-                            'flight_number': flight_number,
-                            'gate': gate,
-                            'scheduled_datetime': dt,
-                            'scheduled_date': scheduled_date,
-                            'scheduled_time': scheduled_time,
-                            'actual_date': actual_date,
-                            'actual_time': actual_time,
-                            'airport_code': airport_code,
-                            'city': city,
-                            'status': status.strip(),
-                            'aircraft': aircraft.strip(),
-                            'raw_line': line_num
-                        }
-                        
-                        flights.append(flight_data)
-                except ValueError as e:
+                # 解析日期時間（日期格式：2026/01/31，時間格式：00:05:00；結果有快取）
+                parsed = parse_feed_datetime(scheduled_date, scheduled_time)
+                if parsed is None:
                     # 日期時間解析失敗，跳過這筆資料
                     continue
+                date_key, minute_of_day = parsed
+                
+                flight_data = make_flight_record(
+                    terminal=terminal,
+                    airline_code=airline_code,
+                    airline_name=airline_name,
+                    flight_code=flight_code,
+                    flight_number=flight_number,
+                    gate=gate,
+                    date_key=date_key,
+                    minute=minute_of_day,
+                    actual_date=actual_date,
+                    actual_time=actual_time,
+                    airport_code=airport_code,
+                    city=city,
+                    status=status.strip(),
+                    aircraft=aircraft.strip(),
+                    raw_line=line_num
+                )
+                
+                stats['flights'] += 1
+                yield flight_data
                     
             except Exception as e:
                 # 解析失敗，跳過這筆資料
                 continue
-        
-        return flights
 
 
-def format_time_for_display(dt: datetime) -> str:
-    """格式化時間為顯示格式"""
-    return dt.strftime('%H:%M')
+FEED_CHUNK_SIZE = 64 * 1024
+
+
+def iter_feed_lines(chunks: Iterable[bytes], encoding: Optional[str] = None,
+                    preferred: Optional[str] = None, report: Optional[Dict] = None) -> Iterator[str]:
+    """
+    將位元組區塊切成行後逐行解碼，記憶體用量只與單一區塊大小有關
+    （Big5 與 UTF-8 的多位元組字元都不含 0x0A，可以直接以位元組切行）
+    
+    Args:
+        chunks: 位元組區塊的可迭代物件（HTTP 回應或檔案）
+        encoding: 編碼名稱；None 時以第一個區塊的位元組判斷
+        preferred: 上次成功使用的編碼（判斷時優先沿用）
+        report: 若提供，會寫入 'encoding'（使用的編碼）與 'decode_errors'（解碼失敗的行號列表）
+    
+    Yields:
+        文字行（不含換行字元）
+    """
+    if report is None:
+        report = {}
+    decode_errors = report.setdefault('decode_errors', [])
+    report['encoding'] = encoding
+    pending = b''
+    line_num = 0
+    
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if encoding is None:
+            encoding = detect_encoding(chunk, preferred=preferred)
+            report['encoding'] = encoding
+        pending += chunk
+        raw_lines = pending.split(b'\n')
+        pending = raw_lines.pop()
+        for raw in raw_lines:
+            line_num += 1
+            yield decode_line(raw, encoding, line_num, decode_errors)
+    
+    if pending:
+        yield decode_line(pending, encoding, line_num + 1, decode_errors)
+
+
+def iter_file_chunks(path: str, chunk_size: int = FEED_CHUNK_SIZE) -> Iterator[bytes]:
+    """逐塊讀取本地文字檔"""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
 
 
-def organize_by_date(flights: List[Dict]) -> Dict:
+def organize_by_date(flights: Iterable[FlightRecord]) -> Dict:
     """
     按日期組織航班資料，並計算 17:00 前後的班次數量
     相同時間和登機門的航班視為同一班機（共掛班號），只計算一次
+    （以 FlightTable 欄式運算完成篩選、分組與統計，見 flight_table.py）
     
     Args:
-        flights: 航班資料列表
+        flights: 航班資料列表（或 iter_flight_data 產生的串流）
     
     Returns:
         按日期組織的資料字典
     """
-    date_data = defaultdict(lambda: {
-        "flights": [],
+    # 串流已只包含目標登機門的離境航班，不再篩選
+    return FlightTable.from_records(flights).organize_by_date(gates=None, types=None)
+
+
+def report_decode_problems(encoding: Optional[str], decode_errors: List[int], garbled: List[int]):
+    """輸出編碼判斷結果，以及無法解碼的行與含亂碼的目標航班"""
+    print(f'   - 編碼: {encoding}')
+    if decode_errors:
+        sample = ', '.join(str(n) for n in decode_errors[:10])
+        print(f'   ⚠️  {len(decode_errors)} 行無法以 {encoding} 解碼（行號: {sample}{" ..." if len(decode_errors) > 10 else ""}）')
+    if garbled:
+        sample = ', '.join(str(n) for n in garbled[:10])
+        print(f'   ⚠️  {len(garbled)} 筆目標航班的航空公司／城市名稱含亂碼（行號: {sample}{" ..." if len(garbled) > 10 else ""}）')
+
+
+def write_github_output(**values):
+    """寫入 GitHub Actions 輸出（本地執行時輸出到 stdout）"""
+    output_file = os.environ.get('GITHUB_OUTPUT', '/dev/stdout')
+    with open(output_file, 'a') as f:
+        for key, value in values.items():
+            f.write(f"{key}={value}\n")
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
+
+class FetchResult:
+    """fetch 階段的結果（flights.py pipeline 在同一個行程中直接交給後續階段，不必重新讀檔）"""
+
+    def __init__(self, feed_changed: bool = True):
+        self.feed_changed = feed_changed
+        self.flight_count = 0
+        # {日期 key: 每日 JSON 內容}，包含內容未變更而沒有重寫的日期
+        self.outputs: Dict[str, Dict] = {}
+        self.write_report = WriteReport()
+        self.index: Optional[Dict] = None
+
+
+def build_date_output(date_key: str, formatted_data: Dict) -> Dict:
+    """組成單日 JSON 內容（不含 stress_slots）"""
+    # 建立格式化顯示
+    formatted_display = []
+    for flight in formatted_data["flights"]:
+        gate = flight.get("gate", "")
+        flight_code = flight.get("flight_code", "")
+        airline_name = flight.get("airline_name", "")
+        airline_code = flight.get("airline_code", "")
+        time_str = flight.get("time", "")
+        
+        # 優先使用航空公司名稱，如果沒有則使用代碼
+        airline_display = airline_name.strip() if airline_name.strip() else airline_code
+        
+        display_str = f"{time_str} : {gate} : {flight_code}"
+        if airline_display:
+            display_str += f" ({airline_display})"
+        
+        formatted_display.append(display_str)
+    
+    # 建立最終輸出格式
+    return {
+        "date": date_key,
+        "flights": formatted_data["flights"],
         "summary": {
-            "before_17:00": 0,
-            "after_17:00": 0
-        }
-    })
+            "total_flights": len(formatted_data["flights"]),
+            "before_17:00": formatted_data["summary"]["before_17:00"],
+            "after_17:00": formatted_data["summary"]["after_17:00"]
+        },
+        "formatted_display": formatted_display,
+        "updated_at": datetime.now().isoformat()
+    }
+
+
+def run_fetch(data_dir: str = DATA_DIR, force: bool = False, file: Optional[str] = None,
+              scraper: Optional[TaoyuanAirportTxtAPIScraper] = None, cache: Optional[FeedCache] = None,
+              known_outputs: Optional[Dict[str, Dict]] = None) -> FetchResult:
+    """
+    下載（或讀取本地文字檔）、解析、組織並寫入每日 JSON、索引、每月彙總與封存狀態
+
+    Args:
+        data_dir: 資料目錄
+        force: 忽略快取，強制重新下載並處理
+        file: 改為讀取本地文字檔（串流解析，不使用快取）
+        scraper: 沿用的爬蟲（保留 HTTP 連線；None 則建立新的）
+        cache: 沿用的原始資料快取（None 則從狀態檔載入）
+        known_outputs: 上一次的 FetchResult.outputs；其中的日期不重新讀取既有檔案（flights.py watch 使用）
+
+    Returns:
+        FetchResult；資料未更新時 feed_changed 為 False，找不到任何航班時 flight_count 為 0
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    
+    if cache is None and not (force or file):
+        cache = FeedCache(os.path.join(data_dir, '.feed-cache.json'))
+    
+    print('🔍 從桃園機場官方文字檔 API 獲取資料...')
+    print(f'   URL: {file or TaoyuanAirportTxtAPIScraper.TXT_API_URL}\n')
+    
+    scraper = scraper or TaoyuanAirportTxtAPIScraper()
     
-    # 使用字典來追蹤已處理的航班（時間 + 登機門作為 key）
-    processed_flights = {}  # key: (date_key, time_display, gate), value: flight_entry
+    # 獲取資料（串流：下載、解碼、解析、組織在同一次迭代中完成）
+    print('📥 正在下載並解析資料（D11-D18 及 D11R-D18R 登機門，僅離境航班）...', end=' ')
+    if file:
+        scraper.last_decode_errors = []
+        file_report = {'decode_errors': scraper.last_decode_errors}
+        lines = iter_feed_lines(iter_file_chunks(file), report=file_report)
+    else:
+        lines = scraper.fetch_flight_stream(cache=cache)
+    if lines is None:
+        print('⏭️  資料未更新（304），跳過解析與寫檔')
+        return FetchResult(feed_changed=False)
     
-    for flight in flights:
-        dt = flight['scheduled_datetime']
-        date_key = dt.strftime('%Y-%m-%d')
-        time_display = format_time_for_display(dt)
-        gate = flight['gate']
+    # 包含 D11-D18 以及 D11R-D18R
+    target_gates = []
+    for i in range(11, 19):
+        target_gates.append(f'D{i}')      # D11, D12, ..., D18
+        target_gates.append(f'D{i}R')     # D11R, D12R, ..., D18R
+    parse_stats = {}
+    date_data = organize_by_date(scraper.iter_flight_data(lines, target_gates=target_gates, stats=parse_stats))
+    
+    if file:
+        scraper.last_encoding = file_report.get('encoding')
+    if cache and cache.is_unchanged(TaoyuanAirportTxtAPIScraper.TXT_API_URL, scraper.last_digest):
+        print('⏭️  資料未更新（內容雜湊相同），跳過寫檔')
+        return FetchResult(feed_changed=False)
+    print(f'✅ 讀取 {parse_stats["lines"]} 行，找到 {parse_stats["flights"]} 筆離境航班資料')
+    if parse_stats['flights']:
+        print(f'   日期時間快取命中率: {format_cache_stats()}')
+    report_decode_problems(scraper.last_encoding, scraper.last_decode_errors, parse_stats['garbled'])
+    
+    result = FetchResult()
+    result.flight_count = parse_stats['flights']
+    if parse_stats['flights'] == 0:
+        print('\n⚠️  警告：未找到任何 D11-D18 的航班資料')
+        print('   請檢查登機門代號是否正確，或資料格式是否變更')
+        return result
+    
+    # 儲存每個日期的資料
+    write_report = result.write_report
+    for date_key, formatted_data in date_data.items():
+        output = build_date_output(date_key, formatted_data)
         
-        # 使用時間和登機門作為唯一識別（共掛班號會有相同的時間和登機門）
-        flight_key = (date_key, time_display, gate)
+        # 登機壓力時段（航班與權重都沒變時沿用既有檔案的結果）；
+        # 在這裡而不是 organize_by_date 中計算，因為沿用需要讀取既有的每日檔案
+        date_file = os.path.join(data_dir, date_file_name(date_key))
+        previous = (known_outputs or {}).get(date_key) or load_json(date_file)
+        output["stress_slots"] = stress_slots_for_day(output["flights"], date_key, previous=previous)
+        result.outputs[date_key] = output
         
-        if flight_key not in processed_flights:
-            # 這是第一筆共掛班號，建立航班條目
-            flight_entry = {
-                "time": time_display,
-                "datetime": dt.isoformat(),
-                "gate": gate,
-                "flight_code": flight['flight_code'],  # 保留第一個航班代碼
-                "airline_code": flight['airline_code'],
-                "airline_name": flight['airline_name'],
-                "type": flight['type'],
-                "airport_code": flight['airport_code'],
-                "city": flight['city'],
-                "status": flight['status'],
-                "aircraft": flight['aircraft'],
-                "terminal": flight['terminal']
-            }
-            
-            # 只處理離境航班，所以只有 destination
-            flight_entry["destination"] = f"{flight['city']} ({flight['airport_code']})".strip()
-            
-            # 儲存共掛班號的資訊（用於顯示）
-            flight_entry["codeshare_flights"] = []  # 其他共掛班號的代碼
-            
-            processed_flights[flight_key] = flight_entry
-            
-            # 統計 17:00 前後（只計算一次）
-            if dt.hour < 17:
-                date_data[date_key]["summary"]["before_17:00"] += 1
-            else:
-                date_data[date_key]["summary"]["after_17:00"] += 1
-        else:
-            # 這是共掛班號，只記錄航班代碼
-            existing_entry = processed_flights[flight_key]
-            if flight['flight_code'] != existing_entry['flight_code']:
-                existing_entry["codeshare_flights"].append({
-                    "flight_code": flight['flight_code'],
-                    "airline_code": flight['airline_code'],
-                    "airline_name": flight['airline_name']
-                })
+        # 儲存 JSON 檔案（內容未變更則略過，保留原本的 updated_at）
+        written = write_json_if_changed(date_file, output,
+                                        previous_hash=canonical_hash(previous) if previous else '')
+        write_report.record(date_key, written)
+        if not written:
+            print(f'⏭️  未變更: flight-data-{date_key}.json')
+            continue
+        
+        print(f'✅ 已儲存: flight-data-{date_key}.json')
+        print(f'   - 總航班數: {output["summary"]["total_flights"]} 班')
+        print(f'   - 17:00 前: {output["summary"]["before_17:00"]} 班')
+        print(f'   - 17:00 後: {output["summary"]["after_17:00"]} 班')
+        
+        # 注意：Firebase 存儲由 save-to-firebase.py（或 flights.py pipeline）執行
+    
+    # 更新資料索引（各日期的雜湊、班次數量與最後變更時間）
+    result.index = refresh_index(data_dir, changed=write_report.written)
+    print(f'📇 資料索引: {INDEX_FILE}（{result.index["total_dates"]} 個日期）')
     
-    # 將處理過的航班加入到對應的日期
-    for (date_key, _, _), flight_entry in processed_flights.items():
-        date_data[date_key]["flights"].append(flight_entry)
+    # 更新包含變更日期的每月彙總檔
+    rollup_months = refresh_rollups(data_dir, changed=write_report.written)
+    if rollup_months:
+        print(f'🗓️  每月彙總: 已更新 {", ".join(rollup_months)}')
     
-    # 對每個日期的航班進行排序
-    for date_key in date_data:
-        date_data[date_key]["flights"].sort(key=lambda x: (
-            x.get("datetime", "") if x.get("datetime") else "9999-12-31T23:59:59"
-        ))
+    # 早於資料來源窗口的日期之後不會再變動，封存後比較與上傳時直接略過
+    sealed_days = SealedDays.for_data_dir(data_dir)
+    newly_sealed, unsealed = sealed_days.update(date_data.keys(), result.index['dates'],
+                                                rewritten=write_report.written)
+    if newly_sealed:
+        print(f'🔒 封存 {len(newly_sealed)} 個早於 {sealed_days.window["start"]} 的日期')
+    if unsealed:
+        print(f'🔓 解除封存（資料來源又出現這些日期）: {", ".join(unsealed)}')
     
-    return dict(date_data)
+    # 全部寫入成功後才更新快取與封存狀態，避免失敗的執行被誤判為已處理
+    if cache:
+        cache.commit()
+    sealed_days.save()
+    
+    print(f'\n✅ 完成！共處理 {parse_stats["flights"]} 筆航班資料，{len(date_data)} 個日期檔案：{write_report.summary()}')
+    return result
 
 
 if __name__ == '__main__':
-    import sys
-    
-    # 確保 data 目錄存在
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
-    os.makedirs(data_dir, exist_ok=True)
+    import argparse
     
-    print('🔍 從桃園機場官方文字檔 API 獲取資料...')
-    print(f'   URL: https://www.taoyuan-airport.com/uploads/flightx/a_flight_v4.txt\n')
-    
-    scraper = TaoyuanAirportTxtAPIScraper()
+    parser = argparse.ArgumentParser(description='從桃園機場官方文字檔 API 獲取航班資料')
+    parser.add_argument('--force', action='store_true', help='忽略快取，強制重新下載並處理')
+    parser.add_argument('--file', help='改為讀取本地文字檔（串流解析，不使用快取）')
+    args = parser.parse_args()
     
     try:
-        # 獲取資料
-        print('📥 正在下載資料...', end=' ')
-        text_data = scraper.fetch_flight_data()
-        print(f'✅ 成功（{len(text_data)} 字元）')
-        
-        # 解析資料（只獲取 D11-D18）
-        print('\n📋 正在解析資料（D11-D18 及 D11R-D18R 登機門，僅離境航班）...', end=' ')
-        # 包含 D11-D18 以及 D11R-D18R
-        target_gates = []
-        for i in range(11, 19):
-            target_gates.append(f'D{i}')      # D11, D12, ..., D18
-            target_gates.append(f'D{i}R')     # D11R, D12R, ..., D18R
-        flights = scraper.parse_flight_data(text_data, target_gates=target_gates)
-        print(f'✅ 找到 {len(flights)} 筆離境航班資料')
-        
-        if len(flights) == 0:
-            print('\n⚠️  警告：未找到任何 D11-D18 的航班資料')
-            print('   請檢查登機門代號是否正確，或資料格式是否變更')
+        result = run_fetch(DATA_DIR, force=args.force, file=args.file)
+        if not result.feed_changed:
+            write_github_output(feed_changed='false')
+            sys.exit(0)
+        if result.flight_count == 0:
             sys.exit(1)
-        
-        # 按日期組織
-        print('\n📊 按日期組織資料...')
-        date_data = organize_by_date(flights)
-        
-        # 儲存每個日期的資料
-        for date_key, formatted_data in date_data.items():
-            # 建立格式化顯示
-            formatted_display = []
-            for flight in formatted_data["flights"]:
-                gate = flight.get("gate", "")
-                flight_code = flight.get("flight_code", "")
-                airline_name = flight.get("airline_name", "")
-                airline_code = flight.get("airline_code", "")
-                time_str = flight.get("time", "")
-                
-                # 優先使用航空公司名稱，如果沒有則使用代碼
-                airline_display = airline_name.strip() if airline_name.strip() else airline_code
-                
-                display_str = f"{time_str} : {gate} : {flight_code}"
-                if airline_display:
-                    display_str += f" ({airline_display})"
-                
-                formatted_display.append(display_str)
-            
-            # 建立最終輸出格式
-            from datetime import datetime
-            output = {
-                "date": date_key,
-                "flights": formatted_data["flights"],
-                "summary": {
-                    "total_flights": len(formatted_data["flights"]),
-                    "before_17:00": formatted_data["summary"]["before_17:00"],
-                    "after_17:00": formatted_data["summary"]["after_17:00"]
-                },
-                "formatted_display": formatted_display,
-                "updated_at": datetime.now().isoformat()
-            }
-            
-            # 儲存 JSON 檔案
-            date_file = os.path.join(data_dir, f'flight-data-{date_key}.json')
-            with open(date_file, 'w', encoding='utf-8') as f:
-                json.dump(output, f, ensure_ascii=False, indent=2)
-            
-            print(f'✅ 已儲存: flight-data-{date_key}.json')
-            print(f'   - 總航班數: {output["summary"]["total_flights"]} 班')
-            print(f'   - 17:00 前: {output["summary"]["before_17:00"]} 班')
-            print(f'   - 17:00 後: {output["summary"]["after_17:00"]} 班')
-            
-            # 注意：Firebase 存儲將在 GitHub Actions 中單獨執行
-            # 這裡不直接存儲，避免重複存儲和依賴問題
-        
-        print(f'\n✅ 完成！共處理 {len(flights)} 筆航班資料，儲存到 {len(date_data)} 個日期檔案')
+        write_github_output(feed_changed='true', files_written=len(result.write_report.written),
+                            files_skipped=len(result.write_report.skipped))
         
     except Exception as e:
         print(f'\n❌ 錯誤: {str(e)}')
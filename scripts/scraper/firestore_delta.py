@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Firestore 每日文件的欄位層級差異更新
+文件中的航班以「登機門_時間」為 key 存成 map（如 flights.D11_0530），
+與上次上傳時記錄的各欄位雜湊比較後，只送出有變化的航班、摘要計數與其他欄位，
+不必每次重送整份文件（formatted_display 可由航班重建，不存入 Firestore）
+
+文件格式的變更與讀取方式見 README.md 的「Firestore 文件格式」；from_document 可轉回每日 JSON 的格式
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional
+
+# 不存入 Firestore 的欄位
+OMITTED_FIELDS = ('formatted_display',)
+
+_SIMPLE_SEGMENT = re.compile(r'^[_a-zA-Z][_a-zA-Z0-9]*$')
+_UNSAFE_KEY_CHARS = re.compile(r'[^A-Za-z0-9_]')
+
+# 刪除欄位的標記；FirestoreBatchWriter 提交時轉換為 client 的 DELETE_FIELD
+DELETE_FIELD = object()
+
+
+def field_path(*segments: str) -> str:
+    """
+    組合 Firestore 欄位路徑（非簡單名稱的片段以反引號括住）
+
+    Example:
+        field_path('summary', 'before_17:00') -> 'summary.`before_17:00`'
+    """
+    parts = []
+    for segment in segments:
+        if _SIMPLE_SEGMENT.match(segment):
+            parts.append(segment)
+        else:
+            parts.append('`' + segment.replace('\\', '\\\\').replace('`', '\\`') + '`')
+    return '.'.join(parts)
+
+
+def split_field_path(path: str) -> List[str]:
+    """field_path 的反向操作"""
+    segments, current, quoted, escaped = [], [], False, False
+    for char in path:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif quoted and char == '\\':
+            escaped = True
+        elif char == '`':
+            quoted = not quoted
+        elif char == '.' and not quoted:
+            segments.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    segments.append(''.join(current))
+    return segments
+
+
+def value_hash(value) -> str:
+    """欄位內容的雜湊（JSON 排序 key 後取 SHA-256 前 16 字元）"""
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def flight_key(flight: Dict) -> str:
+    """'D11' + '05:30' -> 'D11_0530'（只含英數字與底線，不以數字開頭）"""
+    gate = str(flight.get('gate', '')).strip()
+    time_str = str(flight.get('time', '')).strip().replace(':', '')
+    key = _UNSAFE_KEY_CHARS.sub('_', f'{gate}_{time_str}')
+    return key if _SIMPLE_SEGMENT.match(key) else f'_{key}'
+
+
+def flights_by_key(flights: List[Dict]) -> Dict[str, Dict]:
+    """航班列表 -> {key: 航班}；同一登機門與時間有多筆時依序加上 _2、_3"""
+    result = {}
+    for flight in flights:
+        base = flight_key(flight)
+        key, n = base, 1
+        while key in result:
+            n += 1
+            key = f'{base}_{n}'
+        result[key] = flight
+    return result
+
+
+def to_document(data: Dict) -> Dict:
+    """每日 JSON -> Firestore 文件（航班改為以 key 存放的 map）"""
+    document = {k: v for k, v in data.items() if k not in OMITTED_FIELDS and k != 'flights'}
+    document['flights'] = flights_by_key(data.get('flights', []))
+    return document
+
+
+def from_document(document: Dict) -> Dict:
+    """
+    Firestore 文件 -> 每日 JSON 的格式（航班改回依時間排序的列表）
+
+    Firestore 讀回的 map 依 key 排序，無法保留原本的順序：同一時間的航班改依 key（登機門）排序。
+    formatted_display 不存入 Firestore，需要時以 fetch-from-txt-api.py 的 build_date_output 重建。
+    """
+    data = {k: v for k, v in document.items() if k != 'flights' and not k.startswith('_')}
+    flights = document.get('flights') or {}
+    data['flights'] = [flight for _, flight in sorted(flights.items(),
+                                                      key=lambda item: (item[1].get('datetime', ''), item[0]))]
+    return data
+
+
+def field_hashes(document: Dict) -> Dict:
+    """
+    文件各欄位的雜湊（記錄在上傳狀態檔中，下次用來計算差異）
+
+    Returns:
+        {'flights': {key: 雜湊}, 'summary': {計數名稱: 雜湊}, 'fields': {其他欄位: 雜湊}}
+    """
+    return {
+        'flights': {key: value_hash(flight) for key, flight in document.get('flights', {}).items()},
+        'summary': {name: value_hash(value) for name, value in (document.get('summary') or {}).items()},
+        'fields': {name: value_hash(value) for name, value in document.items()
+                   if name not in ('flights', 'summary') and not name.startswith('_')},
+    }
+
+
+def _map_delta(prefix: str, previous: Dict[str, str], current: Dict[str, str], values: Dict) -> Dict:
+    delta = {}
+    for key, digest in current.items():
+        if previous.get(key) != digest:
+            delta[field_path(prefix, key)] = values[key]
+    for key in previous:
+        if key not in current:
+            delta[field_path(prefix, key)] = DELETE_FIELD
+    return delta
+
+
+def document_delta(previous: Optional[Dict], document: Dict) -> Optional[Dict]:
+    """
+    計算欄位層級的更新內容
+
+    Args:
+        previous: 上次上傳時的 field_hashes（沒有記錄則為 None）
+        document: to_document 的結果
+
+    Returns:
+        {欄位路徑: 新值或 DELETE_FIELD}，可直接用於 update()；
+        沒有上次的記錄時返回 None（需要完整寫入）
+    """
+    if not isinstance(previous, dict) or not all(isinstance(previous.get(k), dict)
+                                                   for k in ('flights', 'summary', 'fields')):
+        return None
+    current = field_hashes(document)
+    delta = _map_delta('flights', previous['flights'], current['flights'], document.get('flights', {}))
+    delta.update(_map_delta('summary', previous['summary'], current['summary'], document.get('summary') or {}))
+    for name, digest in current['fields'].items():
+        if previous['fields'].get(name) != digest:
+            delta[field_path(name)] = document[name]
+    for name in previous['fields']:
+        if name not in current['fields']:
+            delta[field_path(name)] = DELETE_FIELD
+    return delta
+
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+批次、並行寫入 Firestore
+將文件分組為 WriteBatch（每批最多 batch_size 份文件、估計大小不超過 max_batch_bytes），
+同時最多 max_in_flight 個批次在提交中，暫時性錯誤以指數退避重試；
+批次是原子性的，永久性錯誤（如 update 的文件不存在）時將批次分成兩半重新提交，
+只有出錯的文件失敗，同批的其他文件照常寫入
+
+每個寫入為 (文件 id, 內容) 或 (文件 id, 內容, 操作)，操作為
+    'merge'：set(merge=True)（預設）、'set'：整份取代、'update'：以欄位路徑更新（見 firestore_delta）
+
+client 只需要提供 Firestore client 的這幾個方法，測試與效能評估可以換成 InMemoryFirestore：
+    client.collection(name).document(doc_id) -> 文件參照
+    client.batch() -> 具有 set(doc_ref, data, merge=...)、update(doc_ref, data) 與 commit() 的批次
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from firestore_delta import DELETE_FIELD, split_field_path
+
+# Firestore 單一批次最多 500 個寫入、請求大小上限 10 MiB；每日文件約 20–30 KB
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_BATCH_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 16.0
+
+# 可重試的錯誤：google.api_core.exceptions 的 HTTP 狀態碼
+# （ABORTED 409、RESOURCE_EXHAUSTED 429、INTERNAL 500、UNAVAILABLE 503、DEADLINE_EXCEEDED 504）；
+# 依狀態碼與類別名稱判斷，不需要為此載入 google.api_core
+# （NOT_FOUND 不重試：update 的文件不存在時需要改為完整寫入）
+TRANSIENT_CODES = frozenset({409, 429, 500, 503, 504})
+TRANSIENT_NAMES = frozenset({
+    'Aborted', 'DeadlineExceeded', 'InternalServerError', 'ResourceExhausted',
+    'ServiceUnavailable', 'TooManyRequests', 'RetryError',
+})
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """是否為可以重試的暫時性錯誤"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    code = getattr(error, 'code', None)
+    try:
+        if code is not None and int(code) in TRANSIENT_CODES:
+            return True
+    except (TypeError, ValueError):
+        pass
+    return type(error).__name__ in TRANSIENT_NAMES
+
+
+def estimate_size(data: Dict) -> int:
+    """文件的估計大小（JSON 位元組數）"""
+    return len(json.dumps(data, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class WriteResult:
+    """寫入結果：成功的文件 id 與失敗的文件 id -> 錯誤"""
+
+    def __init__(self):
+        self.written: List[str] = []
+        self.failed: Dict[str, BaseException] = {}
+        self.batches = 0
+        self.retries = 0
+        self.splits = 0
+        self.elapsed = 0.0
+
+    @property
+    def docs_per_sec(self) -> float:
+        return len(self.written) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class FirestoreBatchWriter:
+    """以批次與有限的並行數寫入同一個 collection"""
+
+    def __init__(self, client, collection: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 merge: bool = True, sleep: Callable[[float], None] = time.sleep):
+        """
+        初始化
+
+        Args:
+            client: Firestore client（或提供相同介面的物件）
+            collection: collection 名稱
+            batch_size: 每批最多幾份文件（Firestore 上限 500）
+            max_batch_bytes: 每批文件的估計大小上限
+            max_in_flight: 同時提交中的批次數量上限
+            max_retries: 暫時性錯誤最多重試幾次
+            backoff: 第一次重試前等待的秒數（之後每次加倍，加上隨機抖動）
+            merge: 是否以 merge=True 寫入
+            sleep: 等待函數（測試時可替換）
+        """
+        self.client = client
+        self.collection = collection
+        self.batch_size = max(1, min(batch_size, 500))
+        self.max_batch_bytes = max_batch_bytes
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.merge = merge
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def group(self, docs: Iterable[Tuple]) -> List[List[Tuple]]:
+        """將寫入依數量與估計大小分組"""
+        batches = []
+        current, current_bytes = [], 0
+        for item in docs:
+            size = estimate_size(item[1])
+            if current and (len(current) >= self.batch_size or current_bytes + size > self.max_batch_bytes):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(item)
+            current_bytes += size
+        if current:
+            batches.append(current)
+        return batches
+
+    def _delete_sentinel(self):
+        """client 的 DELETE_FIELD（InMemoryFirestore 沿用 firestore_delta 的標記）"""
+        sentinel = getattr(self.client, 'DELETE_FIELD', None)
+        if sentinel is None:
+            from google.cloud.firestore_v1 import DELETE_FIELD as sentinel
+        return sentinel
+
+    def _add(self, batch, collection, item):
+        doc_id, data = item[0], item[1]
+        op = item[2] if len(item) > 2 else 'merge'
+        ref = collection.document(doc_id)
+        if op == 'update':
+            if any(value is DELETE_FIELD for value in data.values()):
+                sentinel = self._delete_sentinel()
+                data = {path: sentinel if value is DELETE_FIELD else value for path, value in data.items()}
+            batch.update(ref, data)
+        elif op == 'set':
+            batch.set(ref, data)
+        else:
+            batch.set(ref, data, merge=self.merge)
+
+    def _commit(self, batch_docs: List[Tuple], result: WriteResult) -> Optional[BaseException]:
+        """提交一個批次（暫時性錯誤時重試）；成功返回 None，否則返回最後的錯誤"""
+        attempt = 0
+        while True:
+            try:
+                batch = self.client.batch()
+                collection = self.client.collection(self.collection)
+                for item in batch_docs:
+                    self._add(batch, collection, item)
+                batch.commit()
+                return None
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    return e
+                delay = min(MAX_BACKOFF, self.backoff * (2 ** attempt))
+                attempt += 1
+                with self._lock:
+                    result.retries += 1
+                self.sleep(delay * (0.5 + random.random() / 2))
+
+    def write_all(self, docs: Iterable[Tuple],
+                  on_batch: Optional[Callable[[List[str], Optional[BaseException]], None]] = None) -> WriteResult:
+        """
+        寫入所有文件
+
+        Args:
+            docs: (文件 id, 內容[, 操作]) 的序列
+            on_batch: 每個批次（或失敗後分割出的部分）完成時呼叫 on_batch(文件 id 列表, 錯誤或 None)
+
+        Returns:
+            WriteResult
+        """
+        result = WriteResult()
+        batches = self.group(docs)
+        result.batches = len(batches)
+        start = time.perf_counter()
+
+        def run(batch_docs):
+            error = self._commit(batch_docs, result)
+            if error is not None and len(batch_docs) > 1 and not is_transient_error(error):
+                # 一份文件出錯會使整批失敗：分成兩半重新提交，找出出錯的文件
+                middle = len(batch_docs) // 2
+                with self._lock:
+                    result.splits += 1
+                run(batch_docs[:middle])
+                run(batch_docs[middle:])
+                return
+            doc_ids = [item[0] for item in batch_docs]
+            with self._lock:
+                if error is None:
+                    result.written.extend(doc_ids)
+                else:
+                    for doc_id in doc_ids:
+                        result.failed[doc_id] = error
+                if on_batch:
+                    on_batch(doc_ids, error)
+
+        if self.max_in_flight == 1 or len(batches) <= 1:
+            for batch_docs in batches:
+                run(batch_docs)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(batches))) as executor:
+                list(executor.map(run, batches))
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+class InMemoryFirestore:
+    """
+    記憶體中的假 Firestore client（測試與效能評估用）
+    可模擬每次提交的延遲、前 fail_first 次提交拋出暫時性錯誤，
+    以及包含 fail_ids 中文件的批次永遠失敗
+    """
+
+    DELETE_FIELD = DELETE_FIELD
+
+    class TransientError(Exception):
+        code = 503
+
+    class NotFound(Exception):
+        code = 404
+
+    def __init__(self, commit_latency: float = 0.0, fail_first: int = 0, fail_ids: Iterable[str] = ()):
+        self.commit_latency = commit_latency
+        self.fail_first = fail_first
+        self.fail_ids = set(fail_ids)
+        self.collections: Dict[str, Dict[str, Dict]] = {}
+        self.commits = 0
+        self.attempts = 0
+        self.bytes_written = 0
+        self.log: List[Tuple[str, str]] = []  # 已套用的寫入 (文件 id, 操作)
+        self._lock = threading.Lock()
+
+    def collection(self, name: str):
+        class _Collection:
+            def document(self, doc_id):
+                return (name, doc_id)
+
+        return _Collection()
+
+    def batch(self):
+        client = self
+
+        class _Batch:
+            def __init__(self):
+                self.writes = []
+
+            def set(self, ref, data, merge=False):
+                self.writes.append((ref, data, 'merge' if merge else 'set'))
+
+            def update(self, ref, data):
+                self.writes.append((ref, data, 'update'))
+
+            def commit(self):
+                client._commit(self.writes)
+
+        return _Batch()
+
+    def _commit(self, writes):
+        if self.commit_latency:
+            time.sleep(self.commit_latency)
+        with self._lock:
+            self.attempts += 1
+            if self.attempts <= self.fail_first:
+                raise InMemoryFirestore.TransientError('模擬的暫時性錯誤')
+            if any(doc_id in self.fail_ids for (_, doc_id), _, _ in writes):
+                raise PermissionError('模擬的寫入失敗')
+            collections = {name: dict(docs) for name, docs in self.collections.items()}
+            for (name, doc_id), data, op in writes:
+                docs = collections.setdefault(name, {})
+                if op == 'update':
+                    if doc_id not in docs:
+                        raise InMemoryFirestore.NotFound(f'文件不存在: {doc_id}')
+                    docs[doc_id] = _apply_update(docs[doc_id], data)
+                elif op == 'merge' and doc_id in docs:
+                    docs[doc_id] = dict(docs[doc_id], **data)
+                else:
+                    docs[doc_id] = dict(data)
+            # 批次是原子性的：全部成功才套用
+            self.collections = collections
+            self.bytes_written += sum(estimate_size(data) for _, data, _ in writes)
+            self.log.extend((doc_id, op) for (_, doc_id), _, op in writes)
+            self.commits += 1
+
+
+def _apply_update(document: Dict, updates: Dict) -> Dict:
+    """以欄位路徑更新巢狀的文件內容（InMemoryFirestore 使用）"""
+    document = json.loads(json.dumps(document))
+    for path, value in updates.items():
+        segments = split_field_path(path)
+        target = document
+        for segment in segments[:-1]:
+            if not isinstance(target.get(segment), dict):
+                target[segment] = {}
+            target = target[segment]
+        if value is DELETE_FIELD:
+            target.pop(segments[-1], None)
+        else:
+            target[segments[-1]] = value
+    return document
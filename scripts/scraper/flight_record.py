@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+精簡的航班資料型別
+以 NamedTuple 取代每筆 17 個 key 的字典，並將重複出現的字串（航空公司、城市、
+登機門、航廈、狀態等）intern，讓全機場的資料量也能維持較低的記憶體用量
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, NamedTuple, Tuple
+
+intern = sys.intern
+
+
+class FlightRecord(NamedTuple):
+    """文字檔解析後的單筆航班（只處理離境航班）"""
+
+    terminal: str
+    type: str
+    airline_code: str
+    airline_name: str
+    flight_code: str
+    flight_number: str
+    gate: str
+    date_key: str          # 預定日期，YYYY-MM-DD
+    minute: int            # 預定時間，當日第幾分鐘（0-1439）
+    actual_date: str
+    actual_time: str
+    airport_code: str
+    city: str
+    status: str
+    aircraft: str
+    raw_line: int
+
+    @property
+    def time_display(self) -> str:
+        """預定時間（HH:MM）"""
+        return f'{self.minute // 60:02d}:{self.minute % 60:02d}'
+
+    @property
+    def hour(self) -> int:
+        return self.minute // 60
+
+    @property
+    def datetime_iso(self) -> str:
+        """預定日期時間的 ISO 格式（與 datetime.isoformat() 相同）"""
+        return f'{self.date_key}T{self.time_display}:00'
+
+    @property
+    def scheduled_datetime(self) -> datetime:
+        """預定日期時間（需要時才建立 datetime 物件）"""
+        year, month, day = map(int, self.date_key.split('-'))
+        return datetime(year, month, day, self.minute // 60, self.minute % 60)
+
+
+class NormalizedFlight(NamedTuple):
+    """compare-data.py 比較用的標準化航班（只包含 normalize_flight 考慮的欄位）"""
+
+    time: str
+    gate: str
+    flight_code: str
+    airline_name: str
+    airline_code: str
+    destination: str
+    status: str
+    aircraft: str
+    codeshare_flights: Tuple[Dict, ...]
+
+    def to_dict(self) -> Dict:
+        """轉回 normalize_flight 原本的字典格式"""
+        data = self._asdict()
+        data['codeshare_flights'] = list(self.codeshare_flights)
+        return data
+
+
+def make_flight_record(terminal: str, airline_code: str, airline_name: str, flight_code: str,
+                       flight_number: str, gate: str, date_key: str, minute: int,
+                       actual_date: str, actual_time: str, airport_code: str, city: str,
+                       status: str, aircraft: str, raw_line: int) -> FlightRecord:
+    """建立 FlightRecord，重複出現的欄位一律 intern"""
+    return FlightRecord(
+        intern(terminal),
+        'departure',
+        intern(airline_code),
+        intern(airline_name),
+        flight_code,
+        flight_number,
+        intern(gate),
+        intern(date_key),
+        minute,
+        intern(actual_date),
+        intern(actual_time),
+        intern(airport_code),
+        intern(city),
+        intern(status),
+        intern(aircraft),
+        raw_line,
+    )
+
+
+def normalize_flight_record(flight: Dict) -> NormalizedFlight:
+    """
+    標準化航班資料為精簡的 NamedTuple（字串已 intern），用於快速比較
+    只保留核心資料欄位，移除會影響比較的欄位（如 updated_at）
+    """
+    # 處理 codeshare_flights，確保順序一致（按 flight_code 排序）
+    codeshare_flights = flight.get("codeshare_flights", [])
+    if isinstance(codeshare_flights, list):
+        # 排序共掛班號，確保順序不影響比較
+        codeshare_flights_sorted = tuple(sorted(
+            codeshare_flights,
+            key=lambda x: x.get("flight_code", "") if isinstance(x, dict) else str(x)
+        ))
+    else:
+        codeshare_flights_sorted = ()
+
+    return NormalizedFlight(
+        time=intern(str(flight.get("time", "")).strip()),
+        gate=intern(str(flight.get("gate", "")).strip()),
+        flight_code=str(flight.get("flight_code", "")).strip(),
+        airline_name=intern(str(flight.get("airline_name", "")).strip()),
+        airline_code=intern(str(flight.get("airline_code", "")).strip()),
+        destination=intern(str(flight.get("destination", "")).strip()),
+        status=intern(str(flight.get("status", "")).strip()),
+        aircraft=intern(str(flight.get("aircraft", flight.get("aircraft_type", ""))).strip()),  # 支援兩種欄位名稱
+        codeshare_flights=codeshare_flights_sorted  # 包含共掛班號資訊
+    )
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+每月彙總檔（data/rollup/flight-month-YYYY-MM.json）
+包含當月每天的班次統計、每小時班次數量，以及（可選）精簡的航班列表，
+讓跨月、跨年的比較只需要下載幾個檔案，而不是每天一個檔案；
+只有包含變更日期的月份會重新產生
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from flight_store import canonical_hash, list_date_files, write_json_if_changed
+
+ROLLUP_DIR = 'rollup'
+
+# 精簡航班列表保留的欄位
+SLIM_FIELDS = ('time', 'gate', 'flight_code', 'airline_code', 'destination', 'status')
+
+
+def month_of(date_key: str) -> str:
+    """'2026-02-01' -> '2026-02'"""
+    return date_key[:7]
+
+
+def rollup_path(data_dir: str, month: str) -> str:
+    return os.path.join(data_dir, ROLLUP_DIR, f'flight-month-{month}.json')
+
+
+def hourly_counts(flights: List[Dict]) -> List[int]:
+    """每小時（0-23 時）的班次數量"""
+    counts = [0] * 24
+    for flight in flights:
+        try:
+            hour = int(str(flight.get('time', ''))[:2])
+        except ValueError:
+            continue
+        if 0 <= hour < 24:
+            counts[hour] += 1
+    return counts
+
+
+def slim_flight(flight: Dict) -> Dict:
+    """精簡的航班資料（共掛班號只保留數量）"""
+    slim = {key: flight.get(key, '') for key in SLIM_FIELDS}
+    if flight.get('codeshare_flights'):
+        slim['codeshare_count'] = len(flight['codeshare_flights'])
+    return slim
+
+
+def summarize_day(data: Dict, include_flights: bool = True) -> Dict:
+    """
+    單日彙總
+
+    Args:
+        data: flight-data-YYYY-MM-DD.json 的內容
+        include_flights: 是否包含精簡航班列表
+
+    Returns:
+        {'hash', 'total_flights', 'before_17:00', 'after_17:00', 'hourly'[, 'flights']}
+    """
+    flights = data.get('flights', [])
+    summary = data.get('summary', {})
+    before = summary.get('before_17:00', sum(1 for f in flights if f.get('time', '') < '17:00'))
+    day = {
+        'hash': canonical_hash(data),
+        'total_flights': summary.get('total_flights', len(flights)),
+        'before_17:00': before,
+        'after_17:00': summary.get('after_17:00', len(flights) - before),
+        'hourly': hourly_counts(flights),
+    }
+    if include_flights:
+        day['flights'] = [slim_flight(f) for f in flights]
+    return day
+
+
+def build_month(month: str, date_files: Dict[str, str], include_flights: bool = True) -> Dict:
+    """
+    產生單月彙總
+
+    Args:
+        month: 'YYYY-MM'
+        date_files: {日期 key: 檔案路徑}（只會使用該月份的日期）
+        include_flights: 是否包含精簡航班列表
+
+    Returns:
+        月彙總內容
+    """
+    days = {}
+    for date_key, path in sorted(date_files.items()):
+        if month_of(date_key) != month:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                days[date_key] = summarize_day(json.load(f), include_flights)
+        except (OSError, ValueError):
+            continue
+
+    hourly = [0] * 24
+    for day in days.values():
+        hourly = [total + count for total, count in zip(hourly, day['hourly'])]
+
+    return {
+        'month': month,
+        'summary': {
+            'total_days': len(days),
+            'total_flights': sum(d['total_flights'] for d in days.values()),
+            'before_17:00': sum(d['before_17:00'] for d in days.values()),
+            'after_17:00': sum(d['after_17:00'] for d in days.values()),
+            'hourly': hourly,
+        },
+        'days': days,
+        'updated_at': datetime.now().isoformat(),
+    }
+
+
+def refresh_rollups(data_dir: str, changed: Optional[Iterable[str]] = None,
+                    include_flights: bool = True) -> List[str]:
+    """
+    更新每月彙總檔
+
+    Args:
+        data_dir: 資料目錄
+        changed: 本次有寫入的日期 key；提供時只重建這些日期所屬的月份與尚無彙總檔的月份
+                 （None 則重建所有月份）
+        include_flights: 是否包含精簡航班列表
+
+    Returns:
+        實際寫入的月份列表
+    """
+    date_files = list_date_files(data_dir)
+    all_months = sorted({month_of(d) for d in date_files})
+    if changed is None:
+        months = all_months
+    else:
+        changed_months = {month_of(d) for d in changed}
+        months = [m for m in all_months
+                  if m in changed_months or not os.path.exists(rollup_path(data_dir, m))]
+
+    written = []
+    for month in months:
+        rollup = build_month(month, date_files, include_flights)
+        if write_json_if_changed(rollup_path(data_dir, month), rollup, compact=True):
+            written.append(month)
+    return written
+
+
+if __name__ == '__main__':
+    # 手動重建所有月份：python3 flight_rollup.py [資料目錄] [--no-flights]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='產生每月彙總檔')
+    parser.add_argument('data_dir', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data'))
+    parser.add_argument('--no-flights', action='store_true', help='不包含精簡航班列表')
+    args = parser.parse_args()
+
+    months = refresh_rollups(os.path.abspath(args.data_dir), include_flights=not args.no_flights)
+    print(f'✅ 已更新 {len(months)} 個月份彙總檔')
@@ -5,27 +5,79 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 import json
-import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import re
 
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from html_parse import (DEFAULT_ENGINE, compile_xpath, lxml_root, make_soup, raw_text,
+                        stripped_text, uses_lxml_tree)
+from rate_limit import DEFAULT_BURST, HostRateLimiter
+
+# 'strainer' 引擎只為航班表格建立樹
+FLIGHT_TABLES = SoupStrainer('table', class_=re.compile(r'(^|\s)flight-table(\s|$)'))
+FLIGHTRADAR_LINK = re.compile(r'flightradar24\.com')
+STATUS_CLASS = re.compile(r'status')
+
+# 'fast' 引擎預先編譯的 XPath（與 BeautifulSoup 路徑的 find/find_all 對應）
+XP_FLIGHT_TABLES = compile_xpath('//table[contains(concat(" ", normalize-space(@class), " "), " flight-table ")]')
+XP_THEAD = compile_xpath('(.//thead)[1]')
+XP_HEADER_CELLS = compile_xpath('.//th')
+XP_FIRST_LINK = compile_xpath('(.//a)[1]')
+XP_BODY_ROWS = compile_xpath('(.//tbody)[1]//tr')
+XP_ROW_CELLS = compile_xpath('.//td')
+XP_FLIGHT_LINK = compile_xpath('(.//a[contains(@href, "flightradar24.com")])[1]')
+XP_AIRLINE = compile_xpath('(.//span[contains(concat(" ", normalize-space(@class), " "), " codeshare-name ")])[1]')
+XP_CITY = compile_xpath('(.//small)[1]')
+XP_AIRPORT_CODE = compile_xpath('(.//strong)[1]')
+XP_STATUS = compile_xpath('(.//span[contains(@class, "status")])[1]')
+# BeautifulSoup 的 find_next('td')：元素內或之後的第一個 td
+XP_NEXT_CELL = compile_xpath('(descendant::td | following::td)[1]')
+
+# 單一登機門：字母 + 號碼 + 可有可無的字母後綴（如 D11、D11R）
+GATE_CELL = re.compile(r'^([A-Z]+\d+)([A-Z]*)$')
+
+# 判斷表格類型：表頭的時間欄，以及表頭無法判斷時（原本的做法）整個表格文字中的關鍵字
+HEADER_KEYWORDS = {'departure': '出發時間', 'arrival': '抵達時間'}
+TEXT_KEYWORDS = {'departure': '出發', 'arrival': '抵達'}
+
 class TaoyuanAirportFlightScraper:
     """桃園機場航班資料爬蟲"""
     
     BASE_URL = "https://yuann.tw/taoyuan-airport-d11-d18-departures/"
+    # 頁面有分頁（未列出所有航班）時會出現的 class 或連結（在原始 HTML 上比對，與解析引擎無關）
+    PAGINATION_PATTERN = re.compile(r'class="[^"]*\b(?:pagination|page-numbers|load-more)\b|[?&](?:amp;)?paged=\d')
     
-    def __init__(self, delay: float = 0.5):
+    def __init__(self, delay: float = 0.5, max_workers: int = 4, burst: int = DEFAULT_BURST,
+                 page_row_limit: Optional[int] = None, parser: str = DEFAULT_ENGINE):
         """
         初始化爬蟲
         
         Args:
-            delay: 請求之間的延遲時間（秒），避免對伺服器造成負擔
+            delay: 同一主機平均每個請求的間隔（秒），避免對伺服器造成負擔；0 表示不限制
+            max_workers: get_all_gates 同時進行的請求數上限
+            burst: 同一主機最多同時出發的請求數（預設 1；不隨 max_workers 增加）
+            page_row_limit: 未篩選頁面每頁最多列出的航班數（已知時，sweep_gates 用來判斷頁面是否被截斷）
+            parser: HTML 解析引擎（'html.parser'、'lxml'、'strainer' 或 'fast'；預設見 html_parse.DEFAULT_ENGINE）
         """
         self.delay = delay
+        self.parser = parser
+        self.page_row_limit = page_row_limit
+        self.max_workers = max(1, max_workers)
+        # 以 token bucket 限制每個主機的請求速率（平均每 delay 秒一個），取代每個請求之後固定的 sleep
+        self.rate_limiter = HostRateLimiter(1 / delay if delay > 0 else None, burst)
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
@@ -45,30 +97,8 @@ class TaoyuanAirportFlightScraper:
             url += f"?flight_search={gate}"
         
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 提取出發航班表格
-            departure_data = self._extract_table_data(soup, 'departure')
-            
-            # 提取抵達航班表格
-            arrival_data = self._extract_table_data(soup, 'arrival')
-            
-            return {
-                'timestamp': datetime.now().isoformat(),
-                'gate': gate or 'ALL',
-                'url': url,
-                'departure': departure_data,
-                'arrival': arrival_data,
-                'summary': {
-                    'departure_count': len(departure_data.get('data', [])),
-                    'arrival_count': len(arrival_data.get('data', [])),
-                    'total_count': len(departure_data.get('data', [])) + len(arrival_data.get('data', []))
-                }
-            }
+            departure_data, arrival_data = self.parse_tables(self._fetch_page(url))
+            return self._build_result(gate or 'ALL', url, departure_data, arrival_data)
         except Exception as e:
             return {
                 'error': str(e),
@@ -76,6 +106,50 @@ class TaoyuanAirportFlightScraper:
                 'timestamp': datetime.now().isoformat()
             }
     
+    def _fetch_page(self, url: str) -> str:
+        """下載頁面（受 rate_limiter 限制）"""
+        self.rate_limiter.acquire(url)
+        response = self.session.get(url, timeout=10)
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        return response.text
+    
+    def parse_page(self, html: str) -> BeautifulSoup:
+        """以 BeautifulSoup 解析頁面（'strainer' 只保留航班表格）"""
+        return make_soup(html, self.parser, FLIGHT_TABLES)
+    
+    def parse_tables(self, html: str) -> Tuple[Dict, Dict]:
+        """
+        解析頁面中的出發與抵達航班表格
+        
+        Args:
+            html: 頁面內容
+        
+        Returns:
+            (出發航班表格資料, 抵達航班表格資料)
+        """
+        if uses_lxml_tree(self.parser):
+            root = lxml_root(html)
+            tables = XP_FLIGHT_TABLES(root) if root is not None else []
+            return self._extract_table_data_lxml(tables, 'departure'), self._extract_table_data_lxml(tables, 'arrival')
+        soup = self.parse_page(html)
+        return self._extract_table_data(soup, 'departure'), self._extract_table_data(soup, 'arrival')
+    
+    def _build_result(self, gate: str, url: str, departure_data: Dict, arrival_data: Dict) -> Dict:
+        """組成單一登機門的結果（get_flight_data 與 sweep_gates 共用）"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'gate': gate,
+            'url': url,
+            'departure': departure_data,
+            'arrival': arrival_data,
+            'summary': {
+                'departure_count': len(departure_data.get('data', [])),
+                'arrival_count': len(arrival_data.get('data', [])),
+                'total_count': len(departure_data.get('data', [])) + len(arrival_data.get('data', []))
+            }
+        }
+    
     def _extract_table_data(self, soup: BeautifulSoup, flight_type: str) -> Dict:
         """
         提取表格資料
@@ -89,15 +163,13 @@ class TaoyuanAirportFlightScraper:
         """
         tables = soup.find_all('table', class_='flight-table')
         
+        headers = []
         for table in tables:
-            # 根據表格內容判斷是出發還是抵達
-            table_text = table.get_text().lower()
-            is_departure = '出發時間' in table_text or '出發' in table_text
-            is_arrival = '抵達時間' in table_text or '抵達' in table_text
-            
-            if (flight_type == 'departure' and is_departure) or \
-               (flight_type == 'arrival' and is_arrival):
-                return self._parse_table(table, flight_type)
+            thead = table.find('thead')
+            headers.append(thead.get_text() if thead else '')
+        table = self._pick_table(tables, headers, lambda table: table.get_text(), flight_type)
+        if table is not None:
+            return self._parse_table(table, flight_type)
         
         # 如果找不到對應的表格，返回空資料
         return {
@@ -106,6 +178,34 @@ class TaoyuanAirportFlightScraper:
             'data': []
         }
     
+    @staticmethod
+    def _pick_table(tables: List, headers: List[str], table_text, flight_type: str):
+        """
+        選出指定類型的表格（BeautifulSoup 與 'fast' 引擎共用）
+        
+        先找表頭有「出發時間」／「抵達時間」的表格（抵達航班的「出發地」欄不會被誤判為出發）；
+        都不符合時，在表頭無法判斷的表格中沿用原本的做法：整個表格的文字包含「出發」／「抵達」
+        
+        Args:
+            tables: 表格元素列表
+            headers: 各表格 thead 的文字（沒有 thead 時為空字串）
+            table_text: 取得表格整體文字的函式
+            flight_type: 'departure' 或 'arrival'
+        
+        Returns:
+            符合的表格，找不到時返回 None
+        """
+        for table, header_text in zip(tables, headers):
+            if HEADER_KEYWORDS[flight_type] in header_text:
+                return table
+        
+        for table, header_text in zip(tables, headers):
+            if any(keyword in header_text for keyword in HEADER_KEYWORDS.values()):
+                continue
+            if TEXT_KEYWORDS[flight_type] in table_text(table).lower():
+                return table
+        return None
+    
     def _parse_table(self, table, flight_type: str) -> Dict:
         """
         解析表格
@@ -171,7 +271,7 @@ class TaoyuanAirportFlightScraper:
             
             # 航班代號
             flight_cell = cells[1]
-            flight_link = flight_cell.find('a', href=re.compile(r'flightradar24\.com'))
+            flight_link = flight_cell.find('a', href=FLIGHTRADAR_LINK)
             if flight_link:
                 row_data['flight_code'] = flight_link.get_text(strip=True)
             else:
@@ -207,8 +307,8 @@ class TaoyuanAirportFlightScraper:
             
             row_data['full_destination'] = dest_cell.get_text(strip=True)
             
-            # 狀態
-            status_span = dest_cell.find_next('td').find('span', class_=re.compile(r'status'))
+            # 狀態（目的地的下一個儲存格）
+            status_span = dest_cell.find_next('td').find('span', class_=STATUS_CLASS)
             if status_span:
                 row_data['status'] = status_span.get_text(strip=True)
                 row_data['status_class'] = ' '.join(status_span.get('class', []))
@@ -221,6 +321,93 @@ class TaoyuanAirportFlightScraper:
             print(f"解析行資料時發生錯誤: {e}")
             return None
     
+    def _extract_table_data_lxml(self, tables: List, flight_type: str) -> Dict:
+        """
+        提取表格資料（'fast' 引擎，與 _extract_table_data 結果相同）
+        
+        Args:
+            tables: lxml 的 flight-table 表格元素列表
+            flight_type: 'departure' 或 'arrival'
+        
+        Returns:
+            包含表格資料的字典
+        """
+        headers = []
+        for table in tables:
+            thead = XP_THEAD(table)
+            headers.append(raw_text(thead[0]) if thead else '')
+        table = self._pick_table(tables, headers, raw_text, flight_type)
+        if table is not None:
+            thead = XP_THEAD(table)
+            return self._parse_table_lxml(table, thead[0] if thead else None, flight_type)
+        
+        return {
+            'type': flight_type,
+            'headers': [],
+            'data': []
+        }
+    
+    def _parse_table_lxml(self, table, thead, flight_type: str) -> Dict:
+        """解析表格（'fast' 引擎，與 _parse_table 結果相同）"""
+        headers = []
+        if thead is not None:
+            for cell in XP_HEADER_CELLS(thead):
+                link = XP_FIRST_LINK(cell)
+                headers.append(stripped_text(link[0] if link else cell))
+        
+        data = []
+        for row in XP_BODY_ROWS(table):
+            cells = XP_ROW_CELLS(row)
+            if len(cells) >= 6:
+                row_data = self._parse_row_lxml(cells, flight_type)
+                if row_data:
+                    data.append(row_data)
+        
+        return {
+            'type': flight_type,
+            'headers': headers,
+            'data': data,
+            'row_count': len(data)
+        }
+    
+    def _parse_row_lxml(self, cells, flight_type: str) -> Optional[Dict]:
+        """解析表格行（'fast' 引擎，與 _parse_row 結果相同）"""
+        try:
+            flight_cell = cells[1]
+            full_flight_info = stripped_text(flight_cell)
+            flight_link = XP_FLIGHT_LINK(flight_cell)
+            airline_span = XP_AIRLINE(flight_cell)
+            
+            dest_cell = cells[4]
+            city_small = XP_CITY(dest_cell)
+            code_strong = XP_AIRPORT_CODE(dest_cell)
+            
+            status_span = XP_STATUS(XP_NEXT_CELL(dest_cell)[0])
+            if status_span:
+                status = stripped_text(status_span[0])
+                status_class = ' '.join(status_span[0].get('class', '').split())
+            else:
+                status = stripped_text(cells[5])
+                status_class = ''
+            
+            return {
+                'type': flight_type,
+                'time': stripped_text(cells[0]),
+                'flight_code': stripped_text(flight_link[0]) if flight_link else full_flight_info.split('\n')[0],
+                'airline': stripped_text(airline_span[0]).replace('(', '').replace(')', '') if airline_span else '',
+                'full_flight_info': full_flight_info,
+                'terminal': stripped_text(cells[2]),
+                'gate': stripped_text(cells[3]),
+                'city': stripped_text(city_small[0]) if city_small and code_strong else '',
+                'airport_code': stripped_text(code_strong[0]) if city_small and code_strong else '',
+                'full_destination': stripped_text(dest_cell),
+                'status': status,
+                'status_class': status_class,
+            }
+        except Exception as e:
+            print(f"解析行資料時發生錯誤: {e}")
+            return None
+    
     def get_all_gates(self, gates: List[str] = None) -> List[Dict]:
         """
         獲取多個登機門的資料
@@ -229,22 +416,111 @@ class TaoyuanAirportFlightScraper:
             gates: 登機門代號列表，如果為 None 則獲取 D11-D18 所有登機門
         
         Returns:
-            所有登機門的資料列表
+            所有登機門的資料列表（順序與 gates 相同）
         """
         if gates is None:
             gates = [f'D{i}' for i in range(11, 19)]
         
-        results = []
-        for gate in gates:
-            print(f"正在獲取 {gate} 的資料...")
-            data = self.get_flight_data(gate)
-            results.append(data)
-            
-            # 延遲以避免請求過快
-            if self.delay > 0:
-                time.sleep(self.delay)
+        # 最多 max_workers 個請求同時進行，速率由 rate_limiter 控制
+        workers = min(self.max_workers, len(gates))
+        if workers <= 1:
+            results = []
+            for gate in gates:
+                print(f"正在獲取 {gate} 的資料...")
+                results.append(self.get_flight_data(gate))
+            return results
         
-        return results
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for gate in gates:
+                print(f"正在獲取 {gate} 的資料...")
+                futures.append(executor.submit(self.get_flight_data, gate))
+            return [future.result() for future in futures]
+    
+    def sweep_gates(self, gates: List[str] = None) -> List[Dict]:
+        """
+        只下載一次未篩選的頁面（已列出 D11-D18 所有航班），解析一次後依登機門欄位在本地分組
+        （D11 包含 D11L、D11R）；頁面被截斷（有分頁、或列數達到 page_row_limit）、無法取得，
+        或有無法確定屬於哪個登機門的航班時，改為逐一請求各登機門
+        
+        Args:
+            gates: 登機門代號列表，如果為 None 則獲取 D11-D18 所有登機門
+        
+        Returns:
+            與 get_all_gates 相同格式的資料列表（順序與 gates 相同）
+        """
+        if gates is None:
+            gates = [f'D{i}' for i in range(11, 19)]
+        
+        print("正在獲取所有登機門的資料（單一請求）...")
+        try:
+            html = self._fetch_page(self.BASE_URL)
+            departure_data, arrival_data = self.parse_tables(html)
+            truncated = self._is_truncated(html, departure_data, arrival_data)
+        except Exception as e:
+            print(f"⚠️  無法取得未篩選的頁面: {e}，改為逐一請求各登機門")
+            return self.get_all_gates(gates)
+        
+        if truncated:
+            print("⚠️  未篩選的頁面不完整，改為逐一請求各登機門")
+            return self.get_all_gates(gates)
+        
+        departures = self._partition_by_gate(departure_data, gates)
+        arrivals = self._partition_by_gate(arrival_data, gates)
+        if departures is None or arrivals is None:
+            print("⚠️  有無法判斷登機門的航班，改為逐一請求各登機門")
+            return self.get_all_gates(gates)
+        return [self._build_result(gate, self.BASE_URL, departures[gate], arrivals[gate]) for gate in gates]
+    
+    @staticmethod
+    def _normalize_gate(gate) -> str:
+        return re.sub(r'\s+', '', str(gate or '')).upper()
+    
+    @staticmethod
+    def _gate_matches(gate: str, cell: str) -> bool:
+        """登機門欄位 cell 是否屬於 gate（D11 也包含 D11L、D11R 等加上字母後綴的登機門）"""
+        match = GATE_CELL.match(cell)
+        return match is not None and (cell == gate or match.group(1) == gate)
+    
+    def _partition_by_gate(self, table_data: Dict, gates: List[str]) -> Optional[Dict[str, Dict]]:
+        """
+        將未篩選頁面的航班依登機門分組（與 ?flight_search= 逐一請求的結果相同）
+        
+        搜尋是比對文字，航班的任何欄位含有登機門代號都會被列出；
+        有欄位含有代號、登機門欄位卻不屬於該登機門的航班（如 D1 與 D11、欄位為「D11/D12」）時，
+        無法確定逐一請求的結果，返回 None
+        
+        Returns:
+            {登機門: 表格資料}，或 None
+        """
+        by_gate = {gate: [] for gate in gates}
+        queries = [(gate, self._normalize_gate(gate)) for gate in gates]
+        for row in table_data['data']:
+            cell = self._normalize_gate(row.get('gate'))
+            text = ' '.join(value for value in row.values() if isinstance(value, str)).upper()
+            for gate, query in queries:
+                if self._gate_matches(query, cell):
+                    by_gate[gate].append(row)
+                elif query and query in text:
+                    return None
+        return {
+            gate: {'type': table_data['type'], 'headers': table_data['headers'],
+                   'data': rows, 'row_count': len(rows)}
+            for gate, rows in by_gate.items()
+        }
+    
+    def _is_truncated(self, html: str, departure_data: Dict, arrival_data: Dict) -> bool:
+        """未篩選的頁面是否可能沒有列出所有航班"""
+        # 沒有出發航班表格，頁面格式可能已變更
+        if 'row_count' not in departure_data:
+            return True
+        # 有分頁連結
+        if self.PAGINATION_PATTERN.search(html):
+            return True
+        # 列數達到已知的每頁上限
+        if self.page_row_limit:
+            return max(departure_data['row_count'], arrival_data.get('row_count', 0)) >= self.page_row_limit
+        return False
     
     def save_to_json(self, data: Dict, filename: str = None):
         """
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+每日航班 JSON 檔的寫入
+以「內容雜湊」（排除 updated_at 等每次都會變的欄位）判斷資料是否真的改變，
+只有改變的日期才重寫，並以暫存檔 + os.replace 原子性替換，
+避免每小時都產生新的 git 物件與後續的比對、上傳工作
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from flight_record import normalize_flight_record
+from git_blobs import git_blob_id
+
+# 每次執行都會變動、不代表資料改變的欄位
+VOLATILE_FIELDS = ('updated_at', 'last_updated')
+
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+DATE_FILE_PATTERN = re.compile(r'^flight-data-(\d{4}-\d{2}-\d{2})\.json$')
+
+
+def canonical_hash(data: Dict) -> str:
+    """
+    計算資料的標準化雜湊（排除 VOLATILE_FIELDS，key 排序、不含空白）
+
+    Args:
+        data: 每日航班資料（flight-data-YYYY-MM-DD.json 的內容）
+
+    Returns:
+        sha256 hex 字串
+    """
+    stable = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+    encoded = json.dumps(stable, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def comparison_hash(data: Dict) -> str:
+    """
+    計算「實質內容」雜湊：只包含 compare-data.py 比較的欄位
+    （摘要的班次數量，以及以 time + gate 識別、經 normalize_flight_record 標準化的航班），
+    因此與航班順序、共掛班號順序及 updated_at 等欄位無關；
+    兩份資料的雜湊相同即表示 compare-data.py 不會判定為有變化
+
+    Args:
+        data: 每日航班資料
+
+    Returns:
+        sha256 hex 字串
+    """
+    summary = data.get('summary') or {}
+    flights = {}
+    for flight in data.get('flights', []):
+        try:
+            # 與 compare_flights 相同：time + gate 為識別，重複時使用第一個
+            key = f"{str(flight.get('time', '')).strip()}_{str(flight.get('gate', '')).strip()}"
+            if key not in flights:
+                flights[key] = normalize_flight_record(flight)
+        except Exception:
+            continue
+    payload = [
+        [summary.get(name, 0) for name in ('total_flights', 'before_17:00', 'after_17:00')],
+        sorted(flights.items()),
+    ]
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def load_json(path: str) -> Optional[Dict]:
+    """讀取既有的 JSON 檔（不存在或無法解析則為 None）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def file_hash(path: str) -> Optional[str]:
+    """
+    讀取既有檔案並計算標準化雜湊
+
+    Returns:
+        sha256 hex 字串；檔案不存在或無法解析則為 None
+    """
+    data = load_json(path)
+    return None if data is None else canonical_hash(data)
+
+
+def atomic_write_json(path: str, data: Dict, compact: bool = False):
+    """寫入 JSON（先寫暫存檔再 os.replace，中斷時不會留下寫一半的檔案）"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def write_json_if_changed(path: str, data: Dict, previous_hash: Optional[str] = None,
+                          compact: bool = False) -> bool:
+    """
+    內容有變更時才寫入
+
+    Args:
+        path: 檔案路徑
+        data: 要寫入的資料
+        previous_hash: 既有檔案的雜湊（已知時可省去讀檔；None 則讀取檔案計算）
+        compact: 不縮排（給前端下載的彙總檔使用）
+
+    Returns:
+        是否有寫入
+    """
+    if previous_hash is None:
+        previous_hash = file_hash(path)
+    if previous_hash == canonical_hash(data):
+        return False
+    atomic_write_json(path, data, compact=compact)
+    return True
+
+
+class WriteReport:
+    """記錄寫入與略過的檔案"""
+
+    def __init__(self):
+        self.written: List[str] = []
+        self.skipped: List[str] = []
+
+    def record(self, name: str, written: bool):
+        (self.written if written else self.skipped).append(name)
+
+    def summary(self) -> str:
+        return f'寫入 {len(self.written)} 個、未變更略過 {len(self.skipped)} 個'
+
+
+def date_file_name(date_key: str) -> str:
+    return f'flight-data-{date_key}.json'
+
+
+def list_date_files(data_dir: str) -> Dict[str, str]:
+    """
+    列出資料目錄中的每日檔案
+
+    Returns:
+        {日期 key: 檔案路徑}，依日期排序
+    """
+    files = {}
+    for name in sorted(os.listdir(data_dir)):
+        match = DATE_FILE_PATTERN.match(name)
+        if match:
+            files[match.group(1)] = os.path.join(data_dir, name)
+    return files
+
+
+def load_index(data_dir: str) -> Dict:
+    """讀取 data/index.json（不存在或無法解析時回傳空索引）"""
+    try:
+        with open(os.path.join(data_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if isinstance(index.get('dates'), dict):
+            return index
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {'version': INDEX_VERSION, 'dates': {}}
+
+
+def build_index_entry(path: str, data: Dict, previous: Optional[Dict] = None,
+                      raw: Optional[bytes] = None) -> Dict:
+    """
+    建立單一日期的索引項目
+
+    Args:
+        path: 每日檔案路徑
+        data: 檔案內容
+        previous: 上一版索引中的項目（雜湊相同時沿用其 updated_at）
+        raw: 檔案的原始位元組（None 則重新讀取）
+
+    Returns:
+        {'file', 'hash', 'compare_hash', 'blob', 'total_flights', 'before_17:00', 'after_17:00',
+         'bytes', 'updated_at'}；blob 為檔案的 Git blob id，用來確認 compare_hash 對應的是哪個版本
+    """
+    if raw is None:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    digest = canonical_hash(data)
+    summary = data.get('summary', {})
+    flights = data.get('flights', [])
+    before = summary.get('before_17:00', sum(1 for f in flights if f.get('time', '') < '17:00'))
+
+    if previous and previous.get('hash') == digest:
+        updated_at = previous.get('updated_at')
+    else:
+        updated_at = data.get('updated_at') or data.get('last_updated') or datetime.now().isoformat()
+
+    return {
+        'file': os.path.basename(path),
+        'hash': digest,
+        'compare_hash': comparison_hash(data),
+        'blob': git_blob_id(raw),
+        'total_flights': summary.get('total_flights', len(flights)),
+        'before_17:00': before,
+        'after_17:00': summary.get('after_17:00', len(flights) - before),
+        'bytes': len(raw),
+        'updated_at': updated_at,
+    }
+
+
+def refresh_index(data_dir: str, changed: Optional[Iterable[str]] = None) -> Dict:
+    """
+    重新產生 data/index.json（列出所有日期的雜湊、班次數量、檔案大小與最後變更時間）；
+    沒有任何項目改變時不重寫
+
+    Args:
+        data_dir: 資料目錄
+        changed: 本次有寫入的日期 key；提供時只重新讀取這些日期與索引中沒有的日期，
+                 其餘沿用上一版索引（None 則重新讀取所有檔案）
+
+    Returns:
+        索引內容
+    """
+    previous = load_index(data_dir)['dates']
+    changed = None if changed is None else set(changed)
+    dates = {}
+    for date_key, path in list_date_files(data_dir).items():
+        entry = previous.get(date_key)
+        if changed is not None and date_key not in changed and entry and 'compare_hash' in entry:
+            dates[date_key] = entry
+            continue
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw.decode('utf-8'))
+        except (OSError, ValueError):
+            continue
+        dates[date_key] = build_index_entry(path, data, entry, raw=raw)
+
+    index = {
+        'version': INDEX_VERSION,
+        'total_dates': len(dates),
+        'first_date': min(dates) if dates else None,
+        'last_date': max(dates) if dates else None,
+        'dates': dates,
+        'updated_at': datetime.now().isoformat(),
+    }
+    write_json_if_changed(os.path.join(data_dir, INDEX_FILE), index)
+    return index
+
+
+if __name__ == '__main__':
+    # 手動重建索引：python3 flight_store.py [資料目錄]
+    import sys
+
+    default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data')
+    target_dir = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else default_dir)
+    result = refresh_index(target_dir)
+    print(f'✅ 已更新 {INDEX_FILE}：{result["total_dates"]} 個日期（{result["first_date"]} ~ {result["last_date"]}）')
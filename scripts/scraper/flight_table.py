@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+欄式（columnar）航班資料表
+每個欄位存成一個 array，字串欄位以字典編碼（只存整數 id），
+登機門篩選、共掛班號分組與每日統計都以整欄運算完成；
+有安裝 NumPy 時使用向量化運算，否則退回純 Python 迴圈（結果相同）
+"""
+
+import json
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 字典編碼的字串欄位
+STRING_COLUMNS = (
+    'terminal', 'type', 'airline_code', 'airline_name', 'flight_code',
+    'gate', 'airport_code', 'city', 'status', 'aircraft',
+)
+
+# organize_by_date 輸出的字串欄位（依輸出順序）
+ENTRY_COLUMNS = (
+    'gate', 'flight_code', 'airline_code', 'airline_name', 'type',
+    'airport_code', 'city', 'status', 'aircraft', 'terminal',
+)
+
+MINUTES_PER_DAY = 24 * 60
+CUTOFF_MINUTE = 17 * 60
+
+
+class StringTable:
+    """字串字典：字串 <-> 整數 id"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self.ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def lookup(self, values: Iterable[str]) -> List[int]:
+        """取得已存在字串的 id（不存在的略過）"""
+        return [self.ids[v] for v in values if v in self.ids]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class FlightTable:
+    """欄式航班資料表"""
+
+    def __init__(self):
+        self.strings = {name: StringTable() for name in STRING_COLUMNS}
+        self.columns = {name: array('I') for name in STRING_COLUMNS}
+        self.columns['date_ordinal'] = array('I')   # date.toordinal()
+        self.columns['minute'] = array('H')         # 當日第幾分鐘
+        self._writers = [
+            (self.columns[name].append, self.strings[name].ids, self.strings[name])
+            for name in STRING_COLUMNS
+        ]
+
+    def __len__(self):
+        return len(self.columns['minute'])
+
+    def append(self, date_ordinal: int, minute: int, **fields):
+        """新增一列（字串欄位以 keyword 傳入，未提供的視為空字串）"""
+        self.append_row(date_ordinal, minute, [fields.get(name, '') for name in STRING_COLUMNS])
+
+    def append_row(self, date_ordinal: int, minute: int, values: Sequence[str]):
+        """新增一列（字串欄位依 STRING_COLUMNS 順序傳入）"""
+        for (append, ids, table), value in zip(self._writers, values):
+            value_id = ids.get(value)
+            if value_id is None:
+                value_id = table.encode(value)
+            append(value_id)
+        self.columns['date_ordinal'].append(date_ordinal)
+        self.columns['minute'].append(minute)
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> 'FlightTable':
+        """
+        從 FlightRecord 建立（如 iter_flight_data 的輸出）
+
+        Args:
+            records: FlightRecord 的可迭代物件
+
+        Returns:
+            FlightTable
+        """
+        table = cls()
+        ordinals = {}
+        for record in records:
+            ordinal = ordinals.get(record.date_key)
+            if ordinal is None:
+                ordinal = ordinals[record.date_key] = date.fromisoformat(record.date_key).toordinal()
+            table.append_row(ordinal, record.minute, [getattr(record, name) for name in STRING_COLUMNS])
+        return table
+
+    @classmethod
+    def from_feed_lines(cls, lines: Iterable[str]) -> 'FlightTable':
+        """
+        從文字檔行直接建立（包含抵達與所有登機門，適合全機場分析）
+
+        Args:
+            lines: 文字檔行（格式：航廈,類型,航空公司代碼,航空公司名稱,航班號,登機門,日期,時間,...）
+
+        Returns:
+            FlightTable
+        """
+        table = cls()
+        ordinals = {}
+        for line in lines:
+            parts = [p.strip() for p in line.split(',')]
+            if len(parts) < 13:
+                continue
+            try:
+                ordinal = ordinals.get(parts[6])
+                if ordinal is None:
+                    year, month, day = map(int, parts[6].split('/'))
+                    ordinal = ordinals[parts[6]] = date(year, month, day).toordinal()
+                hour, minute = map(int, parts[7].split(':')[:2])
+            except ValueError:
+                continue
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                continue
+            # 依 STRING_COLUMNS 順序
+            table.append_row(ordinal, hour * 60 + minute, (
+                parts[0],
+                'departure' if parts[1] == 'D' else 'arrival',
+                parts[2],
+                parts[3],
+                f'{parts[2]}{parts[4]}'.strip(),
+                parts[5],
+                parts[10],
+                parts[11],
+                parts[13] if len(parts) > 13 else '',
+                parts[14] if len(parts) > 14 else '',
+            ))
+        return table
+
+    @classmethod
+    def from_date_files(cls, paths: Iterable[str]) -> 'FlightTable':
+        """
+        從已儲存的 flight-data-YYYY-MM-DD.json 建立（共掛班號也會展開成列，
+        因此可以重新分組）
+
+        Args:
+            paths: JSON 檔案路徑
+
+        Returns:
+            FlightTable
+        """
+        table = cls()
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            try:
+                ordinal = date.fromisoformat(data.get('date', '')).toordinal()
+            except ValueError:
+                continue
+            for flight in data.get('flights', []):
+                try:
+                    hour, minute = map(int, str(flight.get('time', '')).split(':')[:2])
+                except ValueError:
+                    continue
+                fields = {name: str(flight.get(name, '')) for name in STRING_COLUMNS}
+                table.append(ordinal, hour * 60 + minute, **fields)
+                for codeshare in flight.get('codeshare_flights', []):
+                    shared = dict(fields)
+                    shared.update({k: str(v) for k, v in codeshare.items() if k in fields})
+                    table.append(ordinal, hour * 60 + minute, **shared)
+        return table
+
+    # ------------------------------------------------------------------
+    # 欄位運算
+    # ------------------------------------------------------------------
+
+    def column(self, name: str):
+        """取得欄位（有 NumPy 時為 ndarray 的零複製視圖）"""
+        col = self.columns[name]
+        if np is not None:
+            return np.frombuffer(col, dtype=np.uint32 if col.typecode == 'I' else np.uint16)
+        return col
+
+    def select(self, gates: Optional[Sequence[str]] = None, types: Optional[Sequence[str]] = None) -> Sequence[int]:
+        """
+        依登機門與類型篩選
+
+        Args:
+            gates: 登機門列表（None 表示不篩選）
+            types: 類型列表，如 ['departure']（None 表示不篩選）
+
+        Returns:
+            符合條件的列索引（依原始順序）
+        """
+        filters = []
+        if gates is not None:
+            filters.append(('gate', self.strings['gate'].lookup(gates)))
+        if types is not None:
+            filters.append(('type', self.strings['type'].lookup(types)))
+
+        if np is not None:
+            mask = np.ones(len(self), dtype=bool)
+            for name, ids in filters:
+                mask &= np.isin(self.column(name), ids)
+            return np.flatnonzero(mask)
+
+        rows = range(len(self))
+        for name, ids in filters:
+            col = self.columns[name]
+            wanted = frozenset(ids)
+            rows = [i for i in rows if col[i] in wanted]
+        return list(rows)
+
+    def _group_keys(self, rows: Sequence[int]):
+        """每列的分組 key：(日期, 時間, 登機門) 合成一個整數"""
+        n_gates = max(len(self.strings['gate']), 1)
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            return (self.column('date_ordinal')[rows].astype(np.int64) * MINUTES_PER_DAY
+                    + self.column('minute')[rows]) * n_gates + self.column('gate')[rows]
+        ordinal, minute, gate = self.columns['date_ordinal'], self.columns['minute'], self.columns['gate']
+        return [(ordinal[i] * MINUTES_PER_DAY + minute[i]) * n_gates + gate[i] for i in rows]
+
+    def group_codeshares(self, rows: Sequence[int]):
+        """
+        以 (日期, 時間, 登機門) 分組共掛班號
+
+        Args:
+            rows: 要分組的列索引（依原始順序）
+
+        Returns:
+            (leaders, members)：leaders 為每組第一列的索引（依原始順序），
+            members 為 {leader: [其他列索引]}（依原始順序）
+        """
+        keys = self._group_keys(rows)
+
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            is_first = np.ones(len(order), dtype=bool)
+            is_first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            group_ids = np.cumsum(is_first) - 1
+            group_leaders = rows[order[is_first]]
+            members = {}
+            for pos in np.flatnonzero(~is_first):
+                members.setdefault(int(group_leaders[group_ids[pos]]), []).append(int(rows[order[pos]]))
+            return np.sort(group_leaders).tolist(), members
+
+        leader_by_key = {}
+        members = {}
+        for row, key in zip(rows, keys):
+            leader = leader_by_key.get(key)
+            if leader is None:
+                leader_by_key[key] = row
+            else:
+                members.setdefault(leader, []).append(row)
+        return sorted(leader_by_key.values()), members
+
+    def daily_summary(self, rows: Sequence[int]) -> Dict[str, Dict[str, int]]:
+        """
+        每日班次統計（依 17:00 分前後）
+
+        Args:
+            rows: 要統計的列索引（通常為 group_codeshares 的 leaders）
+
+        Returns:
+            {YYYY-MM-DD: {'total_flights', 'before_17:00', 'after_17:00'}}
+        """
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            ordinals = self.column('date_ordinal')[rows]
+            before = self.column('minute')[rows] < CUTOFF_MINUTE
+            days, inverse = np.unique(ordinals, return_inverse=True)
+            totals = np.bincount(inverse, minlength=len(days))
+            befores = np.bincount(inverse, weights=before, minlength=len(days)).astype(int)
+            counts = zip(days.tolist(), totals.tolist(), befores.tolist())
+        else:
+            acc = {}
+            ordinal_col, minute_col = self.columns['date_ordinal'], self.columns['minute']
+            for i in rows:
+                entry = acc.setdefault(ordinal_col[i], [0, 0])
+                entry[0] += 1
+                if minute_col[i] < CUTOFF_MINUTE:
+                    entry[1] += 1
+            counts = ((day, total, before) for day, (total, before) in sorted(acc.items()))
+
+        return {
+            date.fromordinal(day).isoformat(): {
+                'total_flights': total,
+                'before_17:00': before,
+                'after_17:00': total - before,
+            }
+            for day, total, before in counts
+        }
+
+    def take(self, name: str, rows: Sequence[int]) -> List[int]:
+        """取得多列某欄位的原始值（整數）"""
+        if np is not None:
+            return self.column(name)[np.asarray(rows, dtype=np.int64)].tolist()
+        col = self.columns[name]
+        return [col[i] for i in rows]
+
+    def decode(self, name: str, rows: Sequence[int]) -> List[str]:
+        """取得多列某字串欄位的值"""
+        values = self.strings[name].values
+        if np is not None:
+            return np.asarray(values, dtype=object)[self.column(name)[np.asarray(rows, dtype=np.int64)]].tolist()
+        col = self.columns[name]
+        return [values[col[i]] for i in rows]
+
+    def value(self, name: str, row: int) -> str:
+        """取得某列某字串欄位的值"""
+        return self.strings[name].values[self.columns[name][row]]
+
+    def organize_by_date(self, gates: Optional[Sequence[str]] = None,
+                         types: Optional[Sequence[str]] = ('departure',)) -> Dict:
+        """
+        與 fetch-from-txt-api.py 的 organize_by_date 輸出相同格式
+        （篩選、分組、統計皆以欄位運算完成，只在組出最後的字典時逐列處理）
+
+        Args:
+            gates: 登機門列表（None 表示全部）
+            types: 類型列表（預設只取離境）
+
+        Returns:
+            按日期組織的資料字典
+        """
+        rows = self.select(gates=gates, types=types)
+        leaders, members = self.group_codeshares(rows)
+        summaries = self.daily_summary(leaders)
+
+        date_data = {
+            date_key: {
+                'flights': [],
+                'summary': {'before_17:00': s['before_17:00'], 'after_17:00': s['after_17:00']}
+            }
+            for date_key, s in summaries.items()
+        }
+
+        # 整欄解碼後再逐列組成字典（不逐格查字串表）
+        columns = {name: self.decode(name, leaders) for name in ENTRY_COLUMNS}
+        code_ids = self.columns['flight_code']
+        date_keys = {}
+        for row, ordinal, minute, *values in zip(leaders, self.take('date_ordinal', leaders),
+                                                  self.take('minute', leaders),
+                                                  *(columns[name] for name in ENTRY_COLUMNS)):
+            date_key = date_keys.get(ordinal)
+            if date_key is None:
+                date_key = date_keys[ordinal] = date.fromordinal(ordinal).isoformat()
+            time_display = f'{minute // 60:02d}:{minute % 60:02d}'
+            entry = {
+                'time': time_display,
+                'datetime': f'{date_key}T{time_display}:00',
+            }
+            entry.update(zip(ENTRY_COLUMNS, values))
+            entry['destination'] = f"{entry['city']} ({entry['airport_code']})".strip()
+
+            shared = members.get(row)
+            entry['codeshare_flights'] = [
+                {
+                    'flight_code': self.value('flight_code', member),
+                    'airline_code': self.value('airline_code', member),
+                    'airline_name': self.value('airline_name', member),
+                }
+                for member in shared
+                if code_ids[member] != code_ids[row]
+            ] if shared else []
+            date_data[date_key]['flights'].append(entry)
+
+        for data in date_data.values():
+            data['flights'].sort(key=lambda x: x['datetime'])
+        return date_data
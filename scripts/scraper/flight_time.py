@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+共用的日期時間解析（含快取）
+資料中不同的日期只有幾個、不同的時間也只有幾百個，
+因此以固定格式切片解析，並用 LRU 快取記住結果，避免每一列都跑 regex 與建立 datetime；
+快取命中次數可用 cache_stats() 查看
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+CACHE_SIZE = 4096
+
+# 非固定格式時的備用規則（與原本各腳本的 regex 相同）
+FEED_DATE_PATTERN = re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})')
+FEED_TIME_PATTERN = re.compile(r'(\d{1,2}):(\d{2}):(\d{2})')
+MONTH_DAY_TIME_PATTERN = re.compile(r'(\d{1,2})/(\d{1,2})\s*(\d{1,2}):(\d{2})')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_feed_date(date_str: str) -> Optional[Tuple[int, int, int]]:
+    """
+    解析文字檔的日期欄位（如 2026/01/31）
+
+    Returns:
+        (年, 月, 日)，格式不符則為 None（不檢查日期是否存在）
+    """
+    if len(date_str) == 10 and date_str[4] == '/' and date_str[7] == '/':
+        digits = date_str[:4] + date_str[5:7] + date_str[8:]
+        if digits.isdecimal():
+            return int(digits[:4]), int(digits[4:6]), int(digits[6:])
+    match = FEED_DATE_PATTERN.match(date_str)
+    if match:
+        year, month, day = map(int, match.groups())
+        return year, month, day
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_feed_time(time_str: str) -> Optional[Tuple[int, int]]:
+    """
+    解析文字檔的時間欄位（如 00:05:00）
+
+    Returns:
+        (時, 分)，格式不符則為 None（不檢查時間是否合法）
+    """
+    if len(time_str) == 8 and time_str[2] == ':' and time_str[5] == ':':
+        digits = time_str[:2] + time_str[3:5] + time_str[6:]
+        if digits.isdecimal():
+            return int(digits[:2]), int(digits[2:4])
+    match = FEED_TIME_PATTERN.match(time_str)
+    if match:
+        hour, minute, _ = map(int, match.groups())
+        return hour, minute
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_feed_datetime(date_str: str, time_str: str) -> Optional[Tuple[str, int]]:
+    """
+    解析文字檔的預定日期與時間
+
+    Args:
+        date_str: 日期，如 2026/01/31
+        time_str: 時間，如 00:05:00
+
+    Returns:
+        (日期 key YYYY-MM-DD, 當日第幾分鐘)，格式不符或日期時間不合法則為 None
+    """
+    date_parts = parse_feed_date(date_str)
+    time_parts = parse_feed_time(time_str)
+    if date_parts is None or time_parts is None:
+        return None
+    year, month, day = date_parts
+    hour, minute = time_parts
+    try:
+        # 驗證日期時間是否合法（不合法會拋出 ValueError）
+        datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+    return f'{year:04d}-{month:02d}-{day:02d}', hour * 60 + minute
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_month_day_time(time_str: str, current_year: int) -> Optional[datetime]:
+    """
+    解析 'M/D HH:MM' 格式（官方網站），並假設年份；
+    該年份不存在此日期（如 2/29）時改用下一年
+
+    Args:
+        time_str: 時間字串，如 '2/1 17:10'
+        current_year: 假設的年份
+
+    Returns:
+        datetime，無法解析則為 None
+    """
+    match = MONTH_DAY_TIME_PATTERN.match(time_str)
+    if match:
+        month, day, hour, minute = map(int, match.groups())
+        for year in (current_year, current_year + 1):
+            try:
+                return datetime(year, month, day, hour, minute)
+            except ValueError:
+                pass
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_display_time(time_str: str, current_year: int) -> Optional[datetime]:
+    """
+    解析航班列表的時間字串，如 '2/1 17:10' 或 '2/1 17:45(實際抵達: 17:45)'
+
+    Args:
+        time_str: 時間字串（括號後的實際時間會被忽略）
+        current_year: 使用的年份
+
+    Returns:
+        datetime，無法解析則為 None
+    """
+    time_str = time_str.strip()
+
+    # 如果有括號，提取括號前的時間
+    if '(' in time_str:
+        time_str = time_str.split('(')[0].strip()
+
+    parts = time_str.split()
+    if len(parts) < 2:
+        return None
+
+    date_parts = parts[0].split('/')    # "2/1" 或 "1/31"
+    time_parts = parts[1].split(':')    # "17:10"
+    if len(date_parts) != 2 or len(time_parts) != 2:
+        return None
+
+    try:
+        month, day = int(date_parts[0]), int(date_parts[1])
+        hour, minute = int(time_parts[0]), int(time_parts[1])
+        return datetime(current_year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+
+CACHED_PARSERS = {
+    'feed_date': parse_feed_date,
+    'feed_time': parse_feed_time,
+    'feed_datetime': parse_feed_datetime,
+    'month_day_time': parse_month_day_time,
+    'display_time': parse_display_time,
+}
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """
+    各解析函式的快取統計
+
+    Returns:
+        {名稱: {'hits', 'misses', 'size', 'hit_rate'}}，只包含有被呼叫過的函式
+    """
+    stats = {}
+    for name, parser in CACHED_PARSERS.items():
+        info = parser.cache_info()
+        calls = info.hits + info.misses
+        if calls:
+            stats[name] = {
+                'hits': info.hits,
+                'misses': info.misses,
+                'size': info.currsize,
+                'hit_rate': info.hits / calls,
+            }
+    return stats
+
+
+def format_cache_stats() -> str:
+    """快取統計的單行顯示，如 'feed_datetime 99.8% (12000/12024)'"""
+    return ', '.join(
+        f"{name} {s['hit_rate']:.1%} ({s['hits']}/{s['hits'] + s['misses']})"
+        for name, s in cache_stats().items()
+    )
+
+
+def clear_caches():
+    """清除所有快取與統計"""
+    for parser in CACHED_PARSERS.values():
+        parser.cache_clear()
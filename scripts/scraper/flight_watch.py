@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+常駐監看（flights.py watch）的輪詢排程與偵測延遲指標
+- PollSchedule：依接下來的出發航班密度調整輪詢間隔
+  （出發高峰前後縮短、夜間放寬、連續未更新（304）時逐步退避）
+- WatchMetrics：輪詢次數、未更新與錯誤次數，以及端對端偵測延遲
+  （資料來源發布新版（Last-Modified）到寫檔與上傳完成的秒數），寫入 data/.watch-metrics.json（本機執行指標，不納入版本控制，見 .gitignore）
+- watch_loop：與下載方式無關的輪詢迴圈（測試時可替換 poll、clock 與 sleep）
+"""
+
+import bisect
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from stress_slots import AIRPORT_TZ, departure_minute
+
+METRICS_FILE = '.watch-metrics.json'
+
+# 輪詢間隔（秒）
+MIN_INTERVAL = 60
+BASE_INTERVAL = 300
+MAX_INTERVAL = 1800
+# 連續未更新時每次乘上的倍數
+BACKOFF_FACTOR = 1.5
+# 接下來 BANK_WINDOW 分鐘內（含剛過去的 BANK_LOOKBACK 分鐘）至少 BANK_MIN_FLIGHTS 班出發，視為出發高峰
+BANK_WINDOW = 60
+BANK_LOOKBACK = 15
+BANK_MIN_FLIGHTS = 4
+# 夜間（機場當地時間，[開始, 結束) 小時）
+NIGHT_HOURS = (1, 5)
+# 延遲指標保留的樣本數
+LATENCY_SAMPLES = 200
+
+
+def airport_now() -> datetime:
+    """機場當地時間（UTC+8，不帶時區）"""
+    return datetime.now(AIRPORT_TZ).replace(tzinfo=None)
+
+
+def departure_times(outputs: Dict[str, Dict]) -> List[datetime]:
+    """
+    每日 JSON -> 排序後的出發時間（機場當地時間）
+
+    Args:
+        outputs: {日期 key: 每日 JSON 內容}
+    """
+    times = []
+    for date_key, data in outputs.items():
+        day_start = datetime.fromisoformat(date_key)
+        for flight in data.get('flights', []):
+            minute = departure_minute(date_key, flight)
+            if minute is not None:
+                times.append(day_start + timedelta(minutes=minute))
+    times.sort()
+    return times
+
+
+def source_timestamp(last_modified: Optional[str]) -> Optional[float]:
+    """Last-Modified 標頭 -> Unix 時間（無法解析則為 None）"""
+    if not last_modified:
+        return None
+    try:
+        return parsedate_to_datetime(last_modified).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class PollSchedule:
+    """自適應的輪詢間隔"""
+
+    def __init__(self, min_interval: float = MIN_INTERVAL, base_interval: float = BASE_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, backoff: float = BACKOFF_FACTOR):
+        """
+        初始化
+
+        Args:
+            min_interval: 出發高峰時的間隔
+            base_interval: 一般時段的間隔
+            max_interval: 夜間與退避的上限
+            backoff: 連續未更新時每次乘上的倍數
+        """
+        self.min_interval = min_interval
+        self.base_interval = max(base_interval, min_interval)
+        self.max_interval = max(max_interval, self.base_interval)
+        self.backoff = backoff
+        self.unchanged_streak = 0
+        self.departures: List[datetime] = []
+
+    def set_departures(self, departures: Iterable[datetime]):
+        """更新已知的出發時間（每次解析到新資料時呼叫）"""
+        self.departures = sorted(departures)
+
+    def record(self, changed: bool):
+        """記錄一次輪詢的結果；有新資料時重置退避"""
+        self.unchanged_streak = 0 if changed else self.unchanged_streak + 1
+
+    def flights_near(self, now: datetime) -> int:
+        """now 前後（出發高峰範圍內）的出發班次數"""
+        lo = bisect.bisect_left(self.departures, now - timedelta(minutes=BANK_LOOKBACK))
+        hi = bisect.bisect_right(self.departures, now + timedelta(minutes=BANK_WINDOW))
+        return hi - lo
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        """
+        下一次輪詢前等待的秒數
+
+        Args:
+            now: 機場當地時間（None 則使用目前時間）
+        """
+        now = now or airport_now()
+        if self.flights_near(now) >= BANK_MIN_FLIGHTS:
+            # 出發高峰：狀態變化頻繁，退避最多放寬到一般間隔
+            base, ceiling = self.min_interval, self.base_interval
+        elif NIGHT_HOURS[0] <= now.hour < NIGHT_HOURS[1]:
+            base, ceiling = self.max_interval, self.max_interval
+        else:
+            base, ceiling = self.base_interval, self.max_interval
+        return min(ceiling, base * (self.backoff ** self.unchanged_streak))
+
+
+class WatchMetrics:
+    """監看指標（data/.watch-metrics.json）"""
+
+    def __init__(self, path: Optional[str]):
+        """
+        初始化
+
+        Args:
+            path: 指標檔路徑；None 則只保留在記憶體中
+        """
+        self.path = path
+        self.polls = 0
+        self.changes = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.last_poll_at: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        self.latencies: List[float] = []
+
+    @classmethod
+    def for_data_dir(cls, data_dir: str) -> 'WatchMetrics':
+        return cls(os.path.join(data_dir, METRICS_FILE))
+
+    def record_poll(self, at: float, changed: bool, not_modified: bool = False, error: bool = False):
+        self.polls += 1
+        self.last_poll_at = at
+        if changed:
+            self.changes += 1
+            self.last_change_at = at
+        if not_modified:
+            self.not_modified += 1
+        if error:
+            self.errors += 1
+
+    def record_latency(self, seconds: float):
+        """記錄一次端對端偵測延遲"""
+        self.latencies.append(max(0.0, seconds))
+        del self.latencies[:-LATENCY_SAMPLES]
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> Dict:
+        latency = {
+            'samples': len(self.latencies),
+            'last': self.latencies[-1] if self.latencies else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': max(self.latencies) if self.latencies else None,
+        }
+        return {
+            'polls': self.polls,
+            'changes': self.changes,
+            'not_modified': self.not_modified,
+            'errors': self.errors,
+            'last_poll_at': _iso(self.last_poll_at),
+            'last_change_at': _iso(self.last_change_at),
+            'detection_latency_seconds': {k: round(v, 3) if isinstance(v, float) else v for k, v in latency.items()},
+        }
+
+    def save(self):
+        """寫入指標檔（原子性替換）"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, AIRPORT_TZ).isoformat() if timestamp else None
+
+
+class PollOutcome:
+    """一次輪詢的結果"""
+
+    def __init__(self, changed: bool = False, not_modified: bool = False,
+                 source_time: Optional[float] = None, outputs: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            changed: 是否有日期檔案內容變更（並已寫入、上傳）
+            not_modified: 資料來源未重新發布（304 或內容雜湊相同）
+            source_time: 資料來源發布這一版的時間（Last-Modified，Unix 時間）
+            outputs: 解析出的每日資料（用來更新出發時間）
+        """
+        self.changed = changed
+        self.not_modified = not_modified
+        self.source_time = source_time
+        self.outputs = outputs
+
+
+def watch_loop(poll: Callable[[], PollOutcome], schedule: PollSchedule, metrics: WatchMetrics,
+               max_polls: Optional[int] = None, clock: Callable[[], float] = time.time,
+               sleep: Callable[[float], None] = time.sleep,
+               now: Callable[[], datetime] = airport_now):
+    """
+    輪詢迴圈：每次輪詢後更新排程與指標，等待下一個間隔
+
+    偵測延遲 = 處理完成的時間 - 資料來源發布的時間；
+    沒有 Last-Modified 時改以上一次輪詢的時間估計（新版本在兩次輪詢之間發布）
+
+    Args:
+        poll: 執行一次 下載 → 寫檔 → 上傳，返回 PollOutcome
+        max_polls: 最多輪詢幾次（None 則不停止）
+    """
+    count = 0
+    while max_polls is None or count < max_polls:
+        previous_poll_at = metrics.last_poll_at
+        try:
+            outcome = poll()
+            error = False
+        except Exception as e:
+            print(f"❌ 輪詢失敗: {e}")
+            outcome, error = PollOutcome(), True
+        finished = clock()
+
+        if outcome.outputs:
+            schedule.set_departures(departure_times(outcome.outputs))
+        if outcome.changed:
+            published = outcome.source_time or previous_poll_at
+            if published is not None:
+                metrics.record_latency(finished - published)
+                print(f"⏱️  偵測延遲: {finished - published:.1f} 秒")
+        schedule.record(outcome.changed)
+        metrics.record_poll(finished, outcome.changed, outcome.not_modified, error)
+        metrics.save()
+
+        count += 1
+        if max_polls is not None and count >= max_polls:
+            break
+        interval = schedule.next_interval(now())
+        print(f"💤 {interval:.0f} 秒後再次檢查（連續 {schedule.unchanged_streak} 次無變更）")
+        sleep(interval)
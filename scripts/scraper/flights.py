@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+航班資料處理的統一入口
+
+子命令:
+    pipeline  在同一個行程中依序執行 下載 → 解析 → 組織 → 寫檔 → 上傳 → 比較；
+              解析後的每日資料與索引中的各日期雜湊直接在階段之間傳遞，
+              上傳與比較不需要重新讀取 data/ 中的檔案，也不必為每個階段重新啟動 Python
+    watch     常駐監看：保留 HTTP 連線、快取與上一次解析的資料，依出發高峰與夜間自動調整輪詢間隔，
+              只在日期檔案內容真的變更時寫檔並上傳；偵測延遲等指標寫入 data/.watch-metrics.json
+
+各階段仍可單獨執行：fetch-from-txt-api.py、save-to-firebase.py、compare-data.py
+
+使用:
+    python3 scripts/scraper/flights.py pipeline [--force] [--file 文字檔] [--no-upload]
+    python3 scripts/scraper/flights.py watch [--no-upload] [--min-interval 秒] [--max-interval 秒]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+# 添加當前目錄到路徑
+sys.path.insert(0, SCRIPT_DIR)
+
+from feed_cache import FeedCache
+from flight_store import date_file_name, list_date_files, load_json
+from flight_watch import (BASE_INTERVAL, MAX_INTERVAL, MIN_INTERVAL, PollOutcome, PollSchedule, WatchMetrics,
+                          airport_now, departure_times, source_timestamp, watch_loop)
+
+_loaded_scripts = {}
+
+
+def load_script(name: str, filename: str):
+    """導入檔名含連字符的腳本（各階段原本的入口；同一個行程中只載入一次）"""
+    if name not in _loaded_scripts:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded_scripts[name] = module
+    return _loaded_scripts[name]
+
+
+def upload_stage(data_dir: str, result, written: Dict[str, Dict]):
+    """
+    上傳階段：只讀取索引雜湊與上傳記錄不同的日期，本次寫入的日期直接使用記憶體中的內容
+    （失敗不影響後續的比較與提交）
+    """
+    save = load_script('save_to_firebase', 'save-to-firebase.py')
+    if not save.has_credentials():
+        print("⚠️  未設置 Firebase 環境變數，跳過 Firebase 存儲")
+        return
+    try:
+        save.save_to_firebase(None, Path(data_dir), documents=written, index=result.index)
+    except Exception as e:
+        print(f"⚠️  Firebase 存儲失敗（不影響後續步驟）: {e}")
+
+
+def compare_stage(repo_root: str, result, written: Dict[str, Dict]) -> int:
+    """
+    比較階段：只比較本次寫入的日期（其他日期的檔案沒有變動，與 Git 中的版本相同）
+
+    Returns:
+        有實質變化的文件數（比較失敗時視為 0，避免不必要的部署）
+    """
+    compare = load_script('compare_data', 'compare-data.py')
+    documents = {date_file_name(date_key): data for date_key, data in written.items()}
+    try:
+        results = compare.compare_documents(repo_root, documents, compare.index_by_file(result.index['dates']))
+        total_changes, _ = compare.report_results(results)
+    except Exception as e:
+        print(f"⚠️  比較失敗，視為無變化（避免不必要的部署）: {e}")
+        total_changes = 0
+    compare.write_compare_output(total_changes)
+    return total_changes
+
+
+def run_pipeline(args) -> int:
+    """
+    執行完整流程，並寫入 GitHub Actions 輸出
+    （feed_changed、files_written、files_skipped、has_changes、changed_count）
+
+    Returns:
+        退出碼：找不到任何航班或下載失敗時為 1，否則為 0
+    """
+    data_dir = os.path.join(REPO_ROOT, 'data')
+    fetch = load_script('fetch_from_txt_api', 'fetch-from-txt-api.py')
+
+    print("=" * 60)
+    print("📥 下載、解析、組織並寫入")
+    print("=" * 60)
+    result = fetch.run_fetch(data_dir, force=args.force, file=args.file)
+    if not result.feed_changed:
+        fetch.write_github_output(feed_changed='false', has_changes='false', changed_count=0)
+        return 0
+    if result.flight_count == 0:
+        return 1
+
+    report = result.write_report
+    fetch.write_github_output(feed_changed='true', files_written=len(report.written),
+                              files_skipped=len(report.skipped))
+    if not report.written:
+        print("\n⏭️  沒有任何日期檔案內容變更，跳過上傳與比較")
+        fetch.write_github_output(has_changes='false', changed_count=0)
+        return 0
+
+    written = {date_key: result.outputs[date_key] for date_key in report.written}
+    if args.upload:
+        print("\n" + "=" * 60)
+        print("☁️  上傳到 Firebase")
+        print("=" * 60)
+        upload_stage(data_dir, result, written)
+
+    print("\n" + "=" * 60)
+    print("🔍 比較實質變化")
+    print("=" * 60)
+    compare_stage(REPO_ROOT, result, written)
+    return 0
+
+
+def run_watch(args) -> int:
+    """
+    常駐監看：每次輪詢執行 下載 → 解析 → 寫檔 → 上傳（只在有變更時寫檔與上傳），
+    之後依 PollSchedule 等待下一次輪詢；Ctrl+C 停止
+    """
+    data_dir = os.path.join(REPO_ROOT, 'data')
+    fetch = load_script('fetch_from_txt_api', 'fetch-from-txt-api.py')
+
+    # 在輪詢之間保留：HTTP 連線（scraper.session）、條件式請求的快取、上一次解析的每日資料
+    scraper = fetch.TaoyuanAirportTxtAPIScraper()
+    cache = None if args.file else FeedCache(os.path.join(data_dir, '.feed-cache.json'))
+    state = {'outputs': {}}
+
+    schedule = PollSchedule(args.min_interval, args.base_interval, args.max_interval)
+    # 第一次輪詢就是 304 時，以既有檔案中今明兩天的航班估計出發高峰
+    today = airport_now().date()
+    date_files = list_date_files(data_dir)
+    recent = {}
+    for date_key in (today.isoformat(), (today + timedelta(days=1)).isoformat()):
+        data = load_json(date_files[date_key]) if date_key in date_files else None
+        if data:
+            recent[date_key] = data
+    schedule.set_departures(departure_times(recent))
+
+    def poll():
+        result = fetch.run_fetch(data_dir, file=args.file, scraper=scraper, cache=cache,
+                                 known_outputs=state['outputs'])
+        if not result.feed_changed:
+            return PollOutcome(not_modified=True)
+        if not result.outputs:
+            return PollOutcome()
+        state['outputs'] = result.outputs
+
+        written = {date_key: result.outputs[date_key] for date_key in result.write_report.written}
+        if written and args.upload:
+            upload_stage(data_dir, result, written)
+        if args.file:
+            source_time = os.path.getmtime(args.file)
+        else:
+            source_time = source_timestamp(scraper.last_modified)
+        return PollOutcome(changed=bool(written), source_time=source_time, outputs=result.outputs)
+
+    metrics = WatchMetrics.for_data_dir(data_dir)
+    print(f"👀 開始監看（間隔 {args.min_interval:.0f}–{args.max_interval:.0f} 秒，指標: {metrics.path}）")
+    try:
+        watch_loop(poll, schedule, metrics, max_polls=args.max_polls)
+    except KeyboardInterrupt:
+        print("\n👋 停止監看")
+    return 0
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='航班資料處理')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pipeline = subparsers.add_parser('pipeline', help='在同一個行程中執行 下載 → 寫檔 → 上傳 → 比較')
+    pipeline.add_argument('--force', action='store_true', help='忽略快取，強制重新下載並處理')
+    pipeline.add_argument('--file', help='改為讀取本地文字檔（串流解析，不使用快取）')
+    pipeline.add_argument('--no-upload', dest='upload', action='store_false', help='不上傳到 Firebase')
+    pipeline.set_defaults(handler=run_pipeline)
+
+    watch = subparsers.add_parser('watch', help='常駐監看，依出發高峰調整輪詢間隔，只在有變更時寫檔與上傳')
+    watch.add_argument('--file', help='改為監看本地文字檔（測試用）')
+    watch.add_argument('--no-upload', dest='upload', action='store_false', help='不上傳到 Firebase')
+    watch.add_argument('--min-interval', type=float, default=MIN_INTERVAL, help='出發高峰時的輪詢間隔（秒）')
+    watch.add_argument('--base-interval', type=float, default=BASE_INTERVAL, help='一般時段的輪詢間隔（秒）')
+    watch.add_argument('--max-interval', type=float, default=MAX_INTERVAL, help='夜間與退避的間隔上限（秒）')
+    watch.add_argument('--max-polls', type=int, help='輪詢幾次後結束（預設不停止）')
+    watch.set_defaults(handler=run_watch)
+
+    args = parser.parse_args()
+    try:
+        return args.handler(args)
+    except Exception as e:
+        print(f"\n❌ 錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
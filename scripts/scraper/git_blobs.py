@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+批次讀取 Git 中的舊版本檔案
+以一次 git ls-tree 取得所有檔案的 blob id，再透過單一常駐的 git cat-file --batch
+行程讀取內容，取代每個檔案各啟動一次 git show
+"""
+
+import hashlib
+import subprocess
+from typing import Dict, Optional
+
+
+def git_blob_id(content: bytes) -> str:
+    """計算內容的 Git blob id（與 git hash-object 相同）"""
+    return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+
+class GitBlobReader:
+    """讀取某個 commit（預設 HEAD）中的檔案內容"""
+
+    def __init__(self, repo_root: str, rev: str = 'HEAD', timeout: float = 30):
+        """
+        初始化
+
+        Args:
+            repo_root: Git 倉庫根目錄
+            rev: 要讀取的版本
+            timeout: git ls-tree 的逾時秒數
+        """
+        self.repo_root = repo_root
+        self.rev = rev
+        self.timeout = timeout
+        self._trees: Dict[str, Dict[str, str]] = {}
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def list_blobs(self, directory: str) -> Dict[str, str]:
+        """
+        列出目錄中的檔案（只執行一次 git ls-tree，結果會快取）
+
+        Args:
+            directory: 倉庫內的目錄，如 'data'
+
+        Returns:
+            {檔名: blob id}；版本不存在時為空字典
+        """
+        directory = directory.strip('/')
+        if directory not in self._trees:
+            result = subprocess.run(
+                ['git', 'ls-tree', '-z', self.rev, '--', f'{directory}/'],
+                capture_output=True,
+                cwd=self.repo_root,
+                timeout=self.timeout
+            )
+            blobs = {}
+            if result.returncode == 0:
+                for entry in result.stdout.split(b'\0'):
+                    if not entry:
+                        continue
+                    meta, _, path = entry.partition(b'\t')
+                    _, obj_type, blob_id = meta.split(b' ')
+                    if obj_type == b'blob':
+                        name = path.decode('utf-8').rsplit('/', 1)[-1]
+                        blobs[name] = blob_id.decode('ascii')
+            self._trees[directory] = blobs
+        return self._trees[directory]
+
+    def blob_id(self, path: str) -> Optional[str]:
+        """檔案在該版本中的 blob id（不存在則為 None）"""
+        directory, _, name = path.strip('/').rpartition('/')
+        return self.list_blobs(directory).get(name)
+
+    def read_blob(self, blob_id: str) -> Optional[bytes]:
+        """
+        透過 git cat-file --batch 讀取 blob 內容
+
+        Returns:
+            內容；物件不存在則為 None
+        """
+        process = self._batch_process()
+        process.stdin.write(f'{blob_id}\n'.encode('ascii'))
+        process.stdin.flush()
+
+        header = process.stdout.readline()
+        if not header:
+            raise RuntimeError('git cat-file --batch 已結束')
+        parts = header.split()
+        if len(parts) != 3:
+            # '<object> missing'
+            return None
+        size = int(parts[2])
+        content = process.stdout.read(size)
+        process.stdout.read(1)  # 內容後的換行
+        return content
+
+    def read(self, path: str) -> Optional[bytes]:
+        """
+        讀取檔案在該版本中的內容
+
+        Args:
+            path: 倉庫內的路徑，如 'data/flight-data-2026-02-01.json'
+
+        Returns:
+            內容；檔案不存在則為 None
+        """
+        blob_id = self.blob_id(path)
+        if blob_id is None:
+            return None
+        return self.read_blob(blob_id)
+
+    def _batch_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ['git', 'cat-file', '--batch'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd=self.repo_root
+            )
+        return self._process
+
+    def close(self):
+        """結束 git cat-file 行程"""
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+            self._process = None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+網頁爬蟲共用的 HTML 解析引擎
+- 'html.parser'：以 BeautifulSoup 解析整個頁面（原本的做法）
+- 'lxml'：以 BeautifulSoup + lxml 解析整個頁面
+- 'strainer'：BeautifulSoup 只為航班表格建立樹（SoupStrainer，有 lxml 時以 lxml 解析）
+- 'fast'：直接以 lxml 解析，用預先編譯的 XPath 取出表格與儲存格（不建立 BeautifulSoup 樹）；
+          沒有安裝 lxml 時改用 'strainer'
+
+預設使用 'html.parser'；其他引擎在模擬頁面上與它結果相同（見 test-html-parse.py），
+在以實際儲存的頁面確認之前，以環境變數 FLIGHT_HTML_PARSER 選用（如 FLIGHT_HTML_PARSER=fast）。
+效能比較見 bench-html-parse.py
+"""
+
+import os
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+HAS_LXML = etree is not None
+TREE_BUILDER = 'lxml' if HAS_LXML else 'html.parser'
+
+ENGINES = ('html.parser', 'lxml', 'strainer', 'fast')
+DEFAULT_ENGINE = os.environ.get('FLIGHT_HTML_PARSER') or 'html.parser'
+if DEFAULT_ENGINE not in ENGINES:
+    raise ValueError(f'FLIGHT_HTML_PARSER 不支援: {DEFAULT_ENGINE}（可用: {", ".join(ENGINES)}）')
+
+_HTML_PARSER = etree.HTMLParser(encoding='utf-8') if HAS_LXML else None
+# BeautifulSoup 的 get_text() 不包含 script、style、template、rt、rp 中的文字（註解本來就不是 text 節點）
+_TEXT_NODES = (etree.XPath('.//text()[not(parent::script or parent::style or parent::template'
+                           ' or parent::rt or parent::rp)]') if HAS_LXML else None)
+
+
+def uses_lxml_tree(engine: str) -> bool:
+    """engine 是否直接以 lxml 解析（否則使用 BeautifulSoup）"""
+    return engine == 'fast' and HAS_LXML
+
+
+def make_soup(html: str, engine: str = DEFAULT_ENGINE, only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    以 BeautifulSoup 解析 HTML
+
+    Args:
+        html: 頁面內容
+        engine: 'html.parser'、'lxml'、'strainer' 或 'fast'（沒有 lxml 時）
+        only: 'strainer'／'fast' 時只建立符合的元素（如 SoupStrainer('table')）；其他引擎忽略
+
+    Returns:
+        BeautifulSoup 物件
+    """
+    if engine in ('strainer', 'fast'):
+        return BeautifulSoup(html, TREE_BUILDER, parse_only=only)
+    if engine not in ENGINES:
+        raise ValueError(f'不支援的解析引擎: {engine}（可用: {", ".join(ENGINES)}）')
+    return BeautifulSoup(html, engine)
+
+
+def compile_xpath(expression: str):
+    """預先編譯 XPath（沒有 lxml 時返回 None）"""
+    return etree.XPath(expression) if HAS_LXML else None
+
+
+def lxml_root(html: str):
+    """以 lxml 解析 HTML，返回根元素（空白頁面返回 None）"""
+    if not html or not html.strip():
+        return None
+    return etree.fromstring(html.encode('utf-8'), _HTML_PARSER)
+
+
+def raw_text(element) -> str:
+    """與 BeautifulSoup 的 get_text() 相同：所有文字節點直接相連"""
+    return ''.join(_TEXT_NODES(element))
+
+
+def stripped_text(element) -> str:
+    """與 BeautifulSoup 的 get_text(strip=True) 相同：每段文字去除空白後相連"""
+    return ''.join(text.strip() for text in _TEXT_NODES(element))
+
+
+def header_cells(table) -> List:
+    """表格的表頭儲存格（thead 中的 th/td；沒有 thead 時為第一列；BeautifulSoup 元素）"""
+    head = table.find('thead')
+    row = head if head is not None else table.find('tr')
+    return row.find_all(['th', 'td']) if row is not None else []
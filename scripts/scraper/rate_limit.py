@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+依主機限制請求速率的 token bucket
+平均每秒最多 rate 個請求，允許最多 burst 個請求同時出發；
+多個執行緒共用同一個 bucket，取代每個請求之後固定的 time.sleep
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+# 爬蟲預設的 burst：同一主機一次只出發一個請求，其餘依速率排隊（與並行的執行緒數無關）
+DEFAULT_BURST = 1
+
+
+class TokenBucket:
+    """執行緒安全的 token bucket"""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        初始化
+
+        Args:
+            rate: 每秒補充的 token 數（平均請求速率上限）
+            burst: bucket 容量（最多同時出發的請求數）
+            clock: 單調時鐘（測試時可替換）
+            sleep: 等待函數（測試時可替換）
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        取得一個 token；不足時預約下一個 token 並在鎖外等待
+
+        Returns:
+            等待的秒數
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+            # token 為負數表示已被之前等待中的請求預約
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """每個主機各自一個 TokenBucket"""
+
+    def __init__(self, rate: Optional[float], burst: int = 1, **kwargs):
+        """
+        初始化
+
+        Args:
+            rate: 每個主機每秒最多幾個請求；None 或 0 表示不限制
+            burst: 每個主機最多同時出發的請求數
+            **kwargs: 傳給 TokenBucket 的 clock、sleep
+        """
+        self.rate = rate
+        self.burst = burst
+        self._kwargs = kwargs
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> Optional[TokenBucket]:
+        if not self.rate:
+            return None
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst, **self._kwargs)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """請求 url 之前呼叫；返回等待的秒數"""
+        bucket = self.bucket(url)
+        return bucket.acquire() if bucket else 0.0
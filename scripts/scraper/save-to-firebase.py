@@ -11,13 +11,13 @@ from pathlib import Path
 
 # 添加父目錄到路徑
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+# 添加當前目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent))
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-except ImportError:
-    print("❌ 請先安裝 firebase-admin: pip install firebase-admin")
-    sys.exit(1)
+from firestore_delta import document_delta, field_hashes, to_document
+from firestore_writer import DEFAULT_BATCH_SIZE, DEFAULT_MAX_IN_FLIGHT, FirestoreBatchWriter, estimate_size
+from flight_store import canonical_hash
+from sealed_days import SealedDays, date_of_file
 
 # Firebase 配置
 FIREBASE_CONFIG = {
@@ -33,21 +33,35 @@ FIREBASE_CONFIG = {
     "client_x509_cert_url": os.environ.get("FIREBASE_CLIENT_X509_CERT_URL")
 }
 
+def has_credentials():
+    """是否設置了 Firebase 環境變數（私鑰與服務帳號 email）"""
+    return all([
+        FIREBASE_CONFIG.get("private_key"),
+        FIREBASE_CONFIG.get("client_email")
+    ])
+
 def init_firebase():
-    """初始化 Firebase Admin SDK"""
+    """
+    初始化 Firebase Admin SDK
+    firebase_admin（連同 gRPC、protobuf）只在確認有憑證後才載入，
+    沒有設置環境變數時（fork、本地執行）不必付出載入 SDK 的時間
+    """
+    if not has_credentials():
+        print("⚠️  未設置 Firebase 環境變數，跳過 Firebase 存儲")
+        return None
+    
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+    except ImportError:
+        print("❌ 請先安裝 firebase-admin: pip install firebase-admin")
+        sys.exit(1)
+    
     try:
         # 檢查是否已經初始化
         firebase_admin.get_app()
         print("✅ Firebase 已經初始化")
     except ValueError:
-        # 如果沒有環境變數，嘗試使用默認憑證
-        if not all([
-            FIREBASE_CONFIG.get("private_key"),
-            FIREBASE_CONFIG.get("client_email")
-        ]):
-            print("⚠️  未設置 Firebase 環境變數，跳過 Firebase 存儲")
-            return None
-        
         try:
             cred = credentials.Certificate(FIREBASE_CONFIG)
             firebase_admin.initialize_app(cred)
@@ -59,6 +73,81 @@ def init_firebase():
     
     return firestore.client()
 
+COLLECTION_NAME = "flightData"
+
+# 每個日期最後一次成功上傳時的內容雜湊
+UPLOADED_FILE = '.firebase-uploaded.json'
+
+class UploadedHashes:
+    """
+    記錄每個日期最後一次成功上傳到 Firebase 時的內容雜湊與各欄位雜湊（以日期為 key 儲存於 JSON 狀態檔）
+    項目為 {'hash': 內容雜湊, 'fields': firestore_delta.field_hashes 的結果}；
+    已封存的日期只保留內容雜湊（字串）
+    """
+    
+    def __init__(self, path):
+        """
+        初始化
+        
+        Args:
+            path: 狀態檔路徑（如 data/.firebase-uploaded.json）
+        """
+        self.path = str(path)
+        self.hashes = self._load()
+        self._dirty = False
+    
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def digest(self, date_key):
+        """上次成功上傳時的內容雜湊"""
+        entry = self.hashes.get(date_key)
+        return entry.get('hash') if isinstance(entry, dict) else entry
+    
+    def fields(self, date_key):
+        """上次成功上傳時的各欄位雜湊（沒有記錄則為 None，需要完整寫入）"""
+        entry = self.hashes.get(date_key)
+        return entry.get('fields') if isinstance(entry, dict) else None
+    
+    def is_current(self, date_key, digest):
+        """內容雜湊是否與上次成功上傳時相同"""
+        return bool(digest) and self.digest(date_key) == digest
+    
+    def record(self, date_key, digest, fields=None):
+        """記錄成功上傳的內容雜湊與各欄位雜湊"""
+        entry = {'hash': digest, 'fields': fields} if fields is not None else digest
+        if self.hashes.get(date_key) != entry:
+            self.hashes[date_key] = entry
+            self._dirty = True
+    
+    def forget(self, date_key):
+        """移除記錄（下次會完整寫入）"""
+        if self.hashes.pop(date_key, None) is not None:
+            self._dirty = True
+    
+    def compact(self, date_keys):
+        """只保留這些日期的內容雜湊（已封存的日期不會再做差異更新）"""
+        for date_key in date_keys:
+            entry = self.hashes.get(date_key)
+            if isinstance(entry, dict):
+                self.hashes[date_key] = entry.get('hash')
+                self._dirty = True
+    
+    def save(self):
+        """有變更時寫入狀態檔（原子性替換）"""
+        if not self._dirty:
+            return
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hashes, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
 # 全局變數存儲 db 實例
 _db_instance = None
 
@@ -69,35 +158,27 @@ def get_db():
         _db_instance = init_firebase()
     return _db_instance
 
-def save_single_date_to_firebase(date_key, data):
-    """存儲單個日期的資料到 Firebase"""
-    db = get_db()
-    if not db:
-        return False
-    
-    try:
-        collection_name = "flightData"
-        
-        # 添加存儲時間戳
-        data["_stored_at"] = datetime.now().isoformat()
-        
-        # 存儲到 Firestore
-        doc_ref = db.collection(collection_name).document(date_key)
-        doc_ref.set(data, merge=True)
-        
-        print(f"✅ 已存儲到 Firebase: {date_key} ({data.get('summary', {}).get('total_flights', 0)} 班)")
-        return True
-    except Exception as e:
-        print(f"❌ Firebase 存儲失敗: {e}")
-        return False
+def save_to_firebase(db, data_dir, force=False, full_resync=False,
+                     batch_size=DEFAULT_BATCH_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                     documents=None, index=None):
+    """
+    將內容有變更的 JSON 檔案存儲到 Firebase
+    （與上次成功上傳時的內容雜湊比較，相同的日期不重新寫入；
+    有上次的欄位雜湊時只更新有變化的航班與欄位（見 firestore_delta），
+    以批次並行寫入，暫時性錯誤會自動重試）
 
-def save_to_firebase(db, data_dir):
-    """將 JSON 檔案存儲到 Firebase（讀取所有現有的 JSON 文件）"""
-    if not db:
-        return
-    
-    collection_name = "flightData"
+    Args:
+        db: Firestore client；None 則在確認有需要寫入的日期後才以 get_db() 連線
+        data_dir: 資料目錄
+        force: 連同已封存的日期一起比較
+        full_resync: 忽略上傳記錄與封存狀態，重新上傳所有日期
+        batch_size: 每個批次最多幾個日期
+        max_in_flight: 同時提交中的批次數量上限
+        documents: {日期 key: 每日 JSON 內容}，已在記憶體中的日期不重新讀檔（flights.py pipeline 使用）
+        index: 本次更新後的 index.json 內容；雜湊與上傳記錄相同的日期不讀檔直接略過
+    """
     saved_count = 0
+    unchanged_count = 0
     skipped_count = 0
     
     # 讀取 data 目錄中的所有 JSON 檔案
@@ -109,10 +190,40 @@ def save_to_firebase(db, data_dir):
     
     print(f"📁 找到 {len(json_files)} 個 JSON 檔案")
     
+    uploaded = UploadedHashes(Path(data_dir) / UPLOADED_FILE)
+    
+    # 已封存的日期不會再變動；上傳記錄與封存時的雜湊相同才略過，
+    # 封存前上傳失敗（或從未上傳）的日期仍要上傳
+    sealed_days = SealedDays.for_data_dir(str(data_dir))
+    if not (force or full_resync):
+        active_files, sealed_files = sealed_days.split_files(json_files)
+        retry_files = [f for f in sealed_files if not uploaded.is_current(
+            date_of_file(f.name), sealed_days.sealed_hash(date_of_file(f.name)))]
+        if len(sealed_files) > len(retry_files):
+            print(f"🔒 略過 {len(sealed_files) - len(retry_files)} 個已封存的日期（--force 可強制比較）")
+        if retry_files:
+            print(f"🔁 {len(retry_files)} 個已封存的日期尚未成功上傳，重新上傳")
+        keep = set(active_files) | set(retry_files)
+        json_files = [f for f in json_files if f in keep]
+    
+    pending = []
+    digests = {}
+    totals = {}
+    full_bytes = sent_bytes = 0
+    indexed = (index or {}).get('dates') or {}
     for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # 索引中的雜湊即內容雜湊（canonical_hash），與上傳記錄相同時不需要讀檔
+            file_date = date_of_file(json_file.name)
+            entry = indexed.get(file_date)
+            if entry and not full_resync and uploaded.is_current(file_date, entry.get('hash')):
+                unchanged_count += 1
+                continue
+            
+            data = (documents or {}).get(file_date)
+            if data is None:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             
             # 使用日期作為文檔 ID
             date_key = data.get("date")
@@ -120,22 +231,86 @@ def save_to_firebase(db, data_dir):
                 # 從檔案名稱提取日期
                 date_key = json_file.stem.replace("flight-data-", "")
             
-            if save_single_date_to_firebase(date_key, data):
-                saved_count += 1
+            # 內容與上次上傳時相同（不含 updated_at），不需要重新寫入
+            digest = canonical_hash(data)
+            if not full_resync and uploaded.is_current(date_key, digest):
+                unchanged_count += 1
+                continue
+            
+            # 航班改以 key 存放；有上次的欄位雜湊時只送出變化的欄位，否則整份取代
+            document = to_document(data)
+            fields = field_hashes(document)
+            delta = None if full_resync else document_delta(uploaded.fields(date_key), document)
+            if delta == {}:
+                # 只有不存入 Firestore 的欄位（如 formatted_display）有變化
+                uploaded.record(date_key, digest, fields)
+                unchanged_count += 1
+                continue
+            
+            # 添加存儲時間戳
+            stored_at = datetime.now().isoformat()
+            if delta is None:
+                document["_stored_at"] = stored_at
+                pending.append((date_key, document, 'set'))
             else:
-                skipped_count += 1
+                delta["_stored_at"] = stored_at
+                pending.append((date_key, delta, 'update'))
+            full_bytes += estimate_size(document)
+            sent_bytes += estimate_size(pending[-1][1])
+            digests[date_key] = (digest, fields)
+            totals[date_key] = data.get('summary', {}).get('total_flights', 0)
             
         except Exception as e:
             print(f"❌ 存儲 {json_file.name} 失敗: {e}")
             skipped_count += 1
     
+    def on_batch(date_keys, error):
+        # 只記錄成功上傳的日期；失敗的日期下次會重新上傳
+        for date_key in date_keys:
+            if error is None:
+                uploaded.record(date_key, *digests[date_key])
+                print(f"✅ 已存儲到 Firebase: {date_key} ({totals[date_key]} 班)")
+            else:
+                # 文件可能已不存在（update 失敗），下次改為完整寫入；同批的其他日期不受影響
+                uploaded.forget(date_key)
+                print(f"❌ Firebase 存儲失敗: {date_key}: {error}")
+    
+    try:
+        if pending and db is None:
+            db = get_db()
+            if not db:
+                print("⚠️  跳過 Firebase 存儲")
+                return
+        if pending:
+            writer = FirestoreBatchWriter(db, COLLECTION_NAME, batch_size=batch_size, max_in_flight=max_in_flight)
+            result = writer.write_all(pending, on_batch=on_batch)
+            saved_count += len(result.written)
+            skipped_count += len(result.failed)
+            print(f"📦 {result.batches} 個批次，重試 {result.retries} 次，分割失敗批次 {result.splits} 次，"
+                  f"{result.docs_per_sec:.1f} 份文件/秒")
+            print(f"📉 傳送 {sent_bytes / 1024:.1f} KB（完整文件共 {full_bytes / 1024:.1f} KB）")
+    finally:
+        uploaded.compact(sealed_days.dates)
+        uploaded.save()
+    
     print(f"\n✅ Firebase 存儲完成！")
     print(f"   - 成功存儲: {saved_count} 個日期")
+    if unchanged_count > 0:
+        print(f"   - 內容未變更: {unchanged_count} 個日期")
     if skipped_count > 0:
         print(f"   - 跳過/失敗: {skipped_count} 個日期")
 
 def main():
     """主函數"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='將航班資料存儲到 Firebase Firestore')
+    parser.add_argument('--force', action='store_true', help='連同已封存的日期一起比較')
+    parser.add_argument('--full-resync', action='store_true', help='忽略上傳記錄與封存狀態，重新上傳所有日期')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='每個批次最多幾個日期')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT, help='同時提交中的批次數量上限')
+    args = parser.parse_args()
+    
     # 獲取 data 目錄路徑
     script_dir = Path(__file__).parent.parent.parent
     data_dir = script_dir / "data"
@@ -144,14 +319,14 @@ def main():
         print(f"❌ 資料目錄不存在: {data_dir}")
         sys.exit(1)
     
-    # 初始化 Firebase
-    db = init_firebase()
+    # 沒有憑證時直接結束，不載入 Firebase SDK
+    if not has_credentials():
+        print("⚠️  未設置 Firebase 環境變數，跳過 Firebase 存儲")
+        return
     
-    # 存儲到 Firebase
-    if db:
-        save_to_firebase(db, data_dir)
-    else:
-        print("⚠️  跳過 Firebase 存儲")
+    # 存儲到 Firebase（有需要寫入的日期時才初始化 Firebase）
+    save_to_firebase(None, data_dir, force=args.force, full_resync=args.full_resync,
+                     batch_size=args.batch_size, max_in_flight=args.max_in_flight)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+已封存（不再變動）的日期
+文字檔 API 只涵蓋今天前後幾天；早於資料來源窗口的日期之後不會再被改寫，
+記錄在狀態檔中視為封存，讓 compare-data.py 與 save-to-firebase.py 直接略過，
+每次執行的成本只跟窗口內的日期數量有關，不會隨著歷史資料增加
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flight_store import DATE_FILE_PATTERN
+
+SEALED_FILE = '.sealed-days.json'
+
+
+def date_of_file(name: str) -> Optional[str]:
+    """'flight-data-2026-02-01.json' -> '2026-02-01'（不是每日檔案則為 None）"""
+    match = DATE_FILE_PATTERN.match(os.path.basename(str(name)))
+    return match.group(1) if match else None
+
+
+class SealedDays:
+    """已封存日期的狀態檔（data/.sealed-days.json）"""
+
+    def __init__(self, path: str):
+        """
+        初始化
+
+        Args:
+            path: 狀態檔路徑
+        """
+        self.path = path
+        state = self._load()
+        self.window = state.get('window') if isinstance(state.get('window'), dict) else {}
+        self.dates: Dict[str, Dict] = state.get('dates') if isinstance(state.get('dates'), dict) else {}
+        self._dirty = False
+
+    @classmethod
+    def for_data_dir(cls, data_dir: str) -> 'SealedDays':
+        return cls(os.path.join(data_dir, SEALED_FILE))
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def is_sealed(self, date_key: Optional[str]) -> bool:
+        return bool(date_key) and date_key in self.dates
+
+    def sealed_hash(self, date_key: Optional[str]) -> Optional[str]:
+        """封存時記錄的內容雜湊（未封存則為 None）"""
+        entry = self.dates.get(date_key)
+        return entry.get('hash') if isinstance(entry, dict) else None
+
+    def split_files(self, names: Iterable) -> Tuple[List, List]:
+        """
+        將每日檔案分為未封存與已封存兩組（保持原本的順序）
+
+        Args:
+            names: 檔名或 Path
+
+        Returns:
+            (未封存, 已封存)
+        """
+        active, sealed = [], []
+        for name in names:
+            (sealed if self.is_sealed(date_of_file(name)) else active).append(name)
+        return active, sealed
+
+    def update(self, window_dates: Iterable[str], index_dates: Dict[str, Dict],
+               rewritten: Iterable[str] = ()) -> Tuple[List[str], List[str]]:
+        """
+        依本次資料來源涵蓋的日期更新封存狀態
+
+        Args:
+            window_dates: 本次資料來源中出現的日期
+            index_dates: data/index.json 的 dates（封存時記錄當時的內容雜湊）
+            rewritten: 本次有寫入的日期（已封存的日期被改寫時解除封存）
+
+        Returns:
+            (新封存的日期, 解除封存的日期)
+        """
+        unsealed = sorted(d for d in set(rewritten) if self.dates.pop(d, None) is not None)
+
+        window_dates = sorted(window_dates)
+        sealed = []
+        if window_dates:
+            start, end = window_dates[0], window_dates[-1]
+            if self.window != {'start': start, 'end': end}:
+                self.window = {'start': start, 'end': end}
+                self._dirty = True
+            now = datetime.now().isoformat()
+            for date_key, entry in sorted(index_dates.items()):
+                if date_key < start and date_key not in self.dates:
+                    self.dates[date_key] = {'hash': entry.get('hash'), 'sealed_at': now}
+                    sealed.append(date_key)
+
+        if sealed or unsealed:
+            self._dirty = True
+        return sealed, unsealed
+
+    def save(self):
+        """有變更時寫入狀態檔（原子性替換）"""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'window': self.window, 'dates': self.dates}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+登機壓力時段（奶酥時刻）
+與前端 src/utils/flightData/stressSlots.js、gateStressWeights.js 相同的計算：
+起飛前 [60, 30] 分鐘視為登機壓力窗，與 60 分鐘觀察槽的重疊分鐘數 × 登機門權重計分，
+觀察槽起點每 15 分鐘一格；預先算好寫進每日 JSON，前端不必在每次載入時重算
+（各班別的高峰與離峰分開存放，前端的 peakShiftKey／lowShiftKey 可以任意組合，見 pick_stress_slots）
+（常數需與 JS 保持一致，見 test-stress-slots.py）
+"""
+
+import hashlib
+import json
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+STRESS_BEFORE_DEP_START_MIN = 60
+STRESS_BEFORE_DEP_END_MIN = 30
+STRESS_WINDOW_MINUTES = STRESS_BEFORE_DEP_START_MIN - STRESS_BEFORE_DEP_END_MIN
+SLOT_STEP_MIN = 15
+SLOT_MINUTES = 60
+TOP_SLOTS = 5
+
+# 候選 60 分槽「起點」範圍；last_start_min 為最後一段槽起點，槽覆蓋至 last_start_min + 60
+STRESS_SHIFT_PRESETS = {
+    'full': {'label': '全天', 'first_start_min': 5 * 60, 'last_start_min': 20 * 60},
+    'morning': {'label': '早班', 'first_start_min': 5 * 60, 'last_start_min': 12 * 60 + 30},
+    'evening': {'label': '晚班', 'first_start_min': 13 * 60 + 30, 'last_start_min': 20 * 60},
+}
+STRESS_SHIFT_ORDER = ('full', 'morning', 'evening')
+
+# 預設登機門權重：D13 最大；D12＝D14；D15；D16＝D17＝D18；D14–D18 含 L／R 與同號合併
+DEFAULT_GATE_STRESS_WEIGHTS = {
+    'D11': 0.9,
+    'D12': 2.7,
+    'D13': 4,
+    'D14': 2.7,
+    'D15': 2.4,
+    'D16': 2.0,
+    'D17': 2.0,
+    'D18': 2.0,
+    'D_OTHER': 1.2,
+    'OTHER': 1.0,
+}
+
+# 帶時區的 datetime 以機場當地時間（UTC+8）計算
+AIRPORT_TZ = timezone(timedelta(hours=8))
+
+_DATETIME_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})(?::(\d{2}))?')
+_TZ_SUFFIX_PATTERN = re.compile(r'[Zz]|[+-]\d{2}:?\d{2}$')
+_GATE_D14_18_PATTERN = re.compile(r'^D(1[4-8])(L|R)?$')
+
+
+def gate_to_stress_weight_key(gate) -> str:
+    """登機門 -> 權重 key（D11/D12/D13 含 L／R，D14–D18 同號合併，其他 D 門與非 D 門各一組）"""
+    g = '' if gate is None else str(gate).strip().upper()
+    if not g:
+        return 'OTHER'
+    for key in ('D11', 'D12', 'D13'):
+        if g in (key, f'{key}L', f'{key}R'):
+            return key
+    match = _GATE_D14_18_PATTERN.match(g)
+    if match:
+        return f'D{match.group(1)}'
+    if g.startswith('D'):
+        return 'D_OTHER'
+    return 'OTHER'
+
+
+def merge_gate_stress_weights(partial: Optional[Dict]) -> Dict[str, float]:
+    """以預設權重為底，只接受合法（非負數字）的覆寫值"""
+    weights = dict(DEFAULT_GATE_STRESS_WEIGHTS)
+    if isinstance(partial, dict):
+        for key in DEFAULT_GATE_STRESS_WEIGHTS:
+            value = partial.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value >= 0:
+                weights[key] = value
+    return weights
+
+
+def weights_version(weights: Dict[str, float]) -> str:
+    """
+    權重版本（權重內容的雜湊），讓前端可以判斷預先計算的結果是否適用目前的權重
+
+    Returns:
+        如 'v1-3f2a9c01'
+    """
+    encoded = json.dumps([weights[k] for k in DEFAULT_GATE_STRESS_WEIGHTS], separators=(',', ':'))
+    return f'v1-{hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:8]}'
+
+
+def is_stress_cancelled(flight: Dict) -> bool:
+    """已出發仍計入登機壓力，只排除取消"""
+    raw = flight.get('status') or ''
+    return 'CANCEL' in raw.upper() or '取消' in raw
+
+
+def departure_minute(date_key: str, flight: Dict) -> Optional[float]:
+    """
+    起飛時間相對於 date_key 當天 00:00 的分鐘數（跨日的航班會小於 0 或大於 1440）
+
+    Returns:
+        分鐘數，無法解析則為 None
+    """
+    day_start = datetime.fromisoformat(date_key)
+    raw = str(flight.get('datetime') or '').strip()
+    if raw:
+        dt = None
+        if _TZ_SUFFIX_PATTERN.search(raw):
+            try:
+                dt = datetime.fromisoformat(raw.replace('Z', '+00:00').replace('z', '+00:00'))
+                dt = dt.astimezone(AIRPORT_TZ).replace(tzinfo=None)
+            except ValueError:
+                dt = None
+        else:
+            match = _DATETIME_PATTERN.match(raw)
+            if match:
+                try:
+                    dt = datetime(*(int(v or 0) for v in match.groups()))
+                except ValueError:
+                    dt = None
+        if dt is not None:
+            return (dt - day_start).total_seconds() / 60
+
+    time_str = str(flight.get('time') or '')
+    if time_str and date_key:
+        parts = time_str.split(':')
+        try:
+            hour = int(parts[0])
+        except ValueError:
+            return None
+        try:
+            minute = int(parts[1]) if len(parts) > 1 else 0
+        except ValueError:
+            minute = 0
+        return hour * 60 + minute
+    return None
+
+
+def slot_starts(first_start_min: int, last_start_min: int, step: int = SLOT_STEP_MIN) -> List[int]:
+    return list(range(first_start_min, last_start_min + 1, step))
+
+
+def format_slot_range(start_min: int) -> str:
+    """起點分鐘數 -> 'HH:MM–HH:MM'"""
+    end = start_min + SLOT_MINUTES
+    return f'{start_min // 60:02d}:{start_min % 60:02d}–{end // 60:02d}:{end % 60:02d}'
+
+
+def score_slots(flights: List[Dict], date_key: str, starts: List[int],
+                weights: Dict[str, float]) -> List[Dict]:
+    """
+    計算每個觀察槽的壓力分數
+
+    Returns:
+        [{'start_min', 'score', 'flight_count', 'label'}]，與 starts 同順序
+    """
+    # 每個航班的壓力窗只需要算一次
+    windows = []
+    for flight in flights:
+        if is_stress_cancelled(flight):
+            continue
+        dep = departure_minute(date_key, flight)
+        if dep is None:
+            continue
+        weight = weights[gate_to_stress_weight_key(flight.get('gate'))]
+        windows.append((dep - STRESS_BEFORE_DEP_START_MIN, dep - STRESS_BEFORE_DEP_END_MIN, weight))
+
+    scored = []
+    for start in starts:
+        end = start + SLOT_MINUTES
+        score = 0
+        count = 0
+        for p0, p1, weight in windows:
+            overlap = min(p1, end) - max(p0, start)
+            if overlap <= 0:
+                continue
+            score += weight * (overlap / STRESS_WINDOW_MINUTES)
+            count += 1
+        scored.append({'start_min': start, 'score': score, 'flight_count': count,
+                       'label': format_slot_range(start)})
+    return scored
+
+
+def pick_top_disjoint_slots(scored: List[Dict], count: int, highest: bool) -> List[Dict]:
+    """依分數挑選互不重疊的觀察槽（同分時保留原本的時間順序）"""
+    ordered = sorted(scored, key=lambda item: item['score'], reverse=highest)
+    picked = []
+    for item in ordered:
+        if len(picked) >= count:
+            break
+        a0 = item['start_min']
+        a1 = a0 + SLOT_MINUTES
+        if all(a1 <= p['start_min'] or p['start_min'] + SLOT_MINUTES <= a0 for p in picked):
+            picked.append(item)
+    return picked
+
+
+def _rounded(slot: Dict) -> Dict:
+    return dict(slot, score=round(slot['score'], 4))
+
+
+def compute_stress_slots(flights: List[Dict], date_key: str,
+                         weights: Optional[Dict[str, float]] = None) -> Dict:
+    """
+    計算單日各班別的壓力曲線與高峰／離峰時段
+
+    Args:
+        flights: 當日航班（organize_by_date 的 flights）
+        date_key: 日期 YYYY-MM-DD
+        weights: 登機門權重（None 則使用預設值；只會採用合法的覆寫值）
+
+    Returns:
+        {'weights_version', 'step_min', 'slot_min', 'window': [60, 30],
+         'presets': {班別: {'first_start_min', 'last_start_min', 'scores', 'flight_counts', 'peak', 'low'}}}
+    """
+    weights = merge_gate_stress_weights(weights)
+    full = STRESS_SHIFT_PRESETS['full']
+    # 早班與晚班的槽起點都在全天範圍內，算一次全天即可
+    all_scored = {item['start_min']: item for item in
+                  score_slots(flights, date_key, slot_starts(full['first_start_min'], full['last_start_min']), weights)}
+
+    presets = {}
+    for key in STRESS_SHIFT_ORDER:
+        preset = STRESS_SHIFT_PRESETS[key]
+        starts = slot_starts(preset['first_start_min'], preset['last_start_min'])
+        scored = [all_scored[s] for s in starts]
+        presets[key] = {
+            'first_start_min': preset['first_start_min'],
+            'last_start_min': preset['last_start_min'],
+            # 分數四捨五入到小數 4 位（高峰／離峰以未四捨五入的分數挑選）
+            'scores': [round(item['score'], 4) for item in scored],
+            'flight_counts': [item['flight_count'] for item in scored],
+            'peak': [_rounded(s) for s in pick_top_disjoint_slots(scored, TOP_SLOTS, True)],
+            'low': [_rounded(s) for s in pick_top_disjoint_slots(scored, TOP_SLOTS, False)],
+        }
+
+    return {
+        'weights_version': weights_version(weights),
+        'step_min': SLOT_STEP_MIN,
+        'slot_min': SLOT_MINUTES,
+        'window': [STRESS_BEFORE_DEP_START_MIN, STRESS_BEFORE_DEP_END_MIN],
+        'presets': presets,
+    }
+
+
+def compute_stress_slots_day(flights: List[Dict], date_key: str, weights: Optional[Dict[str, float]] = None,
+                             peak_shift_key: str = 'full', low_shift_key: str = 'full') -> Dict:
+    """
+    與 JS computeStressSlotsDay 相同：高峰與離峰可以取自不同班別
+
+    Args:
+        flights: 當日航班
+        date_key: 日期 YYYY-MM-DD
+        weights: 登機門權重（None 則使用預設值）
+        peak_shift_key: 挑選高峰時段的班別（不認得的班別視為 'full'）
+        low_shift_key: 挑選離峰時段的班別（不認得的班別視為 'full'）
+
+    Returns:
+        {'peak': [...], 'low': [...]}
+    """
+    return pick_stress_slots(compute_stress_slots(flights, date_key, weights), peak_shift_key, low_shift_key)
+
+
+def pick_stress_slots(stress_slots: Dict, peak_shift_key: str = 'full', low_shift_key: str = 'full') -> Dict:
+    """
+    從預先計算的結果（compute_stress_slots）取出指定班別的高峰與離峰時段
+
+    Returns:
+        {'peak': [...], 'low': [...]}
+    """
+    presets = stress_slots['presets']
+    peak_key = peak_shift_key if peak_shift_key in presets else 'full'
+    low_key = low_shift_key if low_shift_key in presets else 'full'
+    return {'peak': presets[peak_key]['peak'], 'low': presets[low_key]['low']}
+
+
+def stress_slots_for_day(flights: List[Dict], date_key: str, previous: Optional[Dict] = None,
+                         weights: Optional[Dict[str, float]] = None) -> Dict:
+    """
+    計算單日壓力時段；既有檔案的航班與權重版本都相同時直接沿用上次的結果
+
+    Args:
+        flights: 當日航班
+        date_key: 日期 YYYY-MM-DD
+        previous: 既有的每日 JSON 內容（沒有則為 None）
+        weights: 登機門權重（None 則使用預設值）
+
+    Returns:
+        compute_stress_slots 的結果
+    """
+    version = weights_version(merge_gate_stress_weights(weights))
+    if previous:
+        cached = previous.get('stress_slots')
+        if (isinstance(cached, dict) and cached.get('weights_version') == version
+                and previous.get('flights') == flights):
+            return cached
+    return compute_stress_slots(flights, date_key, weights)
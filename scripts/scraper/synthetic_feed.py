@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+產生模擬的 a_flight_v4.txt 全機場文字檔
+供測試與效能評估使用（不需連網，結果可重現）
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+AIRLINES = [
+    ('BR', '長榮航空'), ('CI', '中華航空'), ('JX', '星宇航空'), ('AE', '華信航空'),
+    ('B7', '立榮航空'), ('IT', '台灣虎航'), ('CX', '國泰航空'), ('NH', '全日本空輸'),
+    ('JL', '日本航空'), ('KE', '大韓航空'), ('OZ', '韓亞航空'), ('TG', '泰國航空'),
+    ('SQ', '新加坡航空'), ('MH', '馬來西亞航空'), ('VN', '越南航空'), ('NZ', '紐西蘭航空'),
+]
+
+DESTINATIONS = [
+    ('NRT', 'Tokyo Narita', '東京成田'), ('KIX', 'Osaka Kansai', '大阪關西'),
+    ('ICN', 'Seoul Incheon', '首爾仁川'), ('HKG', 'Hong Kong', '香港'),
+    ('BKK', 'Bangkok', '曼谷'), ('SIN', 'Singapore', '新加坡'),
+    ('CGK', 'Jakarta', '雅加達'), ('MNL', 'Manila', '馬尼拉'),
+    ('LAX', 'Los Angeles', '洛杉磯'), ('SFO', 'San Francisco', '舊金山'),
+    ('FUK', 'Fukuoka', '福岡'), ('OKA', 'Okinawa', '沖繩'),
+]
+
+STATUSES = ['準時ON TIME', '出發DEPARTED', '抵達ARRIVED', '延誤DELAY', '取消CANCELLED', '登機BOARDING']
+AIRCRAFT = ['B787-10', 'A321-252', 'A350-900', 'B777-300ER', 'A330-300', 'A321neo']
+
+# 全機場登機門（A/B/C/D 區，D 區含 R 門）
+ALL_GATES = (
+    [f'A{i}' for i in range(1, 10)] +
+    [f'B{i}' for i in range(1, 10)] +
+    [f'C{i}' for i in range(1, 11)] +
+    [f'D{i}' for i in range(1, 19)] +
+    [f'D{i}R' for i in range(11, 19)]
+)
+
+
+def build_feed_lines(rows: int, target_ratio: float = 0.05, days: int = 3,
+                     start: datetime = datetime(2026, 2, 1), seed: int = 42) -> List[str]:
+    """
+    產生模擬的文字檔行
+
+    Args:
+        rows: 總行數
+        target_ratio: 落在 D11-D18 / D11R-D18R 的離境航班比例（其餘為抵達或其他登機門）
+        days: 涵蓋的天數
+        start: 第一天
+        seed: 亂數種子
+
+    Returns:
+        文字行列表（不含換行字元）
+    """
+    rng = random.Random(seed)
+    target_gates = [f'D{i}' for i in range(11, 19)] + [f'D{i}R' for i in range(11, 19)]
+    other_gates = [g for g in ALL_GATES if g not in target_gates]
+
+    lines = []
+    for _ in range(rows):
+        if rng.random() < target_ratio:
+            flight_type, gate = 'D', rng.choice(target_gates)
+        else:
+            flight_type = rng.choice('AD')
+            gate = rng.choice(other_gates if flight_type == 'D' else ALL_GATES)
+
+        code, name = rng.choice(AIRLINES)
+        airport, city_en, city_zh = rng.choice(DESTINATIONS)
+        dt = start + timedelta(days=rng.randrange(days), minutes=5 * rng.randrange(288))
+        actual = dt + timedelta(minutes=5 * rng.randrange(6))
+
+        lines.append(','.join([
+            rng.choice('12'),
+            flight_type,
+            code,
+            name,
+            str(rng.randrange(1, 999)),
+            gate,
+            dt.strftime('%Y/%m/%d'),
+            dt.strftime('%H:%M:%S'),
+            actual.strftime('%Y/%m/%d'),
+            actual.strftime('%H:%M:%S'),
+            airport,
+            city_en,
+            city_zh,
+            rng.choice(STATUSES),
+            rng.choice(AIRCRAFT),
+        ]))
+    return lines
+
+
+def build_feed_bytes(rows: int, encoding: str = 'big5', **kwargs) -> bytes:
+    """產生模擬的文字檔原始位元組（預設 Big5，與官方檔案相同）"""
+    return ('\r\n'.join(build_feed_lines(rows, **kwargs)) + '\r\n').encode(encoding)
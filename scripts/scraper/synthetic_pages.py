@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+產生模擬的航班網頁（yuann.tw 與桃園機場官網的表格結構）
+供測試與效能評估使用（不需連網，結果可重現）；
+表格之外附上導覽列、側欄與頁尾，模擬實際頁面中大部分內容都不是航班表格
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from synthetic_feed import AIRLINES, DESTINATIONS, STATUSES
+
+GATES = [f'D{i}' for i in range(11, 19)]
+
+
+def _page_chrome(rng: random.Random, links: int) -> Tuple[str, str]:
+    """表格前後的頁面內容（導覽列、文章列表、側欄、頁尾與 script）"""
+    nav = ''.join(f'<li class="menu-item"><a href="/p/{i}">選單項目 {i}</a></li>' for i in range(links))
+    posts = ''.join(
+        f'<article class="post"><h2><a href="/post/{i}">文章標題 {i}</a></h2>'
+        f'<p>{"桃園機場航班資訊整理 " * rng.randrange(3, 8)}</p></article>'
+        for i in range(links // 2)
+    )
+    head = (f'<html><head><title>航班</title><script>var config = {{"a": 1}};</script></head><body>'
+            f'<header><nav><ul>{nav}</ul></nav></header><main>')
+    foot = (f'</main><aside>{posts}</aside><footer><ul>{nav}</ul>'
+            f'<script src="/wp-includes/js/jquery.js"></script></footer></body></html>')
+    return head, foot
+
+
+def _flights(rng: random.Random, rows: int, start: datetime):
+    for _ in range(rows):
+        code, name = rng.choice(AIRLINES)
+        airport, city_en, city_zh = rng.choice(DESTINATIONS)
+        dt = start + timedelta(minutes=5 * rng.randrange(288))
+        yield {
+            'time': dt.strftime('%m/%d %H:%M'),
+            'code': f'{code}{rng.randrange(1, 999)}',
+            'airline': name,
+            'gate': rng.choice(GATES),
+            'city': city_zh,
+            'airport': airport,
+            'status': rng.choice(STATUSES),
+        }
+
+
+def build_yuann_page(rows: int = 300, seed: int = 42, start: datetime = datetime(2026, 2, 1)) -> str:
+    """yuann.tw 未篩選的出發／抵達頁面（兩個 flight-table 表格）"""
+    rng = random.Random(seed)
+    head, foot = _page_chrome(rng, 120)
+
+    def table(title, flights):
+        body = ''.join(
+            f'<tr><td>{f["time"]}</td>'
+            f'<td><a href="https://www.flightradar24.com/data/flights/{f["code"]}">{f["code"]}</a> '
+            f'<span class="codeshare-name">({f["airline"]})</span></td>'
+            f'<td>T2-{rng.randrange(1, 20)}</td><td>{f["gate"]}</td>'
+            f'<td><strong>{f["airport"]}</strong> <small>{f["city"]}</small></td>'
+            f'<td><span class="flight-status status-{rng.randrange(5)}">{f["status"]}</span></td></tr>'
+            for f in flights
+        )
+        return (f'<table class="flight-table table-striped"><thead><tr>'
+                f'<th><a href="?orderby=time">{title}</a></th><th>航班</th><th>航廈-櫃台</th>'
+                f'<th>登機門</th><th>目的地</th><th>狀態</th></tr></thead><tbody>{body}</tbody></table>')
+
+    departures = list(_flights(rng, rows // 2, start))
+    arrivals = list(_flights(rng, rows - rows // 2, start))
+    return head + table('出發時間', departures) + table('抵達時間', arrivals) + foot
+
+
+def build_official_page(flight_type: str = 'departure', rows: int = 300, seed: int = 42,
+                        start: datetime = datetime(2026, 2, 1)) -> str:
+    """桃園機場官網的出發（flight_depart）或抵達（flight_arrive）頁面"""
+    rng = random.Random(seed)
+    head, foot = _page_chrome(rng, 150)
+    time_header, place_header = ('出發時間', '目的地') if flight_type == 'departure' else ('抵達時間', '出發地')
+    body = ''.join(
+        f'<tr><td>{f["time"]}</td><td>{f["code"]}</td><td>{f["airline"]}</td>'
+        f'<td>{f["city"]} {f["airport"]}</td><td>{f["gate"]}</td><td>{f["status"]}</td></tr>'
+        for f in _flights(rng, rows, start)
+    )
+    # 頁面上另有一個與航班無關的表格（如天氣）
+    weather = '<table class="weather"><tr><td>氣溫</td><td>18°C</td></tr></table>'
+    return (head + weather +
+            f'<table class="flight-list"><thead><tr><th>{time_header}</th><th>航班</th><th>航空公司</th>'
+            f'<th>{place_header}</th><th>登機門</th><th>狀態</th></tr></thead><tbody>{body}</tbody></table>' + foot)
@@ -5,28 +5,82 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 import json
+import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
-import re
 from collections import defaultdict
 
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_time import format_cache_stats, parse_month_day_time
+from html_parse import (DEFAULT_ENGINE, compile_xpath, header_cells, lxml_root, make_soup,
+                        raw_text, stripped_text, uses_lxml_tree)
+from rate_limit import DEFAULT_BURST, HostRateLimiter
+
+# API 端點檢查結果的快取檔（位於 data/）與有效時間（秒）
+ENDPOINT_CACHE_FILE = '.official-endpoints.json'
+ENDPOINT_CACHE_TTL = 24 * 60 * 60
+
+# 'strainer' 引擎只為表格建立樹
+TABLES = SoupStrainer('table')
+
+# 'fast' 引擎預先編譯的 XPath（與 BeautifulSoup 路徑的 find/find_all 對應）
+XP_TABLES = compile_xpath('//table')
+XP_THEAD = compile_xpath('(.//thead)[1]')
+XP_FIRST_ROW = compile_xpath('(.//tr)[1]')
+XP_ROWS = compile_xpath('.//tr')
+XP_CELLS = compile_xpath('.//*[self::th or self::td]')
+
 class TaoyuanAirportOfficialScraper:
     """桃園機場官方網站航班資料爬蟲"""
     
     BASE_URL = "https://www.taoyuan-airport.com"
     
-    def __init__(self, delay: float = 0.5):
+    POSSIBLE_ENDPOINTS = [
+        '/api/flight',
+        '/api/flights',
+        '/api/depart',
+        '/api/departure',
+        '/api/arrive',
+        '/api/arrival',
+        '/api/gate',
+        '/flight/api',
+        '/api/v1/flight',
+        '/rest/flight'
+    ]
+    
+    def __init__(self, delay: float = 0.5, parser: str = DEFAULT_ENGINE, max_workers: int = 8,
+                 burst: int = DEFAULT_BURST, endpoint_cache: Optional[str] = None,
+                 endpoint_cache_ttl: float = ENDPOINT_CACHE_TTL):
         """
         初始化爬蟲
         
         Args:
-            delay: 請求之間的延遲時間（秒），避免對伺服器造成負擔
+            delay: 同一主機平均每個請求的間隔（秒），避免對伺服器造成負擔；0 表示不限制
+            parser: HTML 解析引擎（'html.parser'、'lxml'、'strainer' 或 'fast'；預設見 html_parse.DEFAULT_ENGINE）
+            max_workers: get_all_gates 與 check_api_endpoints 同時進行的請求數上限
+            burst: 同一主機最多同時出發的請求數（預設 1；不隨 max_workers 增加）
+            endpoint_cache: API 端點檢查結果的快取檔路徑（None 表示不快取）
+            endpoint_cache_ttl: 快取的有效時間（秒）
         """
         self.delay = delay
+        self.parser = parser
+        self.max_workers = max(1, max_workers)
+        self.endpoint_cache = endpoint_cache
+        self.endpoint_cache_ttl = endpoint_cache_ttl
+        # 以 token bucket 限制請求速率（平均每 delay 秒一個），取代每個登機門之後固定的 sleep
+        self.rate_limiter = HostRateLimiter(1 / delay if delay > 0 else None, burst)
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -54,14 +108,10 @@ class TaoyuanAirportOfficialScraper:
             params['time'] = time_range
         
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self._get(url, params)
             
             # 提取表格資料
-            departure_data = self._extract_table_data(soup, 'departure')
+            departure_data = self.parse_flight_table(response.text, 'departure')
             
             return {
                 'timestamp': datetime.now().isoformat(),
@@ -101,14 +151,10 @@ class TaoyuanAirportOfficialScraper:
             params['time'] = time_range
         
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self._get(url, params)
             
             # 提取表格資料
-            arrival_data = self._extract_table_data(soup, 'arrival')
+            arrival_data = self.parse_flight_table(response.text, 'arrival')
             
             return {
                 'timestamp': datetime.now().isoformat(),
@@ -128,6 +174,75 @@ class TaoyuanAirportOfficialScraper:
                 'timestamp': datetime.now().isoformat()
             }
     
+    def _get(self, url: str, params: Dict):
+        """下載頁面（受 rate_limiter 限制）"""
+        self.rate_limiter.acquire(url)
+        response = self.session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        return response
+    
+    def get_all_gates(self, gates: List[str] = None) -> List[Dict]:
+        """
+        獲取多個登機門的出發與抵達航班
+        
+        所有登機門的出發與抵達請求一起分配給最多 max_workers 個執行緒，
+        速率由 rate_limiter 控制
+        
+        Args:
+            gates: 登機門代號列表，如果為 None 則獲取 D11-D18 所有登機門
+        
+        Returns:
+            所有登機門的資料列表（順序與 gates 相同）
+        """
+        if gates is None:
+            gates = [f'D{i}' for i in range(11, 19)]
+        
+        workers = min(self.max_workers, 2 * len(gates))
+        if workers <= 1:
+            return [self._combine(gate, self.get_departure_flights(gate), self.get_arrival_flights(gate))
+                    for gate in gates]
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(gate,
+                        executor.submit(self.get_departure_flights, gate),
+                        executor.submit(self.get_arrival_flights, gate))
+                       for gate in gates]
+            return [self._combine(gate, departure.result(), arrival.result())
+                    for gate, departure, arrival in futures]
+    
+    @staticmethod
+    def _combine(gate: str, departure_data: Dict, arrival_data: Dict) -> Dict:
+        """合併單一登機門的出發與抵達結果"""
+        combined_data = {
+            'gate': gate,
+            'departure': departure_data.get('departure', {}),
+            'arrival': arrival_data.get('arrival', {}),
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        if 'error' in departure_data:
+            combined_data['error'] = departure_data['error']
+        if 'error' in arrival_data:
+            combined_data['error'] = arrival_data.get('error', '')
+        
+        return combined_data
+    
+    def parse_flight_table(self, html: str, flight_type: str) -> Dict:
+        """
+        以 self.parser 解析頁面並提取航班表格資料
+        
+        Args:
+            html: 頁面內容
+            flight_type: 'departure' 或 'arrival'
+        
+        Returns:
+            包含表格資料的字典
+        """
+        if uses_lxml_tree(self.parser):
+            return self._extract_table_data_lxml(lxml_root(html), flight_type)
+        return self._extract_table_data(make_soup(html, self.parser, TABLES), flight_type)
+    
     def _extract_table_data(self, soup: BeautifulSoup, flight_type: str) -> Dict:
         """
         從 HTML 中提取表格資料
@@ -150,43 +265,78 @@ class TaoyuanAirportOfficialScraper:
             if 'flight' not in table_text and '航班' not in table_text:
                 continue
             
-            # 提取表頭
-            headers = []
-            header_row = table.find('thead')
-            if header_row:
-                header_cells = header_row.find_all(['th', 'td'])
-                headers = [cell.get_text(strip=True) for cell in header_cells]
-            else:
-                # 如果沒有 thead，嘗試從第一行獲取
-                first_row = table.find('tr')
-                if first_row:
-                    header_cells = first_row.find_all(['th', 'td'])
-                    headers = [cell.get_text(strip=True) for cell in header_cells]
+            # 提取表頭（沒有 thead 時從第一行獲取）
+            headers = [cell.get_text(strip=True) for cell in header_cells(table)]
             
             # 提取資料行
-            rows = table.find_all('tr')[1:] if header_row else table.find_all('tr')
+            rows = table.find_all('tr')[1:] if table.find('thead') else table.find_all('tr')
+            rows_text = ([cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])] for row in rows)
+            data.extend(self._rows_to_flights(headers, rows_text, flight_type))
+        
+        return {
+            'data': data,
+            'row_count': len(data)
+        }
+    
+    def _extract_table_data_lxml(self, root, flight_type: str) -> Dict:
+        """
+        從 HTML 中提取表格資料（'fast' 引擎，與 _extract_table_data 結果相同）
+        
+        Args:
+            root: lxml 根元素（空白頁面為 None）
+            flight_type: 'departure' 或 'arrival'
+        
+        Returns:
+            包含表格資料的字典
+        """
+        data = []
+        
+        for table in (XP_TABLES(root) if root is not None else []):
+            table_text = raw_text(table).lower()
+            if 'flight' not in table_text and '航班' not in table_text:
+                continue
             
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) < 2:  # 至少需要 2 個欄位
-                    continue
-                
-                row_data = {}
-                for i, cell in enumerate(cells):
-                    header = headers[i] if i < len(headers) else f'column_{i}'
-                    value = cell.get_text(strip=True)
-                    row_data[header] = value
-                
-                # 標準化欄位名稱
-                flight_info = self._normalize_flight_data(row_data, flight_type)
-                if flight_info:
-                    data.append(flight_info)
+            thead = XP_THEAD(table)
+            header_row = thead or XP_FIRST_ROW(table)
+            headers = [stripped_text(cell) for cell in XP_CELLS(header_row[0])] if header_row else []
+            
+            rows = XP_ROWS(table)[1:] if thead else XP_ROWS(table)
+            rows_text = ([stripped_text(cell) for cell in XP_CELLS(row)] for row in rows)
+            data.extend(self._rows_to_flights(headers, rows_text, flight_type))
         
         return {
             'data': data,
             'row_count': len(data)
         }
     
+    def _rows_to_flights(self, headers: List[str], rows_text, flight_type: str) -> List[Dict]:
+        """
+        將每一行的儲存格文字對應到表頭並標準化
+        
+        Args:
+            headers: 表頭文字
+            rows_text: 每一行的儲存格文字列表
+            flight_type: 'departure' 或 'arrival'
+        
+        Returns:
+            標準化後的航班資料列表
+        """
+        flights = []
+        for cells in rows_text:
+            if len(cells) < 2:  # 至少需要 2 個欄位
+                continue
+            
+            row_data = {}
+            for i, value in enumerate(cells):
+                header = headers[i] if i < len(headers) else f'column_{i}'
+                row_data[header] = value
+            
+            # 標準化欄位名稱
+            flight_info = self._normalize_flight_data(row_data, flight_type)
+            if flight_info:
+                flights.append(flight_info)
+        return flights
+    
     def _normalize_flight_data(self, row_data: Dict, flight_type: str) -> Optional[Dict]:
         """
         標準化航班資料格式
@@ -264,63 +414,78 @@ class TaoyuanAirportOfficialScraper:
             'status': status.strip()
         }
     
-    def check_api_endpoints(self) -> Dict:
+    def check_api_endpoints(self, refresh: bool = False) -> Dict:
         """
-        檢查可能的 API 端點
+        檢查可能的 API 端點（同時送出 HEAD 請求；有 endpoint_cache 時，有效期間內直接使用上次的結果）
+        
+        Args:
+            refresh: 忽略快取，重新檢查
         
         Returns:
-            包含找到的 API 端點的字典
+            包含找到的 API 端點的字典（cached 表示結果是否來自快取）
         """
-        endpoints = {
-            'found': [],
-            'tested': []
-        }
+        tested = [f"{self.BASE_URL}{endpoint}" for endpoint in self.POSSIBLE_ENDPOINTS]
         
-        possible_endpoints = [
-            '/api/flight',
-            '/api/flights',
-            '/api/depart',
-            '/api/departure',
-            '/api/arrive',
-            '/api/arrival',
-            '/api/gate',
-            '/flight/api',
-            '/api/v1/flight',
-            '/rest/flight'
-        ]
-        
-        for endpoint in possible_endpoints:
-            url = f"{self.BASE_URL}{endpoint}"
-            endpoints['tested'].append(url)
-            
-            try:
-                response = self.session.head(url, timeout=5, allow_redirects=False)
-                if response.status_code in [200, 405]:  # 405 表示端點存在但不支援 HEAD
-                    endpoints['found'].append({
-                        'url': url,
-                        'status': response.status_code
-                    })
-            except:
-                pass
+        if not refresh:
+            cached = self._load_endpoint_cache(tested)
+            if cached is not None:
+                return cached
+        
+        workers = min(self.max_workers, len(tested))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            statuses = list(executor.map(self._probe_endpoint, tested))
         
+        endpoints = {
+            'found': [
+                {'url': url, 'status': status}
+                for url, status in zip(tested, statuses)
+                if status in [200, 405]  # 405 表示端點存在但不支援 HEAD
+            ],
+            'tested': tested,
+            'checked_at': time.time(),
+            'cached': False
+        }
+        self._save_endpoint_cache(endpoints)
         return endpoints
+    
+    def _probe_endpoint(self, url: str) -> Optional[int]:
+        """以 HEAD 請求檢查端點，返回狀態碼（連線失敗時返回 None）"""
+        self.rate_limiter.acquire(url)
+        try:
+            return self.session.head(url, timeout=5, allow_redirects=False).status_code
+        except requests.RequestException:
+            return None
+    
+    def _load_endpoint_cache(self, tested: List[str]) -> Optional[Dict]:
+        """讀取仍在有效期間內、且檢查的端點相同的快取（否則返回 None）"""
+        if not self.endpoint_cache:
+            return None
+        try:
+            with open(self.endpoint_cache, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not isinstance(cached, dict) or cached.get('tested') != tested:
+            return None
+        if time.time() - cached.get('checked_at', 0) >= self.endpoint_cache_ttl:
+            return None
+        cached['cached'] = True
+        return cached
+    
+    def _save_endpoint_cache(self, endpoints: Dict):
+        """寫入快取檔（原子性替換）"""
+        if not self.endpoint_cache:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.endpoint_cache)), exist_ok=True)
+        tmp_path = f'{self.endpoint_cache}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({k: v for k, v in endpoints.items() if k != 'cached'}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.endpoint_cache)
 
 
 def parse_time(time_str: str, current_year: int) -> Optional[datetime]:
-    """解析時間字串，處理 'M/D HH:MM' 格式，並假設年份"""
-    match = re.match(r'(\d{1,2})/(\d{1,2})\s*(\d{1,2}):(\d{2})', time_str)
-    if match:
-        month, day, hour, minute = map(int, match.groups())
-        try:
-            dt = datetime(current_year, month, day, hour, minute)
-            return dt
-        except ValueError:
-            try:
-                dt = datetime(current_year + 1, month, day, hour, minute)
-                return dt
-            except ValueError:
-                pass
-    return None
+    """解析時間字串，處理 'M/D HH:MM' 格式，並假設年份（結果有快取）"""
+    return parse_month_day_time(time_str, current_year)
 
 
 def format_time_for_display(dt: datetime) -> str:
@@ -407,18 +572,19 @@ def organize_by_date(all_data: List[Dict]) -> Dict:
     return dict(date_data)
 
 
-if __name__ == '__main__':
-    import os
-    import sys
-    
+def main():
+    """檢查 API 端點，抓取 D11-D18 的出發與抵達航班並依日期儲存到 data/"""
     # 確保 data 目錄存在
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
     os.makedirs(data_dir, exist_ok=True)
     
-    scraper = TaoyuanAirportOfficialScraper(delay=0.5)
+    scraper = TaoyuanAirportOfficialScraper(delay=0.5, endpoint_cache=os.path.join(data_dir, ENDPOINT_CACHE_FILE))
     
     print('🔍 檢查桃園機場官方網站 API 端點...')
     api_endpoints = scraper.check_api_endpoints()
+    if api_endpoints['cached']:
+        checked_at = datetime.fromtimestamp(api_endpoints['checked_at']).strftime('%Y-%m-%d %H:%M')
+        print(f'   使用 {checked_at} 的檢查結果（快取）')
     print(f'   測試了 {len(api_endpoints["tested"])} 個可能的端點')
     if api_endpoints['found']:
         print(f'   ✅ 找到 {len(api_endpoints["found"])} 個可能的 API 端點:')
@@ -430,40 +596,19 @@ if __name__ == '__main__':
     print('\n📋 開始獲取 D11-D18 登機門的航班資料...\n')
     
     gates = [f'D{i}' for i in range(11, 19)]
-    all_data = []
+    # 所有登機門的出發與抵達請求同時進行（速率由 rate_limiter 控制）
+    all_data = scraper.get_all_gates(gates)
     
-    for gate in gates:
-        print(f'正在獲取 {gate} 的資料...', end=' ')
-        
-        # 獲取出發航班
-        departure_data = scraper.get_departure_flights(gate=gate)
-        
-        # 獲取抵達航班
-        arrival_data = scraper.get_arrival_flights(gate=gate)
-        
-        # 合併資料
-        combined_data = {
-            'gate': gate,
-            'departure': departure_data.get('departure', {}),
-            'arrival': arrival_data.get('arrival', {}),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        if 'error' in departure_data:
-            combined_data['error'] = departure_data['error']
-        if 'error' in arrival_data:
-            combined_data['error'] = arrival_data.get('error', '')
-        
-        all_data.append(combined_data)
-        
+    for combined_data in all_data:
         dep_count = len(combined_data['departure'].get('data', []))
         arr_count = len(combined_data['arrival'].get('data', []))
-        print(f'✅ 出發: {dep_count} 班, 抵達: {arr_count} 班')
-        
-        time.sleep(scraper.delay)
+        if 'error' in combined_data:
+            print(f'{combined_data["gate"]}: ⚠️  {combined_data["error"]}')
+        print(f'{combined_data["gate"]}: ✅ 出發: {dep_count} 班, 抵達: {arr_count} 班')
     
     print('\n📊 按日期組織資料...')
     date_data = organize_by_date(all_data)
+    print(f'   時間解析快取命中率: {format_cache_stats() or "無"}')
     
     # 儲存每個日期的資料
     for date_key, formatted_data in date_data.items():
@@ -504,3 +649,7 @@ if __name__ == '__main__':
         print(f'   - 17:00 後: {output["summary"]["after_17:00"]} 班')
     
     print('\n✅ 完成！所有資料已儲存到 data/ 目錄')
+
+
+if __name__ == '__main__':
+    main()
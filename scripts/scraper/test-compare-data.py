@@ -20,6 +20,7 @@ normalize_flight = compare_data.normalize_flight
 compare_flights = compare_data.compare_flights
 compare_summary = compare_data.compare_summary
 compare_data_files_content = compare_data.compare_data_files_content
+comparison_hash = compare_data.comparison_hash
 
 def test_normalize_flight():
     """測試 normalize_flight 函數"""
@@ -291,6 +292,124 @@ def test_real_data():
         print(f"❌ 讀取真實資料失敗: {e}")
         return False
 
+def test_comparison_hash_matches_compare():
+    """測試比較雜湊與逐班比較的結論一致"""
+    print("\n" + "=" * 60)
+    print("測試 7: 比較雜湊與逐班比較一致")
+    print("=" * 60)
+    
+    data_file = os.path.join(os.path.dirname(__file__), '../../data/flight-data-2026-02-01.json')
+    if not os.path.exists(data_file):
+        print(f"⚠️  測試資料文件不存在: {data_file}")
+        return True  # 跳過測試
+    
+    with open(data_file, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    
+    def mutated(change):
+        data = json.loads(json.dumps(base))
+        change(data)
+        return data
+    
+    def reverse_codeshares(data):
+        for flight in data['flights']:
+            flight['codeshare_flights'] = list(reversed(flight.get('codeshare_flights', [])))
+    
+    def set_status(data):
+        data['flights'][0]['status'] = '延誤DELAY'
+    
+    def drop_flight(data):
+        data['flights'].pop()
+    
+    def duplicate_key(data):
+        data['flights'].append(dict(data['flights'][0], status='取消CANCELLED'))
+    
+    cases = [
+        ('updated_at', lambda d: d.update(updated_at='2099-01-01T00:00:00'), False),
+        ('航班順序', lambda d: d['flights'].reverse(), False),
+        ('共掛班號順序', reverse_codeshares, False),
+        ('formatted_display', lambda d: d.update(formatted_display=[]), False),
+        ('重複的 time+gate', duplicate_key, False),
+        ('狀態', set_status, True),
+        ('移除航班', drop_flight, True),
+        ('摘要', lambda d: d['summary'].update({'after_17:00': -1}), True),
+    ]
+    
+    for label, change, expected in cases:
+        new_data = mutated(change)
+        has_changes, _ = compare_data_files_content(base, new_data)
+        hash_changed = comparison_hash(base) != comparison_hash(new_data)
+        if has_changes != expected or hash_changed != expected:
+            print(f"❌ {label}: 逐班比較 {has_changes}，雜湊比較 {hash_changed} (應該是 {expected})")
+            return False
+    
+    print(f"✅ {len(cases)} 種變化的判斷一致")
+    return True
+
+def test_jobs_matches_sequential():
+    """測試 --jobs 平行比較的輸出與逐一比較完全相同"""
+    print("\n" + "=" * 60)
+    print("測試 8: --jobs 平行比較")
+    print("=" * 60)
+    
+    import shutil
+    import subprocess
+    import tempfile
+    
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(script_dir, '../../data')
+    sources = sorted(f for f in os.listdir(data_dir) if f.startswith('flight-data-') and f.endswith('.json'))[:12]
+    if len(sources) < 6:
+        print("⚠️  測試資料不足，跳過")
+        return True
+    
+    with tempfile.TemporaryDirectory() as repo:
+        shutil.copytree(script_dir, os.path.join(repo, 'scripts', 'scraper'),
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        os.makedirs(os.path.join(repo, 'data'))
+        for name in sources:
+            shutil.copy(os.path.join(data_dir, name), os.path.join(repo, 'data', name))
+        git = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        subprocess.run(git + ['init', '-q'], cwd=repo, check=True)
+        subprocess.run(git + ['add', 'data'], cwd=repo, check=True)
+        subprocess.run(git + ['commit', '-q', '-m', 'data'], cwd=repo, check=True)
+        
+        # 修改部分檔案：狀態變化、移除航班、只改 updated_at、格式錯誤
+        def rewrite(name, change):
+            path = os.path.join(repo, 'data', name)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            change(data)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        
+        rewrite(sources[0], lambda d: d['flights'][0].update(status='延誤DELAY'))
+        rewrite(sources[2], lambda d: d['flights'].pop())
+        rewrite(sources[3], lambda d: d.update(updated_at='2099-01-01T00:00:00'))
+        with open(os.path.join(repo, 'data', sources[5]), 'w') as f:
+            f.write('{')
+        
+        results = []
+        for jobs in ('1', '3'):
+            output_path = os.path.join(repo, f'github-output-{jobs}')
+            env = dict(os.environ, GITHUB_OUTPUT=output_path)
+            proc = subprocess.run([sys.executable, 'scripts/scraper/compare-data.py', '--jobs', jobs],
+                                  cwd=repo, env=env, capture_output=True, text=True, timeout=120)
+            with open(output_path, 'r') as f:
+                results.append((proc.returncode, proc.stdout, f.read()))
+    
+    if results[0] != results[1]:
+        print("❌ --jobs 3 的輸出與逐一比較不同")
+        print(f"   逐一: {results[0]}")
+        print(f"   平行: {results[1]}")
+        return False
+    if results[0][0] != 0 or results[0][2] != "has_changes=true\nchanged_count=2\n":
+        print(f"❌ 比較結果不正確: exit={results[0][0]} {results[0][2]!r}")
+        return False
+    
+    print("✅ 平行比較的輸出、GITHUB_OUTPUT 與 exit code 都與逐一比較相同")
+    return True
+
 def main():
     """執行所有測試"""
     print("\n🧪 開始測試 compare-data.py 邏輯\n")
@@ -301,7 +420,9 @@ def main():
         test_compare_flights_status_change,
         test_compare_flights_codeshare_change,
         test_compare_summary,
-        test_real_data
+        test_real_data,
+        test_comparison_hash_matches_compare,
+        test_jobs_matches_sequential
     ]
     
     passed = 0
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+測試文字檔 API 的條件式下載與快取邏輯（不連網，使用假回應）
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 fetch-from-txt-api.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("fetch_from_txt_api", os.path.join(os.path.dirname(__file__), "fetch-from-txt-api.py"))
+fetch_from_txt_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_from_txt_api)
+
+from feed_cache import FeedCache
+
+TaoyuanAirportTxtAPIScraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper
+
+SAMPLE_FEED = (
+    "2,D,BR,長榮航空,178,D16,2026/02/01,06:30:00,2026/02/01,06:35:00,KIX,Osaka Kansai,大阪關西,出發DEPARTED,B787-10\n"
+    "2,A,JX,星宇航空,762,D11,2026/02/01,07:30:00,2026/02/01,07:30:00,CGK,Jakarta,雅加達,抵達ARRIVED,A321\n"
+).encode('big5', errors='replace')
+
+
+class FakeResponse:
+    """模擬 requests.Response"""
+
+    def __init__(self, status_code=200, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.encoding = None
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """記錄請求標頭並依序返回預設回應"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.headers = {}
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def make_scraper(responses):
+    scraper = TaoyuanAirportTxtAPIScraper()
+    scraper.session = FakeSession(responses)
+    return scraper
+
+
+def test_first_fetch_stages_and_commits():
+    """測試首次下載：無條件標頭，成功後寫入快取"""
+    print("=" * 60)
+    print("測試 1: 首次下載並寫入快取")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, '.feed-cache.json')
+        cache = FeedCache(cache_path)
+        scraper = make_scraper([FakeResponse(200, SAMPLE_FEED, {'ETag': '"abc"', 'Last-Modified': 'Sun, 01 Feb 2026 00:00:00 GMT'})])
+
+        text = scraper.fetch_flight_data(cache=cache)
+        if text is None or 'D16' not in text:
+            print("❌ 首次下載應返回文字內容")
+            return False
+        if scraper.session.requests[0]:
+            print(f"❌ 首次下載不應送出條件標頭: {scraper.session.requests[0]}")
+            return False
+        if os.path.exists(cache_path):
+            print("❌ commit() 之前不應寫入快取檔")
+            return False
+
+        cache.commit()
+        reloaded = FeedCache(cache_path).get(TaoyuanAirportTxtAPIScraper.TXT_API_URL)
+        if reloaded.get('etag') != '"abc"' or not reloaded.get('sha256') or reloaded.get('encoding') != 'big5':
+            print(f"❌ 快取內容錯誤: {reloaded}")
+            return False
+
+    print("✅ 首次下載與快取寫入正確")
+    return True
+
+
+def test_not_modified_short_circuits():
+    """測試 304 回應：送出條件標頭並返回 None"""
+    print("\n" + "=" * 60)
+    print("測試 2: 304 Not Modified")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, '.feed-cache.json')
+        cache = FeedCache(cache_path)
+        make_scraper([FakeResponse(200, SAMPLE_FEED, {'ETag': '"abc"', 'Last-Modified': 'Sun, 01 Feb 2026 00:00:00 GMT'})]).fetch_flight_data(cache=cache)
+        cache.commit()
+
+        cache = FeedCache(cache_path)
+        scraper = make_scraper([FakeResponse(304)])
+        if scraper.fetch_flight_data(cache=cache) is not None:
+            print("❌ 304 應返回 None")
+            return False
+
+        sent = scraper.session.requests[0]
+        if sent.get('If-None-Match') != '"abc"' or 'If-Modified-Since' not in sent:
+            print(f"❌ 條件標頭錯誤: {sent}")
+            return False
+
+    print("✅ 304 正確短路")
+    return True
+
+
+def test_same_hash_short_circuits():
+    """測試伺服器不支援條件請求時，以內容雜湊判斷未變更"""
+    print("\n" + "=" * 60)
+    print("測試 3: 內容雜湊相同")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, '.feed-cache.json')
+        cache = FeedCache(cache_path)
+        make_scraper([FakeResponse(200, SAMPLE_FEED)]).fetch_flight_data(cache=cache)
+        cache.commit()
+
+        cache = FeedCache(cache_path)
+        if make_scraper([FakeResponse(200, SAMPLE_FEED)]).fetch_flight_data(cache=cache) is not None:
+            print("❌ 內容相同應返回 None")
+            return False
+
+        changed = SAMPLE_FEED.replace(b'06:35:00', b'06:40:00')
+        if make_scraper([FakeResponse(200, changed)]).fetch_flight_data(cache=cache) is None:
+            print("❌ 內容改變時應返回文字")
+            return False
+
+    print("✅ 內容雜湊判斷正確")
+    return True
+
+
+def test_without_cache():
+    """測試不提供快取時維持原本行為"""
+    print("\n" + "=" * 60)
+    print("測試 4: 不使用快取")
+    print("=" * 60)
+
+    scraper = make_scraper([FakeResponse(200, SAMPLE_FEED, {'ETag': '"abc"'})])
+    text = scraper.fetch_flight_data()
+    if text is None or scraper.session.requests[0]:
+        print("❌ 不使用快取時應返回文字且不送出條件標頭")
+        return False
+
+    print("✅ 不使用快取時行為不變")
+    return True
+
+
+def test_stream_stages_digest():
+    """測試串流下載：讀取完畢後才暫存雜湊，304 時返回 None"""
+    print("\n" + "=" * 60)
+    print("測試 5: 串流下載與快取")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, '.feed-cache.json')
+        cache = FeedCache(cache_path)
+        url = TaoyuanAirportTxtAPIScraper.TXT_API_URL
+
+        scraper = make_scraper([FakeResponse(200, SAMPLE_FEED, {'ETag': '"abc"'})])
+        lines = scraper.fetch_flight_stream(cache=cache)
+        if scraper.last_digest is not None:
+            print("❌ 讀取完畢前不應有雜湊")
+            return False
+        if len(list(lines)) != 2 or cache.is_unchanged(url, scraper.last_digest):
+            print("❌ 首次串流應讀到 2 行且視為有變更")
+            return False
+        cache.commit()
+
+        scraper = make_scraper([FakeResponse(200, SAMPLE_FEED)])
+        list(scraper.fetch_flight_stream(cache=cache))
+        if not cache.is_unchanged(url, scraper.last_digest):
+            print("❌ 內容相同時應判斷為未變更")
+            return False
+
+        scraper = make_scraper([FakeResponse(304)])
+        if scraper.fetch_flight_stream(cache=FeedCache(cache_path)) is not None:
+            print("❌ 304 應返回 None")
+            return False
+        if scraper.session.requests[0].get('If-None-Match') != '"abc"':
+            print("❌ 串流請求未送出條件標頭")
+            return False
+
+    print("✅ 串流下載快取邏輯正確")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試文字檔快取邏輯\n")
+
+    tests = [
+        test_first_fetch_stages_and_commits,
+        test_not_modified_short_circuits,
+        test_same_hash_short_circuits,
+        test_without_cache,
+        test_stream_stages_digest
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
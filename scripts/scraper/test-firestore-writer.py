@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+測試批次、並行的 Firestore 寫入（不連線，使用 InMemoryFirestore）
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from firestore_delta import DELETE_FIELD, field_path, flights_by_key, split_field_path
+from firestore_writer import FirestoreBatchWriter, InMemoryFirestore, is_transient_error
+
+
+def make_docs(count, size=100):
+    return [(f'2026-02-{i:02d}', {'date': i, 'payload': 'x' * size}) for i in range(count)]
+
+
+def test_grouping():
+    """測試依數量與估計大小分組"""
+    print("=" * 60)
+    print("測試 1: 批次分組")
+    print("=" * 60)
+
+    writer = FirestoreBatchWriter(InMemoryFirestore(), 'flightData', batch_size=4, max_batch_bytes=1000)
+    by_count = writer.group(make_docs(10))
+    by_size = writer.group(make_docs(6, size=400))
+
+    if [len(b) for b in by_count] != [4, 4, 2]:
+        print(f"❌ 依數量分組錯誤: {[len(b) for b in by_count]}")
+        return False
+    if [len(b) for b in by_size] != [2, 2, 2]:
+        print(f"❌ 依大小分組錯誤: {[len(b) for b in by_size]}")
+        return False
+
+    print("✅ 分組正確")
+    return True
+
+
+def test_retry_transient_errors():
+    """測試暫時性錯誤以退避重試，永久性錯誤不重試，只讓出錯的文件失敗"""
+    print("\n" + "=" * 60)
+    print("測試 2: 重試")
+    print("=" * 60)
+
+    delays = []
+    client = InMemoryFirestore(fail_first=2)
+    writer = FirestoreBatchWriter(client, 'flightData', batch_size=10, backoff=1.0, sleep=delays.append)
+    result = writer.write_all(make_docs(5))
+
+    if result.failed or len(result.written) != 5 or result.retries != 2:
+        print(f"❌ 重試後應全部成功: written={len(result.written)} retries={result.retries}")
+        return False
+    # 第二次的等待時間約為第一次的兩倍（含 0.5–1.0 倍的抖動）
+    if not (0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0):
+        print(f"❌ 退避時間錯誤: {delays}")
+        return False
+
+    client = InMemoryFirestore(fail_ids=['2026-02-01'])
+    delays = []
+    writer = FirestoreBatchWriter(client, 'flightData', batch_size=2, max_in_flight=1, sleep=delays.append)
+    result = writer.write_all(make_docs(5))
+    if delays or sorted(result.failed) != ['2026-02-01'] or len(result.written) != 4 or result.splits != 1:
+        print(f"❌ 永久性錯誤處理錯誤: failed={sorted(result.failed)} delays={delays} splits={result.splits}")
+        return False
+
+    # 50 份文件一批，其中一份失敗：分割後其他 49 份照常寫入
+    client = InMemoryFirestore(fail_ids=['2026-02-37'])
+    batches = []
+    writer = FirestoreBatchWriter(client, 'flightData', batch_size=50, max_in_flight=1, sleep=delays.append)
+    result = writer.write_all(make_docs(50), on_batch=lambda ids, error: batches.append((len(ids), error)))
+    if list(result.failed) != ['2026-02-37'] or len(client.collections['flightData']) != 49 \
+            or sum(n for n, error in batches if error is None) != 49 or result.splits > 6:
+        print(f"❌ 應只有出錯的文件失敗: failed={list(result.failed)} splits={result.splits}")
+        return False
+    splits = result.splits
+
+    limited = FirestoreBatchWriter(InMemoryFirestore(fail_first=100), 'flightData', max_retries=3,
+                                   sleep=lambda s: None)
+    result = limited.write_all(make_docs(2))
+    if len(result.failed) != 2 or result.retries != 3:
+        print(f"❌ 超過重試次數應失敗: failed={len(result.failed)} retries={result.retries}")
+        return False
+
+    if not is_transient_error(ConnectionError()) or is_transient_error(ValueError()):
+        print("❌ 暫時性錯誤判斷錯誤")
+        return False
+
+    print(f"✅ 暫時性錯誤重試、永久性錯誤不重試；50 份一批時分割 {splits} 次找出失敗的文件")
+    return True
+
+
+class CountingFirestore(InMemoryFirestore):
+    """記錄同時提交中的批次數量"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+        self._count_lock = threading.Lock()
+
+    def _commit(self, writes):
+        with self._count_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            super()._commit(writes)
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+
+def test_bounded_concurrency():
+    """測試同時提交中的批次數量不超過 max_in_flight，所有文件都寫入"""
+    print("\n" + "=" * 60)
+    print("測試 3: 並行數上限")
+    print("=" * 60)
+
+    client = CountingFirestore(commit_latency=0.02)
+    writer = FirestoreBatchWriter(client, 'flightData', batch_size=5, max_in_flight=3)
+    docs = make_docs(40)
+    start = time.perf_counter()
+    result = writer.write_all(docs)
+    elapsed = time.perf_counter() - start
+
+    if sorted(result.written) != sorted(d for d, _ in docs) or len(client.collections['flightData']) != 40:
+        print("❌ 文件未全部寫入")
+        return False
+    if client.peak > 3 or client.peak < 2:
+        print(f"❌ 同時提交數量 {client.peak} 不在 2–3 之間")
+        return False
+
+    print(f"✅ 8 個批次、最多 {client.peak} 個同時提交，耗時 {elapsed * 1000:.0f} ms")
+    return True
+
+
+def test_update_paths():
+    """測試欄位路徑、航班 key 與 update 寫入"""
+    print("\n" + "=" * 60)
+    print("測試 4: 欄位路徑與 update")
+    print("=" * 60)
+
+    path = field_path('summary', 'before_17:00')
+    if path != 'summary.`before_17:00`' or split_field_path(path) != ['summary', 'before_17:00']:
+        print(f"❌ 欄位路徑錯誤: {path}")
+        return False
+
+    keys = list(flights_by_key([{'gate': 'D11', 'time': '05:30'}, {'gate': 'D11', 'time': '05:30'},
+                                {'gate': '', 'time': '07:00'}]))
+    if keys != ['D11_0530', 'D11_0530_2', '_0700']:
+        print(f"❌ 航班 key 錯誤: {keys}")
+        return False
+
+    client = InMemoryFirestore()
+    writer = FirestoreBatchWriter(client, 'flightData')
+    writer.write_all([('d', {'flights': {'D11_0530': {'status': 'A'}, 'D12_0600': {}}, 'summary': {'before_17:00': 2}}, 'set')])
+    result = writer.write_all([('d', {'flights.D11_0530': {'status': 'B'}, 'flights.D12_0600': DELETE_FIELD,
+                                      path: 1}, 'update'),
+                               ('missing', {'x': 1}, 'update')])
+    # 'missing' 與 'd' 在同一批次：'missing' 不存在使批次失敗，分割後 'd' 照常更新
+    document = client.collections['flightData']['d']
+    if list(result.failed) != ['missing'] or not isinstance(result.failed['missing'], InMemoryFirestore.NotFound) \
+            or 'missing' in client.collections['flightData']:
+        print(f"❌ 只有不存在的文件應失敗: {result.failed}")
+        return False
+    if result.written != ['d'] or document != {'flights': {'D11_0530': {'status': 'B'}}, 'summary': {'before_17:00': 1}}:
+        print(f"❌ update 結果錯誤: {document}")
+        return False
+
+    print("✅ 欄位路徑、航班 key 與 update 正確")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試 Firestore 批次寫入\n")
+
+    tests = [
+        test_grouping,
+        test_retry_transient_errors,
+        test_bounded_concurrency,
+        test_update_paths,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+測試 flight_store.py：只在內容變更時寫入每日 JSON 檔，以及資料索引與每月彙總檔
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_rollup import refresh_rollups, rollup_path
+from flight_store import INDEX_FILE, WriteReport, canonical_hash, refresh_index, write_json_if_changed
+
+
+def make_day(status='出發DEPARTED', updated_at='2026-02-01T10:00:00'):
+    return {
+        "date": "2026-02-01",
+        "flights": [{"time": "08:30", "gate": "D11", "flight_code": "BR178", "status": status}],
+        "summary": {"total_flights": 1, "before_17:00": 1, "after_17:00": 0},
+        "updated_at": updated_at
+    }
+
+
+def test_skip_when_only_volatile_fields_change():
+    """測試只有 updated_at 不同時不重寫檔案"""
+    print("=" * 60)
+    print("測試 1: 只有 updated_at 變更時略過")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'flight-data-2026-02-01.json')
+        if not write_json_if_changed(path, make_day()):
+            print("❌ 新檔案應該要寫入")
+            return False
+        mtime = os.stat(path).st_mtime_ns
+
+        if write_json_if_changed(path, make_day(updated_at='2026-02-01T11:00:00')):
+            print("❌ 只有 updated_at 變更不應寫入")
+            return False
+        with open(path, 'r', encoding='utf-8') as f:
+            if json.load(f)['updated_at'] != '2026-02-01T10:00:00':
+                print("❌ 原本的 updated_at 應保留")
+                return False
+        if os.stat(path).st_mtime_ns != mtime:
+            print("❌ 檔案不應被改動")
+            return False
+
+    print("✅ 未變更的檔案已略過")
+    return True
+
+
+def test_write_when_content_changes():
+    """測試內容變更時寫入，且不留下暫存檔"""
+    print("\n" + "=" * 60)
+    print("測試 2: 內容變更時原子性寫入")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'flight-data-2026-02-01.json')
+        report = WriteReport()
+        report.record('2026-02-01', write_json_if_changed(path, make_day()))
+        report.record('2026-02-01', write_json_if_changed(path, make_day(status='延誤DELAY')))
+        report.record('2026-02-01', write_json_if_changed(path, make_day(status='延誤DELAY')))
+
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved['flights'][0]['status'] != '延誤DELAY':
+            print("❌ 變更未寫入")
+            return False
+        if os.listdir(tmp) != ['flight-data-2026-02-01.json']:
+            print(f"❌ 留下多餘的檔案: {os.listdir(tmp)}")
+            return False
+        if len(report.written) != 2 or len(report.skipped) != 1:
+            print(f"❌ 統計錯誤: {report.summary()}")
+            return False
+
+    print(f"✅ {report.summary()}")
+    return True
+
+
+def test_hash_ignores_key_order():
+    """測試雜湊與 key 順序無關"""
+    print("\n" + "=" * 60)
+    print("測試 3: 標準化雜湊")
+    print("=" * 60)
+
+    day = make_day()
+    reordered = dict(reversed(list(day.items())))
+    if canonical_hash(day) != canonical_hash(reordered):
+        print("❌ key 順序不同時雜湊不應改變")
+        return False
+    if canonical_hash(day) == canonical_hash(make_day(status='取消CANCELLED')):
+        print("❌ 內容不同時雜湊應改變")
+        return False
+
+    print("✅ 雜湊正確")
+    return True
+
+
+def test_index_tracks_hashes_and_counts():
+    """測試 index.json 的內容與最後變更時間"""
+    print("\n" + "=" * 60)
+    print("測試 4: 資料索引")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'flight-data-2026-02-01.json')
+        write_json_if_changed(path, make_day())
+        with open(os.path.join(tmp, 'flight-data-summary.json'), 'w') as f:
+            json.dump({}, f)
+
+        index = refresh_index(tmp)
+        entry = index['dates'].get('2026-02-01')
+        if list(index['dates']) != ['2026-02-01']:
+            print(f"❌ 日期列表錯誤: {list(index['dates'])}")
+            return False
+        expected = {'hash': canonical_hash(make_day()), 'total_flights': 1, 'before_17:00': 1,
+                    'after_17:00': 0, 'bytes': os.path.getsize(path), 'updated_at': '2026-02-01T10:00:00'}
+        if any(entry[k] != v for k, v in expected.items()):
+            print(f"❌ 索引項目錯誤: {entry}")
+            return False
+
+        # 內容未變更：沿用最後變更時間，且索引檔不重寫
+        index_path = os.path.join(tmp, INDEX_FILE)
+        mtime = os.stat(index_path).st_mtime_ns
+        refresh_index(tmp, changed=[])
+        if os.stat(index_path).st_mtime_ns != mtime:
+            print("❌ 索引未變更時不應重寫")
+            return False
+
+        # 內容變更：更新雜湊與最後變更時間
+        write_json_if_changed(path, make_day(status='延誤DELAY', updated_at='2026-02-01T12:00:00'))
+        entry = refresh_index(tmp, changed=['2026-02-01'])['dates']['2026-02-01']
+        if entry['updated_at'] != '2026-02-01T12:00:00' or entry['hash'] == expected['hash']:
+            print(f"❌ 變更後索引未更新: {entry}")
+            return False
+
+    print("✅ 索引正確")
+    return True
+
+
+def test_rollups_rebuild_changed_months_only():
+    """測試每月彙總檔只重建有變更的月份"""
+    print("\n" + "=" * 60)
+    print("測試 5: 每月彙總檔")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for date_key in ('2026-02-01', '2026-02-02', '2026-03-01'):
+            day = make_day()
+            day['date'] = date_key
+            day['flights'].append({"time": "18:05", "gate": "D12", "flight_code": "CI100", "status": ""})
+            day['summary'] = {"total_flights": 2, "before_17:00": 1, "after_17:00": 1}
+            write_json_if_changed(os.path.join(tmp, f'flight-data-{date_key}.json'), day)
+
+        if refresh_rollups(tmp) != ['2026-02', '2026-03']:
+            print("❌ 應產生兩個月份")
+            return False
+        with open(rollup_path(tmp, '2026-02'), 'r', encoding='utf-8') as f:
+            february = json.load(f)
+        summary = february['summary']
+        if summary['total_days'] != 2 or summary['total_flights'] != 4 or summary['after_17:00'] != 2:
+            print(f"❌ 月統計錯誤: {summary}")
+            return False
+        if summary['hourly'][8] != 2 or summary['hourly'][18] != 2 or sum(summary['hourly']) != 4:
+            print(f"❌ 每小時統計錯誤: {summary['hourly']}")
+            return False
+        if february['days']['2026-02-01']['flights'][0]['flight_code'] != 'BR178':
+            print("❌ 精簡航班列表錯誤")
+            return False
+
+        march_mtime = os.stat(rollup_path(tmp, '2026-03')).st_mtime_ns
+        write_json_if_changed(os.path.join(tmp, 'flight-data-2026-02-01.json'), make_day(status='延誤DELAY'))
+        if refresh_rollups(tmp, changed=['2026-02-01']) != ['2026-02']:
+            print("❌ 只有 2026-02 應重建")
+            return False
+        if os.stat(rollup_path(tmp, '2026-03')).st_mtime_ns != march_mtime:
+            print("❌ 未變更的月份不應重寫")
+            return False
+
+    print("✅ 每月彙總正確")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試每日檔案寫入\n")
+
+    tests = [
+        test_skip_when_only_volatile_fields_change,
+        test_write_when_content_changes,
+        test_hash_ignores_key_order,
+        test_index_tracks_hashes_and_counts,
+        test_rollups_rebuild_changed_months_only
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+測試 flight_table.py 的欄式運算結果與原本以字典迴圈實作的 organize_by_date 相同
+（fetch-from-txt-api.py 的 organize_by_date 改以 FlightTable 實作；有 NumPy 與沒有 NumPy 兩種路徑都會測試）
+"""
+
+import json
+import os
+import sys
+from collections import defaultdict
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 fetch-from-txt-api.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("fetch_from_txt_api", os.path.join(os.path.dirname(__file__), "fetch-from-txt-api.py"))
+fetch_from_txt_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_from_txt_api)
+
+import flight_table
+from flight_table import FlightTable
+from synthetic_feed import build_feed_lines
+
+TARGET_GATES = [f'D{i}' for i in range(11, 19)] + [f'D{i}R' for i in range(11, 19)]
+
+
+def reference_organize_by_date(flights):
+    """原本以字典迴圈實作的 organize_by_date（比對用）"""
+    date_data = defaultdict(lambda: {"flights": [], "summary": {"before_17:00": 0, "after_17:00": 0}})
+    processed_flights = {}  # key: (date_key, time_display, gate), value: flight_entry
+
+    for flight in flights:
+        flight_key = (flight.date_key, flight.time_display, flight.gate)
+        if flight_key not in processed_flights:
+            processed_flights[flight_key] = {
+                "time": flight.time_display,
+                "datetime": flight.datetime_iso,
+                "gate": flight.gate,
+                "flight_code": flight.flight_code,
+                "airline_code": flight.airline_code,
+                "airline_name": flight.airline_name,
+                "type": flight.type,
+                "airport_code": flight.airport_code,
+                "city": flight.city,
+                "status": flight.status,
+                "aircraft": flight.aircraft,
+                "terminal": flight.terminal,
+                "destination": f"{flight.city} ({flight.airport_code})".strip(),
+                "codeshare_flights": [],
+            }
+            if flight.hour < 17:
+                date_data[flight.date_key]["summary"]["before_17:00"] += 1
+            else:
+                date_data[flight.date_key]["summary"]["after_17:00"] += 1
+        else:
+            existing_entry = processed_flights[flight_key]
+            if flight.flight_code != existing_entry['flight_code']:
+                existing_entry["codeshare_flights"].append({
+                    "flight_code": flight.flight_code,
+                    "airline_code": flight.airline_code,
+                    "airline_name": flight.airline_name
+                })
+
+    for (date_key, _, _), flight_entry in processed_flights.items():
+        date_data[date_key]["flights"].append(flight_entry)
+    for date_key in date_data:
+        date_data[date_key]["flights"].sort(key=lambda x: x["datetime"])
+    return dict(date_data)
+
+
+def run_both_paths(check):
+    """分別以 NumPy 與純 Python 路徑執行檢查"""
+    numpy_module = flight_table.np
+    try:
+        paths = [('純 Python', None)]
+        if numpy_module is not None:
+            paths.insert(0, ('NumPy', numpy_module))
+        for label, module in paths:
+            flight_table.np = module
+            if not check(label):
+                return False
+        return True
+    finally:
+        flight_table.np = numpy_module
+
+
+def test_from_records_matches_organize_by_date():
+    """測試 fetch-from-txt-api.py 的 organize_by_date（FlightTable）與字典迴圈的結果一致"""
+    print("=" * 60)
+    print("測試 1: organize_by_date 與字典迴圈的結果一致")
+    print("=" * 60)
+
+    lines = build_feed_lines(5000, target_ratio=0.3, days=3)
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+    expected = reference_organize_by_date(scraper.iter_flight_data(lines))
+
+    def check(label):
+        result = fetch_from_txt_api.organize_by_date(scraper.iter_flight_data(lines))
+        # 航班順序也要相同（寫入的 JSON 依此順序）
+        if json.dumps(result, sort_keys=True) != json.dumps(expected, sort_keys=True):
+            print(f"❌ {label}：分組結果不同")
+            return False
+        if fetch_from_txt_api.organize_by_date([]) != {}:
+            print(f"❌ {label}：沒有航班時應返回空字典")
+            return False
+        flights = sum(len(day['flights']) for day in result.values())
+        codeshares = sum(len(f['codeshare_flights']) for day in result.values() for f in day['flights'])
+        print(f"✅ {label}：分組結果一致（{flights} 班，{codeshares} 個共掛班號）")
+        return True
+
+    return run_both_paths(check)
+
+
+def test_from_feed_lines_filters_gates():
+    """測試全機場建表後以登機門篩選，結果與只解析目標登機門相同"""
+    print("\n" + "=" * 60)
+    print("測試 2: 全機場建表後篩選登機門")
+    print("=" * 60)
+
+    lines = build_feed_lines(5000, target_ratio=0.1, days=3)
+    scraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper()
+    expected = reference_organize_by_date(scraper.iter_flight_data(lines))
+
+    def check(label):
+        table = FlightTable.from_feed_lines(lines)
+        if len(table) != len(lines):
+            print(f"❌ {label}：列數錯誤 {len(table)} (應該是 {len(lines)})")
+            return False
+        if table.organize_by_date(gates=TARGET_GATES) != expected:
+            print(f"❌ {label}：篩選結果不同")
+            return False
+        print(f"✅ {label}：篩選結果一致")
+        return True
+
+    return run_both_paths(check)
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試欄式航班資料表\n")
+
+    tests = [
+        test_from_records_matches_organize_by_date,
+        test_from_feed_lines_filters_gates
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
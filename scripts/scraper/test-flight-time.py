@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+測試 flight_time.py 的日期時間解析與快取統計
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import flight_time
+from flight_time import cache_stats, clear_caches, parse_feed_datetime, parse_month_day_time
+
+
+def regex_feed_datetime(date_str, time_str):
+    """原本 fetch-from-txt-api.py 的 regex 解析（作為對照）"""
+    date_match = re.match(r'(\d{4})/(\d{1,2})/(\d{1,2})', date_str)
+    time_match = re.match(r'(\d{1,2}):(\d{2}):(\d{2})', time_str)
+    if not (date_match and time_match):
+        return None
+    year, month, day = map(int, date_match.groups())
+    hour, minute, _ = map(int, time_match.groups())
+    try:
+        datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+    return f'{year:04d}-{month:02d}-{day:02d}', hour * 60 + minute
+
+
+def test_feed_datetime_matches_regex():
+    """測試切片解析與原本的 regex 結果相同"""
+    print("=" * 60)
+    print("測試 1: 文字檔日期時間解析與 regex 一致")
+    print("=" * 60)
+
+    dates = ['2026/02/01', '2026/2/1', '2026/12/31', '2026/02/30', '2026/13/01',
+             '2026-02-01', '26/02/01', '2026/02/01 ', '', 'abcd/ef/gh']
+    times = ['00:05:00', '23:59:00', '7:05:00', '24:00:00', '12:60:00',
+             '12:30', '12:30:00 ', '', 'ab:cd:ef']
+    for date_str in dates:
+        for time_str in times:
+            expected = regex_feed_datetime(date_str, time_str)
+            result = parse_feed_datetime(date_str, time_str)
+            if result != expected:
+                print(f"❌ {date_str!r} {time_str!r}: {result} (應該是 {expected})")
+                return False
+
+    print(f"✅ {len(dates) * len(times)} 種組合結果一致")
+    return True
+
+
+def test_month_day_time_year_rollover():
+    """測試官方網站時間格式：年份不存在該日期時改用下一年"""
+    print("\n" + "=" * 60)
+    print("測試 2: 'M/D HH:MM' 解析")
+    print("=" * 60)
+
+    cases = [
+        ('2/1 17:10', 2026, datetime(2026, 2, 1, 17, 10)),
+        ('2/29 08:00', 2027, datetime(2028, 2, 29, 8, 0)),
+        ('2/1 17:45(實際抵達: 17:45)', 2026, datetime(2026, 2, 1, 17, 45)),
+        ('13/1 08:00', 2026, None),
+        ('', 2026, None),
+    ]
+    for time_str, year, expected in cases:
+        result = parse_month_day_time(time_str, year)
+        if result != expected:
+            print(f"❌ {time_str!r}: {result} (應該是 {expected})")
+            return False
+
+    print("✅ 解析正確")
+    return True
+
+
+def test_cache_stats():
+    """測試快取命中統計"""
+    print("\n" + "=" * 60)
+    print("測試 3: 快取命中統計")
+    print("=" * 60)
+
+    clear_caches()
+    for _ in range(100):
+        parse_feed_datetime('2026/02/01', '08:30:00')
+    parse_feed_datetime('2026/02/01', '09:30:00')
+
+    stats = cache_stats().get('feed_datetime')
+    if not stats or stats['hits'] != 99 or stats['misses'] != 2:
+        print(f"❌ 統計錯誤: {stats}")
+        return False
+    if 'month_day_time' in cache_stats():
+        print("❌ 未呼叫的函式不應出現在統計中")
+        return False
+
+    print(f"✅ 命中率: {flight_time.format_cache_stats()}")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試日期時間解析\n")
+
+    tests = [
+        test_feed_datetime_matches_regex,
+        test_month_day_time_year_rollover,
+        test_cache_stats
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
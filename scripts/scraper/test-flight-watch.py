@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+測試常駐監看的輪詢排程與偵測延遲指標（不連網，輪詢、時間與等待都以假的函數替換）
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_watch import (BANK_MIN_FLIGHTS, PollOutcome, PollSchedule, WatchMetrics, departure_times,
+                          source_timestamp, watch_loop)
+
+DAY = datetime(2026, 2, 1)
+
+
+def bank_outputs():
+    """08:00–08:30 有一波出發高峰，其餘時段零星"""
+    flights = [{'time': f'08:{m:02d}', 'gate': 'D11'} for m in range(0, 31, 5)]
+    flights += [{'time': '13:00', 'gate': 'D12'}, {'time': '20:00', 'gate': 'D13'}]
+    return {'2026-02-01': {'date': '2026-02-01', 'flights': flights}}
+
+
+def test_adaptive_interval():
+    """測試出發高峰縮短、夜間放寬、連續未更新時退避"""
+    print("=" * 60)
+    print("測試 1: 自適應輪詢間隔")
+    print("=" * 60)
+
+    schedule = PollSchedule(min_interval=60, base_interval=300, max_interval=1800, backoff=2)
+    schedule.set_departures(departure_times(bank_outputs()))
+
+    bank = schedule.next_interval(DAY.replace(hour=7, minute=40))
+    normal = schedule.next_interval(DAY.replace(hour=11))
+    night = schedule.next_interval(DAY.replace(hour=3))
+    if schedule.flights_near(DAY.replace(hour=7, minute=40)) < BANK_MIN_FLIGHTS:
+        print("❌ 應偵測到出發高峰")
+        return False
+    if (bank, normal, night) != (60, 300, 1800):
+        print(f"❌ 間隔錯誤: 高峰 {bank} / 一般 {normal} / 夜間 {night}")
+        return False
+
+    # 連續未更新：一般時段逐步加倍直到上限，高峰時段最多放寬到一般間隔
+    for _ in range(3):
+        schedule.record(changed=False)
+    if schedule.next_interval(DAY.replace(hour=11)) != 1800:
+        print(f"❌ 一般時段退避錯誤: {schedule.next_interval(DAY.replace(hour=11))}")
+        return False
+    if schedule.next_interval(DAY.replace(hour=8)) != 300:
+        print(f"❌ 高峰時段退避上限錯誤: {schedule.next_interval(DAY.replace(hour=8))}")
+        return False
+
+    schedule.record(changed=True)
+    if schedule.next_interval(DAY.replace(hour=11)) != 300:
+        print("❌ 有新資料時應重置退避")
+        return False
+
+    print("✅ 高峰 60 秒、一般 300 秒、夜間 1800 秒，未更新時退避、有更新時重置")
+    return True
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.now = start
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_detection_latency():
+    """測試偵測延遲 = 處理完成時間 - 資料來源發布時間（沒有 Last-Modified 時以上一次輪詢估計）"""
+    print("\n" + "=" * 60)
+    print("測試 2: 偵測延遲指標")
+    print("=" * 60)
+
+    start = DAY.replace(hour=11).timestamp()
+    clock = FakeClock(start)
+
+    def slow_change():
+        # 第一次輪詢後 100 秒發布，下載與寫檔耗時 5 秒
+        clock.now += 5
+        return PollOutcome(changed=True, source_time=start + 100, outputs=bank_outputs())
+
+    outcomes = [
+        PollOutcome(not_modified=True),
+        slow_change,
+        PollOutcome(not_modified=True),
+        # 沒有 Last-Modified：以上一次輪詢的時間估計
+        PollOutcome(changed=True),
+    ]
+
+    def poll():
+        outcome = outcomes.pop(0)
+        return outcome() if callable(outcome) else outcome
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        metrics = WatchMetrics.for_data_dir(data_dir)
+        schedule = PollSchedule(min_interval=60, base_interval=300, max_interval=1800, backoff=2)
+        watch_loop(poll, schedule, metrics, max_polls=4, clock=clock.time, sleep=clock.sleep,
+                   now=lambda: datetime.fromtimestamp(clock.now))
+        with open(metrics.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+
+    # 未更新一次後等待 600 秒（退避），完成於 start + 605
+    expected_first = 605 - 100
+    if metrics.latencies[0] != expected_first:
+        print(f"❌ 第一次偵測延遲錯誤: {metrics.latencies[0]}（應為 {expected_first}）")
+        return False
+    if metrics.latencies[1] != clock.sleeps[-1]:
+        print(f"❌ 沒有 Last-Modified 時應以輪詢間隔估計: {metrics.latencies[1]} / {clock.sleeps[-1]}")
+        return False
+    if clock.sleeps != [600, 300, 600]:
+        print(f"❌ 等待時間錯誤: {clock.sleeps}")
+        return False
+    if (saved['polls'], saved['changes'], saved['not_modified']) != (4, 2, 2):
+        print(f"❌ 指標檔錯誤: {saved}")
+        return False
+    if saved['detection_latency_seconds']['samples'] != 2:
+        print(f"❌ 延遲樣本數錯誤: {saved['detection_latency_seconds']}")
+        return False
+
+    print(f"✅ 偵測延遲 {metrics.latencies[0]:.0f} 秒與 {metrics.latencies[1]:.0f} 秒（估計），指標已寫入")
+    return True
+
+
+def test_poll_errors_and_headers():
+    """測試輪詢失敗不會中斷迴圈，以及 Last-Modified 解析"""
+    print("\n" + "=" * 60)
+    print("測試 3: 輪詢失敗與 Last-Modified")
+    print("=" * 60)
+
+    def poll():
+        raise ConnectionError('模擬的連線失敗')
+
+    clock = FakeClock(DAY.replace(hour=11).timestamp())
+    metrics = WatchMetrics(None)
+    watch_loop(poll, PollSchedule(), metrics, max_polls=3, clock=clock.time, sleep=clock.sleep,
+               now=lambda: datetime.fromtimestamp(clock.now))
+    if metrics.errors != 3 or metrics.polls != 3 or metrics.latencies:
+        print(f"❌ 失敗次數錯誤: errors={metrics.errors} polls={metrics.polls}")
+        return False
+
+    parsed = source_timestamp('Sun, 01 Feb 2026 03:00:00 GMT')
+    if parsed != datetime(2026, 2, 1, 3, tzinfo=timezone.utc).timestamp():
+        print(f"❌ Last-Modified 解析錯誤: {parsed}")
+        return False
+    if source_timestamp('not a date') is not None or source_timestamp(None) is not None:
+        print("❌ Last-Modified 解析錯誤")
+        return False
+
+    print("✅ 輪詢失敗時繼續下一次輪詢，Last-Modified 解析正確")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試常駐監看\n")
+
+    tests = [
+        test_adaptive_interval,
+        test_detection_latency,
+        test_poll_errors_and_headers,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
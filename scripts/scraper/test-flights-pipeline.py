@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+測試 flights.py pipeline：在暫存的 Git 儲存庫中以本地文字檔執行，
+結果（寫入的檔案與 GitHub Actions 輸出）與分別執行各階段的腳本相同
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_feed import build_feed_bytes
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_repo(root):
+    """建立只有腳本的暫存儲存庫（data/ 為空）"""
+    scraper_dir = os.path.join(root, 'scripts', 'scraper')
+    os.makedirs(scraper_dir)
+    os.makedirs(os.path.join(root, 'data'))
+    for name in os.listdir(SCRIPT_DIR):
+        if name.endswith('.py'):
+            shutil.copy(os.path.join(SCRIPT_DIR, name), scraper_dir)
+    git(root, 'init', '-q')
+    git(root, 'add', '.')
+    git(root, 'commit', '-q', '-m', 'init')
+    return scraper_dir
+
+
+def git(root, *args):
+    subprocess.run(['git', '-c', 'user.email=test@example.com', '-c', 'user.name=test', *args],
+                   cwd=root, check=True, capture_output=True)
+
+
+def run(root, script, *args):
+    """執行腳本，返回 (退出碼, GitHub Actions 輸出)"""
+    output_file = os.path.join(root, '..', 'github-output')
+    open(output_file, 'w').close()
+    env = {k: v for k, v in os.environ.items() if not k.startswith('FIREBASE_')}
+    env['GITHUB_OUTPUT'] = output_file
+    proc = subprocess.run([sys.executable, os.path.join(root, 'scripts', 'scraper', script), *args],
+                          cwd=root, env=env, capture_output=True, text=True, timeout=120)
+    with open(output_file, 'r') as f:
+        outputs = dict(line.split('=', 1) for line in f.read().splitlines() if '=' in line)
+    return proc.returncode, outputs, proc.stdout + proc.stderr
+
+
+def data_files(root):
+    """data/ 中的每日檔案內容（不含 updated_at 等時間戳，兩次執行之間會不同）"""
+    import json
+
+    result = {}
+    data_dir = os.path.join(root, 'data')
+    for name in sorted(os.listdir(data_dir)):
+        if name.startswith('flight-data-'):
+            with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data.pop('updated_at', None)
+            result[name] = data
+    return result
+
+
+def test_pipeline_matches_separate_scripts():
+    """測試 pipeline 與分別執行 fetch、compare 的結果相同"""
+    print("=" * 60)
+    print("測試 1: pipeline 與分別執行各階段的結果相同")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feeds = []
+        for seed in (1, 2):
+            path = os.path.join(tmp, f'feed-{seed}.txt')
+            with open(path, 'wb') as f:
+                f.write(build_feed_bytes(3000, seed=seed))
+            feeds.append(path)
+
+        results = {}
+        for mode in ('pipeline', 'separate'):
+            root = os.path.join(tmp, mode, 'repo')
+            make_repo(root)
+            runs = []
+            for feed in feeds:
+                if mode == 'pipeline':
+                    code, outputs, log = run(root, 'flights.py', 'pipeline', '--file', feed, '--no-upload')
+                else:
+                    code, outputs, log = run(root, 'fetch-from-txt-api.py', '--file', feed)
+                    _, compare_outputs, compare_log = run(root, 'compare-data.py')
+                    outputs.update(compare_outputs)
+                    log += compare_log
+                if code != 0:
+                    print(f"❌ {mode} 執行失敗（退出碼 {code}）:\n{log[-2000:]}")
+                    return False
+                runs.append((outputs, data_files(root)))
+                git(root, 'add', 'data')
+                git(root, 'commit', '-q', '-m', 'data')
+            results[mode] = runs
+
+    keys = ('feed_changed', 'files_written', 'files_skipped', 'has_changes', 'changed_count')
+    for i, ((p_out, p_data), (s_out, s_data)) in enumerate(zip(results['pipeline'], results['separate'])):
+        p_values = {k: p_out.get(k) for k in keys}
+        s_values = {k: s_out.get(k) for k in keys}
+        if p_values != s_values:
+            print(f"❌ 第 {i + 1} 次執行的輸出不同: {p_values} / {s_values}")
+            return False
+        if p_data != s_data:
+            print(f"❌ 第 {i + 1} 次執行寫入的檔案不同")
+            return False
+        if p_values['has_changes'] != 'true':
+            print(f"❌ 第 {i + 1} 次執行應有實質變化: {p_values}")
+            return False
+
+    print(f"✅ 兩次執行的輸出與寫入的 {len(results['pipeline'][-1][1])} 個檔案都相同")
+    return True
+
+
+def test_pipeline_unchanged_feed():
+    """測試相同的文字檔再執行一次：沒有檔案變更，跳過上傳與比較"""
+    print("\n" + "=" * 60)
+    print("測試 2: 沒有變更時跳過後續階段")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = os.path.join(tmp, 'feed.txt')
+        with open(feed, 'wb') as f:
+            f.write(build_feed_bytes(2000, seed=3))
+        root = os.path.join(tmp, 'repo')
+        make_repo(root)
+        run(root, 'flights.py', 'pipeline', '--file', feed, '--no-upload')
+        git(root, 'add', 'data')
+        git(root, 'commit', '-q', '-m', 'data')
+        code, outputs, log = run(root, 'flights.py', 'pipeline', '--file', feed, '--no-upload')
+
+    if code != 0 or outputs.get('files_written') != '0' or outputs.get('has_changes') != 'false':
+        print(f"❌ 輸出錯誤（退出碼 {code}）: {outputs}")
+        return False
+    if '比較實質變化' in log:
+        print("❌ 沒有檔案變更時不應執行比較")
+        return False
+
+    print("✅ 沒有檔案變更時直接輸出 has_changes=false")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試 flights.py pipeline\n")
+
+    tests = [
+        test_pipeline_matches_separate_scripts,
+        test_pipeline_unchanged_feed,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
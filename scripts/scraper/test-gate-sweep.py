@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+測試 sweep_gates：只下載一次未篩選的頁面並在本地依登機門分組，
+結果與逐一請求各登機門相同；頁面被截斷時改為逐一請求（不連網，以假的 session 提供頁面）
+"""
+
+import os
+import sys
+from urllib.parse import parse_qs, urlparse
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_scraper import TaoyuanAirportFlightScraper
+
+GATES = [f'D{i}' for i in range(11, 19)]
+
+ROW = """<tr><td>{time}</td><td><a href="https://www.flightradar24.com/{code}">{code}</a>
+<span class="codeshare-name">(長榮航空)</span></td><td>T2</td><td>{gate}</td>
+<td><small>東京</small><strong>NRT</strong></td><td><span class="status status-ontime">準時</span></td></tr>"""
+
+
+def flights():
+    """每個登機門 1–3 班出發、1 班抵達，另有其他登機門的航班"""
+    departures, arrivals = [], []
+    for i, gate in enumerate(GATES + ['D10', 'C5']):
+        for n in range(1 + i % 3):
+            departures.append({'time': f'{8 + n:02d}:{i * 5:02d}', 'code': f'BR{100 + i * 10 + n}', 'gate': gate})
+        arrivals.append({'time': f'{15:02d}:{i * 5:02d}', 'code': f'CI{200 + i}', 'gate': gate})
+    return departures, arrivals
+
+
+def suffixed_flights():
+    """D11、D14 有 L／R 後綴的登機門，另有 D1 開頭但不是目標登機門的 D1"""
+    departures, arrivals = flights()
+    departures += [{'time': '10:00', 'code': 'JX800', 'gate': 'D11R'},
+                   {'time': '10:30', 'code': 'JX801', 'gate': 'D11L'},
+                   {'time': '11:00', 'code': 'JX802', 'gate': ' d14r '},
+                   {'time': '11:30', 'code': 'JX803', 'gate': 'D1'}]
+    arrivals += [{'time': '16:00', 'code': 'JX900', 'gate': 'D18L'}]
+    return departures, arrivals
+
+
+def page(gate=None, extra='', rows=flights):
+    departures, arrivals = rows()
+    # ?flight_search= 比對文字：任何欄位含有登機門代號的航班都會列出
+    keep = lambda rows: [r for r in rows if gate is None or gate.upper() in ' '.join(r.values()).upper()]
+    table = lambda title, rows: (f'<table class="flight-table"><thead><tr><th><a href="#">{title}</a></th>'
+                                 f'<th>航班</th></tr></thead><tbody>'
+                                 + ''.join(ROW.format(**r) for r in rows) + '</tbody></table>')
+    return f'<html><body>{table("出發時間", keep(departures))}{table("抵達時間", keep(arrivals))}{extra}</body></html>'
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.encoding = None
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """未篩選與 ?flight_search= 的頁面，記錄請求的 URL"""
+
+    def __init__(self, extra='', rows=flights):
+        self.extra = extra
+        self.rows = rows
+        self.requests = []
+
+    def get(self, url, timeout=None):
+        self.requests.append(url)
+        gate = parse_qs(urlparse(url).query).get('flight_search', [None])[0]
+        return FakeResponse(page(gate, '' if gate else self.extra, self.rows))
+
+
+def strip(results):
+    """去除與請求方式有關的欄位（timestamp、url）"""
+    return [{k: v for k, v in item.items() if k not in ('timestamp', 'url')} for item in results]
+
+
+def scraper_with(session, **kwargs):
+    scraper = TaoyuanAirportFlightScraper(delay=0, **kwargs)
+    scraper.session = session
+    return scraper
+
+
+def test_sweep_matches_per_gate():
+    """測試單一請求的結果與逐一請求各登機門相同"""
+    print("=" * 60)
+    print("測試 1: 單一請求並在本地分組")
+    print("=" * 60)
+
+    per_gate = scraper_with(FakeSession()).get_all_gates(GATES)
+    session = FakeSession()
+    swept = scraper_with(session).sweep_gates(GATES)
+
+    if len(session.requests) != 1:
+        print(f"❌ 應只請求一次: {session.requests}")
+        return False
+    if strip(swept) != strip(per_gate):
+        for a, b in zip(strip(swept), strip(per_gate)):
+            if a != b:
+                print(f"❌ {a['gate']} 的結果不同")
+                break
+        return False
+    if [r['summary']['departure_count'] for r in swept] != [1, 2, 3, 1, 2, 3, 1, 2]:
+        print(f"❌ 分組數量錯誤: {[r['summary'] for r in swept]}")
+        return False
+
+    print(f"✅ 1 個請求取得 {len(swept)} 個登機門，結果與逐一請求（{len(GATES)} 個請求）相同")
+    return True
+
+
+def test_truncated_page_falls_back():
+    """測試頁面有分頁或列數達到上限時改為逐一請求"""
+    print("\n" + "=" * 60)
+    print("測試 2: 頁面被截斷時改為逐一請求")
+    print("=" * 60)
+
+    expected = strip(scraper_with(FakeSession()).get_all_gates(GATES))
+
+    session = FakeSession(extra='<nav class="pagination"><a href="?paged=2">2</a></nav>')
+    paged = scraper_with(session).sweep_gates(GATES)
+    if len(session.requests) != 1 + len(GATES) or strip(paged) != expected:
+        print(f"❌ 有分頁時應逐一請求: {len(session.requests)} 個請求")
+        return False
+
+    limited_session = FakeSession()
+    departures, _ = flights()
+    limited = scraper_with(limited_session, page_row_limit=len(departures)).sweep_gates(GATES)
+    if len(limited_session.requests) != 1 + len(GATES) or strip(limited) != expected:
+        print(f"❌ 列數達到上限時應逐一請求: {len(limited_session.requests)} 個請求")
+        return False
+
+    print("✅ 有分頁或列數達到上限時改為逐一請求，結果相同")
+    return True
+
+
+def test_suffixed_gates():
+    """測試 D11 包含 D11L、D11R 等加上字母後綴的登機門，與逐一請求的結果相同"""
+    print("\n" + "=" * 60)
+    print("測試 3: 加上字母後綴的登機門")
+    print("=" * 60)
+
+    per_gate = scraper_with(FakeSession(rows=suffixed_flights)).get_all_gates(GATES)
+    session = FakeSession(rows=suffixed_flights)
+    swept = scraper_with(session).sweep_gates(GATES)
+    if len(session.requests) != 1 or strip(swept) != strip(per_gate):
+        print(f"❌ 應只請求一次且結果相同: {len(session.requests)} 個請求")
+        return False
+    d11 = [row['gate'] for row in swept[0]['departure']['data']]
+    if d11 != ['D11', 'D11R', 'D11L']:
+        print(f"❌ D11 應包含 D11R、D11L: {d11}")
+        return False
+
+    # 查詢 D1 時，逐一請求也會列出 D11–D18：無法在本地確定，改為逐一請求
+    session = FakeSession(rows=suffixed_flights)
+    swept = scraper_with(session).sweep_gates(['D1', 'D11'])
+    expected = scraper_with(FakeSession(rows=suffixed_flights)).get_all_gates(['D1', 'D11'])
+    if len(session.requests) != 3 or strip(swept) != strip(expected):
+        print(f"❌ 無法確定的登機門應逐一請求: {len(session.requests)} 個請求")
+        return False
+
+    print(f"✅ D11 包含 {', '.join(d11[1:])}，結果與逐一請求相同；無法確定時改為逐一請求")
+    return True
+
+
+def test_ambiguous_gate_falls_back():
+    """測試登機門欄位無法判斷（如「D12/D13」）時改為逐一請求"""
+    print("\n" + "=" * 60)
+    print("測試 4: 無法判斷登機門時改為逐一請求")
+    print("=" * 60)
+
+    def changed_gate():
+        departures, arrivals = flights()
+        departures.append({'time': '12:00', 'code': 'BR999', 'gate': 'D12/D13'})
+        return departures, arrivals
+
+    expected = strip(scraper_with(FakeSession(rows=changed_gate)).get_all_gates(GATES))
+    session = FakeSession(rows=changed_gate)
+    swept = scraper_with(session).sweep_gates(GATES)
+    if len(session.requests) != 1 + len(GATES) or strip(swept) != expected:
+        print(f"❌ 應改為逐一請求: {len(session.requests)} 個請求")
+        return False
+    if 'BR999' not in [row['flight_code'] for row in swept[1]['departure']['data']]:
+        print("❌ D12 應包含登機門欄位為「D12/D13」的航班")
+        return False
+
+    print("✅ 登機門欄位為「D12/D13」時改為逐一請求，結果相同")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試 sweep_gates\n")
+
+    tests = [
+        test_sweep_matches_per_gate,
+        test_truncated_page_falls_back,
+        test_suffixed_gates,
+        test_ambiguous_gate_falls_back,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
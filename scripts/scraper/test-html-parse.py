@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+測試 HTML 解析引擎：fast（lxml + XPath）、strainer、lxml 與 html.parser 的解析結果相同，
+以表頭判斷出發／抵達表格（表頭無法判斷時沿用原本的文字判斷），預設引擎為 html.parser
+（不連網，使用模擬頁面）
+"""
+
+import os
+import subprocess
+import sys
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_scraper import TaoyuanAirportFlightScraper
+from html_parse import DEFAULT_ENGINE, ENGINES, HAS_LXML
+from synthetic_pages import build_official_page, build_yuann_page
+from taoyuan_airport_official_scraper import TaoyuanAirportOfficialScraper
+
+# 格式不完整的列：沒有 flightradar 連結、沒有 small/strong、狀態沒有 span、儲存格內有 script 與註解
+EDGE_ROWS = """
+<tr><td> 08:05 <!-- 預計 --></td><td>JX800<br>(星宇航空)</td><td>T2-3</td><td>&nbsp;D12 </td>
+<td>大阪 KIX</td><td>延誤<script>track()</script></td></tr>
+<tr><td>09:10</td><td><a href="/flight/BR1">BR1</a> <span class="codeshare-name">(長榮航空)</span></td>
+<td>T2</td><td>D13</td><td><strong>NRT</strong></td><td><span class="badge status-delay">延誤</span></td></tr>
+<tr><td>只有</td><td>三欄</td><td>略過</td></tr>
+<tr><td>10:20</td><td>CI100</td><td>T1</td><td>D14</td>
+<td>東京<table><tr><td><span class="status-ontime">準時</span></td></tr></table></td><td>登機</td></tr>
+"""
+
+
+def yuann_edge_page():
+    """抵達表格在前，且表頭有「出發地」；另有一個沒有 thead 的出發表格"""
+    arrival = ('<table class="table flight-table"><thead><tr><th><a href="?o=t">抵達時間</a></th><th>航班</th>'
+               '<th>行李轉盤</th><th>登機門</th><th>出發地</th><th>狀態</th></tr></thead>'
+               f'<tbody>{EDGE_ROWS}</tbody></table>')
+    departure = f'<table class="flight-table"><tbody><tr><td>出發</td></tr>{EDGE_ROWS}</tbody></table>'
+    return f'<html><body><table class="weather"><tr><td>出發前</td></tr></table>{arrival}{departure}</body></html>'
+
+
+def official_edge_page():
+    """天氣表格、沒有 thead 的航班表格，與表頭沒有航班欄位的表格"""
+    no_thead = ('<table><tr><th>出發時間</th><th>航班</th><th>目的地</th><th>登機門</th></tr>'
+                '<tr><td>02/01 08:00</td><td> BR 100 </td><td>東京 <b>NRT</b></td><td>D11</td></tr></table>')
+    other = '<table><thead><tr><th>日期</th><th>航廈</th></tr></thead><tr><td>02/01</td><td>T2</td></tr></table>'
+    return f'<html><body><table><tr><td>flight info</td></tr></table>{no_thead}{other}</body></html>'
+
+
+def results_by_engine(parse):
+    return {engine: parse(engine) for engine in ENGINES}
+
+
+def same_results(label, results):
+    expected = results['html.parser']
+    for engine, result in results.items():
+        if result != expected:
+            print(f"❌ {label}: {engine} 的結果與 html.parser 不同")
+            return False
+    return True
+
+
+def test_engines_match():
+    """測試各引擎在模擬頁面上的結果相同"""
+    print("=" * 60)
+    print("測試 1: 各引擎結果相同")
+    print("=" * 60)
+
+    pages = [build_yuann_page(120, seed=seed) for seed in range(2)]
+    yuann = results_by_engine(
+        lambda engine: [TaoyuanAirportFlightScraper(delay=0, parser=engine).parse_tables(html) for html in pages])
+    if not same_results('yuann.tw', yuann):
+        return False
+    departures, arrivals = yuann['fast'][0]
+    if (departures['row_count'], arrivals['row_count']) != (60, 60) or not departures['data'][0]['airline']:
+        print(f"❌ 解析結果錯誤: {departures['row_count']}、{arrivals['row_count']}")
+        return False
+
+    for flight_type in ('departure', 'arrival'):
+        html = build_official_page(flight_type, 80)
+        official = results_by_engine(
+            lambda engine: TaoyuanAirportOfficialScraper(delay=0, parser=engine).parse_flight_table(html, flight_type))
+        if not same_results(f'官網 {flight_type}', official):
+            return False
+        if official['fast']['row_count'] != 80:
+            print(f"❌ 官網 {flight_type} 應有 80 班: {official['fast']['row_count']}")
+            return False
+
+    print(f"✅ {', '.join(ENGINES)} 結果相同（fast 使用 {'lxml + XPath' if HAS_LXML else 'strainer'}）")
+    return True
+
+
+def test_header_classification():
+    """測試以表頭判斷表格類型，並處理格式不完整的列"""
+    print("\n" + "=" * 60)
+    print("測試 2: 以表頭判斷表格類型")
+    print("=" * 60)
+
+    html = yuann_edge_page()
+    results = results_by_engine(lambda engine: TaoyuanAirportFlightScraper(delay=0, parser=engine).parse_tables(html))
+    if not same_results('yuann.tw', results):
+        return False
+
+    departures, arrivals = results['fast']
+    # 抵達表格的「出發地」欄不應使它被當作出發表格
+    if arrivals['headers'][0] != '抵達時間' or departures['headers'] != []:
+        print(f"❌ 表格類型判斷錯誤: {arrivals['headers']}、{departures['headers']}")
+        return False
+    if arrivals['row_count'] != 3 or departures['row_count'] != 3:
+        print(f"❌ 列數錯誤: {arrivals['row_count']}、{departures['row_count']}")
+        return False
+
+    first, second, nested = arrivals['data']
+    expected_first = {'time': '08:05', 'flight_code': 'JX800(星宇航空)', 'airline': '', 'gate': 'D12',
+                      'city': '', 'full_destination': '大阪 KIX', 'status': '延誤', 'status_class': ''}
+    if any(first[key] != value for key, value in expected_first.items()):
+        print(f"❌ 格式不完整的列解析錯誤: {first}")
+        return False
+    # 不是 flightradar 的連結時以整格文字為航班代號
+    expected_second = ('BR1(長榮航空)', '長榮航空', 'NRT', 'badge status-delay')
+    if (second['flight_code'], second['airline'], second['full_destination'], second['status_class']) != expected_second:
+        print(f"❌ 解析錯誤: {second}")
+        return False
+    # 儲存格內有巢狀表格時與原本相同：td 包含巢狀的儲存格，狀態取目的地之後的第一個 td
+    if (nested['full_destination'], nested['status'], nested['status_class']) != ('東京準時', '準時', 'status-ontime'):
+        print(f"❌ 巢狀表格解析錯誤: {nested}")
+        return False
+
+    html = official_edge_page()
+    official = results_by_engine(
+        lambda engine: TaoyuanAirportOfficialScraper(delay=0, parser=engine).parse_flight_table(html, 'departure'))
+    if not same_results('官網', official):
+        return False
+    # 沒有 thead 時第一行（表頭）也會被當作資料行（與原本的行為相同）
+    flights = official['fast']['data']
+    if len(flights) != 2 or (flights[1]['flight_code'], flights[1]['destination'], flights[1]['gate']) != \
+            ('BR 100', '東京NRT', 'D11'):
+        print(f"❌ 官網解析錯誤: {flights}")
+        return False
+
+    empty = TaoyuanAirportFlightScraper(delay=0).parse_tables('')
+    if empty[0]['data'] or empty[1]['data']:
+        print("❌ 空白頁面應沒有資料")
+        return False
+
+    print("✅ 抵達表格的「出發地」欄不影響判斷，沒有表頭的表格以原本的文字判斷，巢狀儲存格與原本相同")
+    return True
+
+
+def test_default_engine():
+    """測試預設引擎為 html.parser，其他引擎以環境變數 FLIGHT_HTML_PARSER 選用"""
+    print("\n" + "=" * 60)
+    print("測試 3: 預設引擎")
+    print("=" * 60)
+
+    if 'FLIGHT_HTML_PARSER' not in os.environ and DEFAULT_ENGINE != 'html.parser':
+        print(f"❌ 預設引擎應為 html.parser: {DEFAULT_ENGINE}")
+        return False
+    if TaoyuanAirportFlightScraper(delay=0).parser != DEFAULT_ENGINE or \
+            TaoyuanAirportOfficialScraper(delay=0).parser != DEFAULT_ENGINE:
+        print("❌ 爬蟲應使用預設引擎")
+        return False
+
+    def engine_with(value):
+        env = dict(os.environ, FLIGHT_HTML_PARSER=value)
+        return subprocess.run([sys.executable, '-c', 'import html_parse; print(html_parse.DEFAULT_ENGINE)'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                              capture_output=True, text=True)
+
+    selected = engine_with('fast')
+    if selected.returncode != 0 or selected.stdout.strip() != 'fast':
+        print(f"❌ FLIGHT_HTML_PARSER=fast 應選用 fast: {selected.stdout}{selected.stderr}")
+        return False
+    if engine_with('bogus').returncode == 0:
+        print("❌ 不支援的 FLIGHT_HTML_PARSER 應出錯")
+        return False
+
+    print("✅ 預設 html.parser，FLIGHT_HTML_PARSER=fast 時選用 fast，不支援的值會出錯")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試 HTML 解析引擎\n")
+
+    tests = [
+        test_engines_match,
+        test_header_classification,
+        test_default_engine,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+測試官網爬蟲並行抓取出發／抵達航班，並行檢查 API 端點並快取結果
+（不連網，以假的 session 模擬往返延遲）
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from taoyuan_airport_official_scraper import TaoyuanAirportOfficialScraper
+
+GATES = [f'D{i}' for i in range(11, 19)]
+LATENCY = 0.2
+
+PAGE = """<html><body><table><thead><tr><th>{time_header}</th><th>航班</th><th>航空公司</th>
+<th>{place_header}</th><th>登機門</th><th>狀態</th></tr></thead><tbody>
+<tr><td>02/01 {hour:02d}:00</td><td>BR{number}</td><td>長榮航空</td><td>東京</td><td>{gate}</td><td>準時</td></tr>
+</tbody></table></body></html>"""
+
+
+class FakeResponse:
+    def __init__(self, url, text='', status_code=200):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.encoding = None
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """模擬往返延遲，記錄請求與同時進行中的請求數"""
+
+    def __init__(self, latency=LATENCY, existing=('/api/flights',)):
+        self.latency = latency
+        self.existing = existing
+        self.gets = []
+        self.heads = []
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _request(self, log, url):
+        with self._lock:
+            log.append(url)
+            self.started.append(time.perf_counter())
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.latency)
+        with self._lock:
+            self.active -= 1
+
+    def get(self, url, params=None, timeout=None):
+        self._request(self.gets, url)
+        gate = params['k']
+        departure = url.endswith('/flight_depart')
+        text = PAGE.format(time_header='出發時間' if departure else '抵達時間',
+                           place_header='目的地' if departure else '出發地',
+                           hour=8 if departure else 15, number=100 + GATES.index(gate), gate=gate)
+        return FakeResponse(f'{url}?k={gate}', text)
+
+    def head(self, url, timeout=None, allow_redirects=True):
+        self._request(self.heads, url)
+        if url.endswith('/rest/flight'):
+            raise requests.ConnectionError('connection refused')
+        return FakeResponse(url, status_code=405 if url.endswith(self.existing) else 404)
+
+
+def scraper_with(session, **kwargs):
+    scraper = TaoyuanAirportOfficialScraper(delay=0, **kwargs)
+    scraper.session = session
+    return scraper
+
+
+def strip(results):
+    """去除與請求時間有關的欄位"""
+    return [{k: v for k, v in item.items() if k != 'timestamp'} for item in results]
+
+
+def test_concurrent_gates():
+    """測試所有登機門的出發與抵達請求同時進行，結果與逐一請求相同"""
+    print("=" * 60)
+    print("測試 1: 並行抓取出發與抵達航班")
+    print("=" * 60)
+
+    expected = scraper_with(FakeSession(latency=0), max_workers=1).get_all_gates(GATES)
+
+    session = FakeSession()
+    scraper = scraper_with(session, max_workers=2 * len(GATES))
+    start = time.perf_counter()
+    results = scraper.get_all_gates(GATES)
+    elapsed = time.perf_counter() - start
+
+    if strip(results) != strip(expected) or [r['gate'] for r in results] != GATES:
+        print("❌ 並行結果與逐一請求不同")
+        return False
+    first = results[0]
+    if first['departure']['data'][0]['flight_code'] != 'BR100' or first['arrival']['data'][0]['origin'] != '東京':
+        print(f"❌ 解析結果錯誤: {first}")
+        return False
+    if len(session.gets) != 2 * len(GATES) or elapsed > LATENCY * 2:
+        print(f"❌ {len(session.gets)} 個請求耗時 {elapsed:.2f} 秒（往返 {LATENCY} 秒）")
+        return False
+
+    # 預設 burst 為 1：請求不會同時出發（max_workers 只讓等待回應的時間重疊）
+    spaced = FakeSession(latency=0)
+    default = TaoyuanAirportOfficialScraper(delay=0.05)
+    default.session = spaced
+    default.get_all_gates(GATES[:3])
+    started = sorted(spaced.started)
+    gaps = [b - a for a, b in zip(started, started[1:])]
+    if min(gaps) < 0.04:
+        print(f"❌ 預設不應同時出發多個請求: 最短間隔 {min(gaps):.3f} 秒")
+        return False
+
+    print(f"✅ {len(session.gets)} 個請求耗時 {elapsed:.2f} 秒（往返 {LATENCY} 秒，同時 {session.peak} 個），"
+          f"結果與逐一請求相同；預設每個請求間隔至少 {min(gaps):.2f} 秒")
+    return True
+
+
+def test_endpoint_cache():
+    """測試 API 端點並行檢查，結果快取在磁碟上直到過期"""
+    print("\n" + "=" * 60)
+    print("測試 2: API 端點檢查與快取")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache_path = os.path.join(temp_dir, 'data', '.official-endpoints.json')
+
+        tested = len(TaoyuanAirportOfficialScraper.POSSIBLE_ENDPOINTS)
+        session = FakeSession()
+        start = time.perf_counter()
+        endpoints = scraper_with(session, max_workers=tested, endpoint_cache=cache_path).check_api_endpoints()
+        elapsed = time.perf_counter() - start
+
+        if len(session.heads) != tested or elapsed > LATENCY * 2:
+            print(f"❌ {len(session.heads)} 個 HEAD 請求耗時 {elapsed:.2f} 秒")
+            return False
+        if endpoints['found'] != [{'url': f'{TaoyuanAirportOfficialScraper.BASE_URL}/api/flights', 'status': 405}] \
+                or endpoints['cached'] or len(endpoints['tested']) != tested:
+            print(f"❌ 檢查結果錯誤: {endpoints}")
+            return False
+
+        # 有效期間內：不送出任何請求
+        cached_session = FakeSession()
+        cached = scraper_with(cached_session, endpoint_cache=cache_path).check_api_endpoints()
+        if cached_session.heads or not cached['cached'] or cached['found'] != endpoints['found']:
+            print(f"❌ 有效期間內應使用快取: {len(cached_session.heads)} 個請求")
+            return False
+
+        # refresh=True 或過期時重新檢查
+        refreshed = FakeSession(existing=('/api/flight',))
+        result = scraper_with(refreshed, endpoint_cache=cache_path).check_api_endpoints(refresh=True)
+        if len(refreshed.heads) != tested or result['found'][0]['url'].rsplit('/', 1)[-1] != 'flight':
+            print("❌ refresh=True 時應重新檢查")
+            return False
+
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        saved['checked_at'] -= 3600
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+        expired = FakeSession()
+        scraper_with(expired, endpoint_cache=cache_path, endpoint_cache_ttl=1800).check_api_endpoints()
+        if len(expired.heads) != tested:
+            print("❌ 快取過期時應重新檢查")
+            return False
+
+        print(f"✅ {tested} 個 HEAD 請求耗時 {elapsed:.2f} 秒；有效期間內使用快取（0 個請求），過期或 refresh 時重新檢查")
+        return True
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試官網爬蟲並行抓取\n")
+
+    tests = [
+        test_concurrent_gates,
+        test_endpoint_cache,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
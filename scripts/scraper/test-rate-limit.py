@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+測試 token bucket 速率限制與並行的 get_all_gates（不連網，以假的 session 模擬往返延遲）
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flight_scraper import TaoyuanAirportFlightScraper
+from rate_limit import HostRateLimiter, TokenBucket
+
+PAGE = """
+<html><body>
+<table class="flight-table"><thead><tr><th>出發時間</th></tr></thead><tbody>
+<tr><td>08:00</td><td><a href="https://www.flightradar24.com/BR100">BR100</a></td><td>T2</td><td>{gate}</td>
+<td><small>東京</small><strong>NRT</strong></td><td><span class="status-ontime">準時</span></td></tr>
+</tbody></table>
+<table class="flight-table"><thead><tr><th>抵達時間</th></tr></thead><tbody></tbody></table>
+</body></html>
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.encoding = None
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """模擬往返延遲，記錄同時進行中的請求數"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.started = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.started.append(time.perf_counter())
+        try:
+            time.sleep(self.latency)
+            return FakeResponse(PAGE.format(gate=url.rsplit('=', 1)[-1]))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_token_bucket():
+    """測試 burst 個請求立即出發，之後平均每 1/rate 秒一個"""
+    print("=" * 60)
+    print("測試 1: token bucket")
+    print("=" * 60)
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock.time, sleep=clock.sleep)
+    starts = []
+    for _ in range(7):
+        bucket.acquire()
+        starts.append(clock.now)
+
+    if starts != [0, 0, 0, 0.5, 1.0, 1.5, 2.0]:
+        print(f"❌ 出發時間錯誤: {starts}")
+        return False
+
+    # 閒置後重新累積，但不超過容量
+    clock.now += 10
+    for _ in range(3):
+        if bucket.acquire() != 0:
+            print("❌ 閒置後應可立即出發 burst 個請求")
+            return False
+    if bucket.acquire() != 0.5:
+        print("❌ 超過容量的 token 不應累積")
+        return False
+
+    limiter = HostRateLimiter(rate=1, burst=1, clock=clock.time, sleep=clock.sleep)
+    limiter.acquire('https://a.example/x')
+    if limiter.acquire('https://b.example/y') != 0 or limiter.acquire('https://a.example/z') != 1:
+        print("❌ 每個主機應各自限制")
+        return False
+    if HostRateLimiter(rate=None).acquire('https://a.example/') != 0:
+        print("❌ rate=None 時不應限制")
+        return False
+
+    print("✅ burst 個請求立即出發，之後依速率排隊；每個主機各自限制")
+    return True
+
+
+def test_concurrent_gates():
+    """測試 get_all_gates 並行抓取，結果順序與格式不變，耗時接近一次往返"""
+    print("\n" + "=" * 60)
+    print("測試 2: 並行抓取登機門")
+    print("=" * 60)
+
+    gates = [f'D{i}' for i in range(11, 19)]
+    latency = 0.2
+
+    sequential = TaoyuanAirportFlightScraper(delay=0, max_workers=1)
+    sequential.session = FakeSession(latency)
+    start = time.perf_counter()
+    expected = sequential.get_all_gates(gates)
+    sequential_elapsed = time.perf_counter() - start
+
+    scraper = TaoyuanAirportFlightScraper(delay=0.01, max_workers=8)
+    scraper.session = FakeSession(latency)
+    start = time.perf_counter()
+    results = scraper.get_all_gates(gates)
+    elapsed = time.perf_counter() - start
+
+    strip = lambda items: [{k: v for k, v in item.items() if k != 'timestamp'} for item in items]
+    if strip(results) != strip(expected) or [r['gate'] for r in results] != gates:
+        print("❌ 並行結果與逐一抓取不同")
+        return False
+    if results[0]['departure']['data'][0]['gate'] != 'D11' or results[0]['summary']['departure_count'] != 1:
+        print(f"❌ 解析結果錯誤: {results[0]}")
+        return False
+    if scraper.session.peak > 8 or elapsed > latency * 2:
+        print(f"❌ 並行耗時 {elapsed:.2f} 秒（同時 {scraper.session.peak} 個請求）")
+        return False
+
+    # 速率限制：2 個立即出發，之後每 0.1 秒一個
+    polite = TaoyuanAirportFlightScraper(delay=0.1, max_workers=8, burst=2)
+    polite.session = FakeSession(0)
+    polite.get_all_gates(gates)
+    started = sorted(polite.session.started)
+    spread = started[-1] - started[0]
+    if spread < 0.55:
+        print(f"❌ 未遵守速率限制: 8 個請求在 {spread:.2f} 秒內出發")
+        return False
+
+    # 預設 burst 為 1：即使 max_workers=8，也不會同時出發多個請求
+    default = TaoyuanAirportFlightScraper(delay=0.1, max_workers=8)
+    default.session = FakeSession(0)
+    default.get_all_gates(gates)
+    started = sorted(default.session.started)
+    gaps = [b - a for a, b in zip(started, started[1:])]
+    if min(gaps) < 0.08:
+        print(f"❌ 預設不應同時出發多個請求: 最短間隔 {min(gaps):.3f} 秒")
+        return False
+
+    print(f"✅ 逐一 {sequential_elapsed:.2f} 秒 → 並行 {elapsed:.2f} 秒（往返 {latency} 秒），"
+          f"結果順序不變；速率限制下 8 個請求分散在 {spread:.2f} 秒，預設每個請求間隔至少 {min(gaps):.2f} 秒")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試速率限制與並行抓取\n")
+
+    tests = [
+        test_token_bucket,
+        test_concurrent_gates,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+測試 save-to-firebase.py 只上傳內容有變更的日期與欄位（不連線，使用 InMemoryFirestore）
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 save-to-firebase.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("save_to_firebase", os.path.join(os.path.dirname(__file__), "save-to-firebase.py"))
+save_to_firebase = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(save_to_firebase)
+
+from firestore_delta import flight_key, from_document, to_document
+from firestore_writer import InMemoryFirestore
+
+DATES = ['2026-02-01', '2026-02-02', '2026-02-03']
+
+
+def write_day(data_dir, date_key, status='出發DEPARTED', updated_at='2026-02-01T00:00:00'):
+    data = {
+        'date': date_key,
+        'flights': [{'time': '08:00', 'gate': 'D11', 'flight_code': 'BR100', 'status': status}],
+        'summary': {'total_flights': 1},
+        'updated_at': updated_at,
+    }
+    with open(os.path.join(data_dir, f'flight-data-{date_key}.json'), 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def upload(data_dir, db=None, **kwargs):
+    """上傳一次，返回這次寫入的日期"""
+    db = db or InMemoryFirestore()
+    start = len(db.log)
+    with redirect_stdout(io.StringIO()):
+        save_to_firebase.save_to_firebase(db, Path(data_dir), **kwargs)
+    return sorted(doc_id for doc_id, _ in db.log[start:])
+
+
+def test_only_changed_dates_uploaded():
+    """測試第二次執行只上傳內容有變更的日期（只改 updated_at 不算變更）"""
+    print("=" * 60)
+    print("測試 1: 只上傳有變更的日期")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for date_key in DATES:
+            write_day(data_dir, date_key)
+        db = InMemoryFirestore()
+        first = upload(data_dir, db)
+
+        write_day(data_dir, DATES[0], status='延誤DELAY')
+        write_day(data_dir, DATES[1], updated_at='2099-01-01T00:00:00')
+        second = upload(data_dir, db)
+        third = upload(data_dir, db)
+
+    if first != DATES:
+        print(f"❌ 第一次應上傳所有日期: {first}")
+        return False
+    if second != [DATES[0]]:
+        print(f"❌ 第二次應只上傳 {DATES[0]}: {second}")
+        return False
+    if third:
+        print(f"❌ 沒有變更時不應上傳: {third}")
+        return False
+
+    print("✅ 只上傳內容有變更的日期")
+    return True
+
+
+def test_failed_upload_is_retried():
+    """測試上傳失敗的日期不會被記錄，下次會重新上傳"""
+    print("\n" + "=" * 60)
+    print("測試 2: 失敗的日期下次重傳")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for date_key in DATES:
+            write_day(data_dir, date_key)
+        db = InMemoryFirestore(fail_ids=[DATES[1]])
+        first = upload(data_dir, db, batch_size=1)
+        db.fail_ids.clear()
+        second = upload(data_dir, db)
+        with open(os.path.join(data_dir, save_to_firebase.UPLOADED_FILE), 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+
+    if first != [DATES[0], DATES[2]] or second != [DATES[1]]:
+        print(f"❌ 重傳結果錯誤: {first} / {second}")
+        return False
+    if sorted(recorded) != DATES:
+        print(f"❌ 上傳記錄錯誤: {recorded}")
+        return False
+
+    print("✅ 失敗的日期下次重新上傳")
+    return True
+
+
+def test_full_resync():
+    """測試 --full-resync 忽略上傳記錄重新上傳所有日期"""
+    print("\n" + "=" * 60)
+    print("測試 3: --full-resync")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for date_key in DATES:
+            write_day(data_dir, date_key)
+        db = InMemoryFirestore()
+        upload(data_dir, db)
+        resync = upload(data_dir, db, full_resync=True)
+
+    if resync != DATES:
+        print(f"❌ --full-resync 應上傳所有日期: {resync}")
+        return False
+
+    print("✅ --full-resync 重新上傳所有日期")
+    return True
+
+
+def test_field_level_delta():
+    """測試只送出有變化的航班與摘要計數，更新後的文件與完整寫入相同"""
+    print("\n" + "=" * 60)
+    print("測試 4: 欄位層級差異更新")
+    print("=" * 60)
+
+    data_file = os.path.join(os.path.dirname(__file__), '../../data/flight-data-2026-02-01.json')
+    if not os.path.exists(data_file):
+        print(f"⚠️  測試資料文件不存在: {data_file}")
+        return True  # 跳過測試
+
+    with open(data_file, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, os.path.basename(data_file))
+
+        def write(data):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+        write(base)
+        db = InMemoryFirestore()
+        upload(data_dir, db)
+        full_bytes = db.bytes_written
+
+        # 一個航班狀態改變、移除最後一個航班（摘要的總班次跟著改變）
+        changed = json.loads(json.dumps(base))
+        changed['flights'][0]['status'] = '延誤DELAY'
+        removed = changed['flights'].pop()
+        changed['summary']['total_flights'] -= 1
+        write(changed)
+        before = db.bytes_written
+        upload(data_dir, db)
+        delta_bytes = db.bytes_written - before
+
+        stored = db.collections['flightData'][base['date']]
+        expected = to_document(changed)
+        stored_copy = {k: v for k, v in stored.items() if k != '_stored_at'}
+        if stored_copy != expected:
+            print("❌ 差異更新後的文件與完整寫入不同")
+            return False
+        removed_key, removed_flight = list(to_document(base)['flights'].items())[-1]
+        if removed_flight != removed or removed_key in stored['flights']:
+            print(f"❌ 移除的航班 {removed_key} 應從文件中刪除")
+            return False
+        restored = from_document(stored)
+        if restored['flights'] != sorted(changed['flights'], key=lambda f: (f['datetime'], flight_key(f))) \
+                or restored['summary'] != changed['summary']:
+            print("❌ from_document 應轉回每日 JSON 的格式")
+            return False
+        if db.log[-1] != (base['date'], 'update'):
+            print(f"❌ 第二次應以 update 寫入: {db.log[-1]}")
+            return False
+        if delta_bytes * 10 > full_bytes:
+            print(f"❌ 差異更新的大小 {delta_bytes} 位元組，完整文件 {full_bytes} 位元組")
+            return False
+
+        # 舊格式的上傳記錄（只有內容雜湊）改為完整寫入
+        with open(os.path.join(data_dir, save_to_firebase.UPLOADED_FILE), 'w', encoding='utf-8') as f:
+            json.dump({base['date']: 'legacy'}, f)
+        upload(data_dir, db)
+        if db.log[-1] != (base['date'], 'set'):
+            print(f"❌ 舊格式的記錄應完整寫入: {db.log[-1]}")
+            return False
+
+    print(f"✅ 差異更新 {delta_bytes} 位元組（完整文件 {full_bytes} 位元組），更新後內容正確")
+    return True
+
+
+def test_lazy_firebase_import():
+    """測試沒有憑證、或沒有需要寫入的日期時不載入 firebase_admin（python -X importtime）"""
+    print("\n" + "=" * 60)
+    print("測試 5: 延遲載入 Firebase SDK")
+    print("=" * 60)
+
+    import subprocess
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'save-to-firebase.py')
+    env = {k: v for k, v in os.environ.items() if not k.startswith('FIREBASE_')}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', script], env=env,
+                          capture_output=True, text=True, timeout=60)
+
+    heavy = [line for line in proc.stderr.splitlines()
+             if line.startswith('import time:') and any(name in line for name in ('firebase_admin', 'grpc', 'google'))]
+    if proc.returncode != 0 or '跳過 Firebase 存儲' not in proc.stdout:
+        print(f"❌ 沒有憑證時應直接跳過: exit={proc.returncode} {proc.stdout!r}")
+        return False
+    if heavy:
+        print(f"❌ 沒有憑證時載入了 Firebase SDK: {heavy[:3]}")
+        return False
+
+    # 自身（不含直譯器啟動）所有模組的累計載入時間
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+            if not parts[2].startswith('  '):
+                total_us += int(parts[1])
+
+    # 有憑證但所有日期都已上傳過時，也不需要連線
+    calls = []
+    original = save_to_firebase.get_db
+    save_to_firebase.get_db = lambda: calls.append(1)
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_day(data_dir, DATES[0])
+            upload(data_dir, InMemoryFirestore())
+            with redirect_stdout(io.StringIO()):
+                save_to_firebase.save_to_firebase(None, Path(data_dir))
+    finally:
+        save_to_firebase.get_db = original
+    if calls:
+        print("❌ 沒有需要寫入的日期時不應初始化 Firebase")
+        return False
+
+    print(f"✅ 未載入 Firebase SDK（載入時間合計 {total_us / 1000:.1f} ms）")
+    return True
+
+
+def test_in_memory_documents():
+    """測試 flights.py pipeline 的路徑：索引雜湊相同的日期不讀檔，記憶體中的內容不重新讀檔"""
+    print("\n" + "=" * 60)
+    print("測試 6: 使用索引與記憶體中的內容")
+    print("=" * 60)
+
+    from flight_store import canonical_hash
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for date_key in DATES:
+            write_day(data_dir, date_key)
+        db = InMemoryFirestore()
+        upload(data_dir, db)
+
+        # 索引中的雜湊：第一天改為記憶體中的新內容，其他日期與上傳記錄相同
+        ledger = save_to_firebase.UploadedHashes(Path(data_dir) / save_to_firebase.UPLOADED_FILE)
+        changed = {'date': DATES[0], 'flights': [], 'summary': {'total_flights': 0}}
+        index = {'dates': {date_key: {'hash': ledger.digest(date_key)} for date_key in DATES}}
+        index['dates'][DATES[0]]['hash'] = canonical_hash(changed)
+
+        # 檔案內容損毀：不應讀取任何檔案
+        for date_key in DATES:
+            with open(os.path.join(data_dir, f'flight-data-{date_key}.json'), 'w') as f:
+                f.write('{')
+        written = upload(data_dir, db, documents={DATES[0]: changed}, index=index)
+        stored = db.collections['flightData'][DATES[0]]
+
+    if written != [DATES[0]]:
+        print(f"❌ 應只上傳記憶體中的 {DATES[0]}: {written}")
+        return False
+    if stored['flights'] != {} or stored['summary'] != {'total_flights': 0}:
+        print(f"❌ 上傳的內容不是記憶體中的版本: {stored}")
+        return False
+
+    print("✅ 只上傳記憶體中變更的日期，其他日期依索引略過且不讀檔")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試 save-to-firebase.py\n")
+
+    tests = [
+        test_only_changed_dates_uploaded,
+        test_failed_upload_is_retried,
+        test_full_resync,
+        test_field_level_delta,
+        test_lazy_firebase_import,
+        test_in_memory_documents,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+測試已封存日期的狀態檔，以及 save-to-firebase.py 略過已封存的日期
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sealed_days import SEALED_FILE, SealedDays, date_of_file
+
+INDEX_DATES = {
+    '2026-01-30': {'hash': 'h30'},
+    '2026-01-31': {'hash': 'h31'},
+    '2026-02-01': {'hash': 'h01'},
+    '2026-02-02': {'hash': 'h02'},
+}
+
+
+def test_seal_before_window():
+    """測試早於資料來源窗口的日期會被封存，狀態檔可以重新讀取"""
+    print("=" * 60)
+    print("測試 1: 封存早於窗口的日期")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        sealed_days = SealedDays.for_data_dir(data_dir)
+        sealed, unsealed = sealed_days.update(['2026-02-02', '2026-02-01'], INDEX_DATES)
+        sealed_days.save()
+
+        if sealed != ['2026-01-30', '2026-01-31'] or unsealed:
+            print(f"❌ 封存結果錯誤: {sealed} / {unsealed}")
+            return False
+
+        reloaded = SealedDays.for_data_dir(data_dir)
+        if reloaded.window != {'start': '2026-02-01', 'end': '2026-02-02'}:
+            print(f"❌ 窗口錯誤: {reloaded.window}")
+            return False
+        if reloaded.dates['2026-01-31']['hash'] != 'h31' or reloaded.is_sealed('2026-02-01'):
+            print(f"❌ 封存記錄錯誤: {reloaded.dates}")
+            return False
+
+        # 窗口不變時不需要重寫狀態檔
+        path = os.path.join(data_dir, SEALED_FILE)
+        mtime = os.stat(path).st_mtime_ns
+        sealed, _ = reloaded.update(['2026-02-01', '2026-02-02'], INDEX_DATES)
+        reloaded.save()
+        if sealed or os.stat(path).st_mtime_ns != mtime:
+            print("❌ 沒有變化時仍然重寫狀態檔")
+            return False
+
+    print("✅ 封存與讀取正確")
+    return True
+
+
+def test_rewritten_day_is_unsealed():
+    """測試已封存的日期被改寫時會解除封存"""
+    print("\n" + "=" * 60)
+    print("測試 2: 改寫時解除封存")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        sealed_days = SealedDays.for_data_dir(data_dir)
+        sealed_days.update(['2026-02-01'], INDEX_DATES)
+
+        # 資料來源又出現 2026-01-31
+        sealed, unsealed = sealed_days.update(['2026-01-31', '2026-02-01'], INDEX_DATES, rewritten=['2026-01-31'])
+        if sealed or unsealed != ['2026-01-31'] or sealed_days.is_sealed('2026-01-31'):
+            print(f"❌ 解除封存錯誤: {sealed} / {unsealed}")
+            return False
+        if not sealed_days.is_sealed('2026-01-30'):
+            print("❌ 未改寫的日期不應解除封存")
+            return False
+
+    print("✅ 改寫的日期已解除封存")
+    return True
+
+
+def test_split_files():
+    """測試依封存狀態分組（保持順序，支援 Path）"""
+    print("\n" + "=" * 60)
+    print("測試 3: 分組")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        sealed_days = SealedDays.for_data_dir(data_dir)
+        sealed_days.update(['2026-02-01'], INDEX_DATES)
+        names = [f'flight-data-{d}.json' for d in sorted(INDEX_DATES)] + ['index.json']
+        active, sealed = sealed_days.split_files(names)
+        paths_active, _ = sealed_days.split_files([Path(data_dir) / n for n in names])
+
+        if sealed != names[:2] or active != names[2:]:
+            print(f"❌ 分組錯誤: {active} / {sealed}")
+            return False
+        if [p.name for p in paths_active] != active:
+            print(f"❌ Path 分組錯誤: {paths_active}")
+            return False
+        if date_of_file('index.json') is not None:
+            print("❌ 非每日檔案不應有日期")
+            return False
+
+    print("✅ 分組正確")
+    return True
+
+
+def load_save_to_firebase():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(
+        "save_to_firebase", os.path.join(os.path.dirname(__file__), "save-to-firebase.py"))
+    save_to_firebase = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(save_to_firebase)
+    return save_to_firebase
+
+
+def write_days(data_dir, status='準時'):
+    """寫入每日檔案，返回與 data/index.json 相同格式的 dates（內容雜湊）"""
+    from flight_store import canonical_hash
+    index_dates = {}
+    for date_key in INDEX_DATES:
+        data = {'date': date_key, 'flights': [{'time': '08:00', 'flight_code': 'BR100', 'status': status}],
+                'summary': {'total_flights': 1}}
+        with open(os.path.join(data_dir, f'flight-data-{date_key}.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        index_dates[date_key] = {'hash': canonical_hash(data)}
+    return index_dates
+
+
+def upload(save_to_firebase, data_dir, db, **kwargs):
+    """上傳一次，返回這次寫入的日期"""
+    start = len(db.log)
+    with redirect_stdout(io.StringIO()):
+        save_to_firebase.save_to_firebase(db, Path(data_dir), **kwargs)
+    return sorted(doc_id for doc_id, _ in db.log[start:])
+
+
+def test_firebase_skips_sealed():
+    """測試 save-to-firebase.py 略過已上傳的封存日期（--force 時仍比較）"""
+    print("\n" + "=" * 60)
+    print("測試 4: save-to-firebase.py 略過已封存的日期")
+    print("=" * 60)
+
+    save_to_firebase = load_save_to_firebase()
+    from firestore_writer import InMemoryFirestore
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = InMemoryFirestore()
+        index_dates = write_days(data_dir)
+        upload(save_to_firebase, data_dir, db)
+        sealed_days = SealedDays.for_data_dir(data_dir)
+        sealed_days.update(['2026-02-01', '2026-02-02'], index_dates)
+        sealed_days.save()
+
+        # 檔案內容改變：已封存的日期不會比較，--force 時才會發現並上傳
+        write_days(data_dir, status='延誤')
+        results = {force: upload(save_to_firebase, data_dir, db, force=force) for force in (False, True)}
+
+    if results[False] != ['2026-02-01', '2026-02-02']:
+        print(f"❌ 未略過已封存的日期: {results[False]}")
+        return False
+    if results[True] != ['2026-01-30', '2026-01-31']:
+        print(f"❌ --force 時應比較已封存的日期: {results[True]}")
+        return False
+
+    print("✅ 只上傳未封存的日期，--force 時連同已封存的日期一起比較")
+    return True
+
+
+def test_failed_upload_not_lost_after_sealing():
+    """測試上傳失敗的日期在封存後仍會重新上傳"""
+    print("\n" + "=" * 60)
+    print("測試 5: 上傳失敗後被封存的日期下次重傳")
+    print("=" * 60)
+
+    save_to_firebase = load_save_to_firebase()
+    from firestore_writer import InMemoryFirestore
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = InMemoryFirestore(fail_ids=['2026-01-31'])
+        index_dates = write_days(data_dir)
+        first = upload(save_to_firebase, data_dir, db, batch_size=1)
+
+        # 上傳失敗的日期離開資料來源窗口而被封存
+        db.fail_ids.clear()
+        sealed_days = SealedDays.for_data_dir(data_dir)
+        sealed_days.update(['2026-02-01', '2026-02-02'], index_dates)
+        sealed_days.save()
+        second = upload(save_to_firebase, data_dir, db)
+        third = upload(save_to_firebase, data_dir, db)
+
+    if '2026-01-31' in first:
+        print(f"❌ 2026-01-31 第一次應上傳失敗: {first}")
+        return False
+    if second != ['2026-01-31']:
+        print(f"❌ 封存後應重新上傳失敗的日期: {second}")
+        return False
+    if third:
+        print(f"❌ 重傳成功後不應再上傳: {third}")
+        return False
+
+    print("✅ 封存前上傳失敗的日期下次重新上傳，成功後才略過")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試已封存日期\n")
+
+    tests = [
+        test_seal_before_window,
+        test_rewritten_day_is_unsealed,
+        test_split_files,
+        test_firebase_skips_sealed,
+        test_failed_upload_not_lost_after_sealing,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+測試 stress_slots.py 與前端 stressSlots.js / gateStressWeights.js 一致
+1. 常數（壓力窗、槽間距、班別範圍、登機門權重）從 JS 原始碼的字面值以 ast 解析比對
+2. 有安裝 Node.js 時，以相同的航班資料執行 JS 的 computeStressSlotsDay（各種高峰／離峰班別組合）比對結果
+"""
+
+import ast
+import json
+import operator
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stress_slots
+from stress_slots import (compute_stress_slots, compute_stress_slots_day, gate_to_stress_weight_key,
+                          pick_stress_slots, stress_slots_for_day)
+
+JS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src/utils/flightData')
+
+
+def read_js(name):
+    with open(os.path.join(JS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# JS 字面值允許的算式（如 13 * 60 + 30）
+_JS_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul}
+
+
+def literal_value(node):
+    """與 ast.literal_eval 相同，另外接受 + - * 算式"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+        return node.value
+    if isinstance(node, ast.Dict):
+        return {literal_value(k): literal_value(v) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, ast.List):
+        return [literal_value(element) for element in node.elts]
+    if isinstance(node, ast.BinOp) and type(node.op) in _JS_OPERATORS:
+        return _JS_OPERATORS[type(node.op)](literal_value(node.left), literal_value(node.right))
+    raise ValueError(f'無法解析的 JS 字面值: {ast.dump(node)}')
+
+
+def js_constant(source, name):
+    """
+    取出 `export const NAME = 值` 的值（數字、字串、陣列、物件；可包在 Object.freeze() 中）
+
+    物件的 key 加上引號後以 ast 解析，不執行任何程式碼
+    """
+    match = re.search(rf'^export const {name} = (?:Object\.freeze\()?', source, re.M)
+    if not match:
+        raise ValueError(f'找不到 {name}')
+    text = source[match.end():]
+    if text[0] in '{[':
+        # 取到對應的右括號為止（字串中的括號不計）
+        depth, quote = 0, None
+        for end, char in enumerate(text):
+            if quote:
+                quote = None if char == quote else quote
+            elif char in '\'"':
+                quote = char
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    break
+        text = text[:end + 1]
+    else:
+        text = text.split('\n', 1)[0]
+    text = re.sub(r'([{,]\s*)([A-Za-z_]\w*)\s*:', r"\1'\2':", text)
+    return literal_value(ast.parse(text.strip(), mode='eval').body)
+
+
+def make_flights():
+    """模擬一天的航班（含取消、跨日、各種登機門）"""
+    return [
+        {"time": "05:50", "datetime": "2026-02-01T05:50:00", "gate": "D11", "status": "出發DEPARTED"},
+        {"time": "06:20", "datetime": "2026-02-01T06:20:00", "gate": "D13", "status": ""},
+        {"time": "06:20", "datetime": "2026-02-01T06:20:00", "gate": "D14R", "status": ""},
+        {"time": "07:05", "datetime": "2026-02-01T07:05:00", "gate": "D12", "status": "取消CANCELLED"},
+        {"time": "08:40", "datetime": "2026-02-01T08:40:00", "gate": "D16", "status": ""},
+        {"time": "09:10", "datetime": "2026-02-01T09:10:00", "gate": "D5", "status": ""},
+        {"time": "11:55", "datetime": "2026-02-01T11:55:00", "gate": "C3", "status": "延誤DELAY"},
+        {"time": "14:30", "datetime": "2026-02-01T14:30:00", "gate": "D15", "status": ""},
+        {"time": "17:45", "gate": "d18l", "status": ""},
+        {"time": "19:10", "datetime": "2026-02-01T19:10:00", "gate": "D12", "status": ""},
+        {"time": "20:40", "datetime": "2026-02-01T20:40:00", "gate": "D13", "status": "Cancelled"},
+        {"time": "21:25", "datetime": "2026-02-01T21:25:00", "gate": "D17", "status": ""},
+        {"time": "00:30", "datetime": "2026-02-02T00:30:00", "gate": "D11R", "status": ""},
+    ]
+
+
+def test_constants_match_js():
+    """測試常數與 JS 原始碼一致"""
+    print("=" * 60)
+    print("測試 1: 常數與 stressSlots.js / gateStressWeights.js 一致")
+    print("=" * 60)
+
+    slots_js = read_js('stressSlots.js')
+    weights_js = read_js('gateStressWeights.js')
+
+    for name in ('STRESS_BEFORE_DEP_START_MIN', 'STRESS_BEFORE_DEP_END_MIN', 'SLOT_STEP_MIN'):
+        if js_constant(slots_js, name) != getattr(stress_slots, name):
+            print(f"❌ {name} 與 JS 不一致")
+            return False
+
+    presets = {key: (p['label'], p['firstStartMin'], p['lastStartMin'])
+               for key, p in js_constant(slots_js, 'STRESS_SHIFT_PRESETS').items()}
+    expected_presets = {key: (p['label'], p['first_start_min'], p['last_start_min'])
+                        for key, p in stress_slots.STRESS_SHIFT_PRESETS.items()}
+    if presets != expected_presets:
+        print(f"❌ 班別範圍與 JS 不一致: {presets}")
+        return False
+
+    if tuple(js_constant(slots_js, 'STRESS_SHIFT_ORDER')) != stress_slots.STRESS_SHIFT_ORDER:
+        print("❌ 班別順序與 JS 不一致")
+        return False
+
+    top_counts = set(re.findall(r'pickTopDisjointSlots\(\w+, (\d+), (?:true|false)\)', slots_js))
+    if top_counts != {str(stress_slots.TOP_SLOTS)}:
+        print(f"❌ 高峰／離峰挑選數量與 JS 不一致: {top_counts}")
+        return False
+
+    weights = {key: float(value) for key, value in js_constant(weights_js, 'DEFAULT_GATE_STRESS_WEIGHTS').items()}
+    if weights != {k: float(v) for k, v in stress_slots.DEFAULT_GATE_STRESS_WEIGHTS.items()}:
+        print(f"❌ 登機門權重與 JS 不一致: {weights}")
+        return False
+    if list(weights) != list(stress_slots.DEFAULT_GATE_STRESS_WEIGHTS):
+        print("❌ 登機門權重順序與 JS 不一致（會影響權重版本）")
+        return False
+
+    print("✅ 常數一致")
+    return True
+
+
+def test_scoring():
+    """測試計分、取消航班排除與登機門權重分組"""
+    print("\n" + "=" * 60)
+    print("測試 2: 計分與高峰／離峰")
+    print("=" * 60)
+
+    cases = {'D11R': 'D11', 'd13': 'D13', 'D14L': 'D14', 'D18R': 'D18', 'D19': 'D_OTHER',
+             'D5': 'D_OTHER', 'C3': 'OTHER', '': 'OTHER', None: 'OTHER'}
+    for gate, expected in cases.items():
+        if gate_to_stress_weight_key(gate) != expected:
+            print(f"❌ 登機門 {gate!r} 權重分組錯誤: {gate_to_stress_weight_key(gate)}")
+            return False
+
+    # 05:15–06:15 槽：06:20 起飛的 D13、D14R 壓力窗 05:20–05:50 完全重疊（4 + 2.7 分），
+    # 05:50 起飛的 D11 壓力窗 04:50–05:20 重疊 5 分鐘（0.9 × 5/30 分）
+    result = compute_stress_slots(make_flights(), '2026-02-01')
+    full = result['presets']['full']
+    slot_0515 = full['scores'][full_index(5 * 60 + 15)]
+    expected = round(4 + 2.7 + 0.9 * (5 / 30), 4)
+    if slot_0515 != expected:
+        print(f"❌ 05:15 槽分數錯誤: {slot_0515} (應該是 {expected})")
+        return False
+
+    # 07:05 的 D12 已取消（壓力窗 06:05–06:35）：06:00 起的槽不應有分數
+    if full['scores'][full_index(6 * 60)] != 0:
+        print(f"❌ 取消航班不應計分: {full['scores'][full_index(6 * 60)]}")
+        return False
+
+    peak = full['peak']
+    if peak[0]['label'] != '05:00–06:00' or len(peak) != 5:
+        print(f"❌ 高峰時段錯誤: {[p['label'] for p in peak]}")
+        return False
+    for i, a in enumerate(peak):
+        for b in peak[i + 1:]:
+            if abs(a['start_min'] - b['start_min']) < 60:
+                print("❌ 高峰時段不應重疊")
+                return False
+
+    morning = result['presets']['morning']
+    if morning['scores'] != full['scores'][:len(morning['scores'])]:
+        print("❌ 早班曲線應為全天曲線的前段")
+        return False
+
+    print(f"✅ 計分正確（高峰: {', '.join(p['label'] for p in peak)}）")
+    return True
+
+
+def full_index(start_min):
+    return (start_min - stress_slots.STRESS_SHIFT_PRESETS['full']['first_start_min']) // stress_slots.SLOT_STEP_MIN
+
+
+def test_reuse_previous_result():
+    """測試航班與權重未變更時沿用既有結果"""
+    print("\n" + "=" * 60)
+    print("測試 3: 沿用既有結果")
+    print("=" * 60)
+
+    flights = make_flights()
+    first = stress_slots_for_day(flights, '2026-02-01')
+    previous = {'flights': json.loads(json.dumps(flights)), 'stress_slots': first}
+    if stress_slots_for_day(flights, '2026-02-01', previous=previous) is not first:
+        print("❌ 航班未變更時應沿用既有結果")
+        return False
+    if stress_slots_for_day(flights, '2026-02-01', previous=previous, weights={'D13': 1}) is first:
+        print("❌ 權重變更時應重新計算")
+        return False
+    if stress_slots_for_day(flights[1:], '2026-02-01', previous=previous) is first:
+        print("❌ 航班變更時應重新計算")
+        return False
+
+    print("✅ 沿用邏輯正確")
+    return True
+
+
+def test_matches_js_output():
+    """以 Node.js 執行 computeStressSlotsDay，比對高峰／離峰時段"""
+    print("\n" + "=" * 60)
+    print("測試 4: 與 JS computeStressSlotsDay 結果一致")
+    print("=" * 60)
+
+    node = shutil.which('node')
+    if not node:
+        print("⚠️  未安裝 Node.js，略過")
+        return True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 前端原始碼的 import 沒有副檔名，複製成 .mjs 後改寫 import 路徑
+        for name in ('flightTime', 'gates', 'gateStressWeights', 'stressSlots'):
+            source = re.sub(r"from '\./(\w+)'", r"from './\1.mjs'", read_js(f'{name}.js'))
+            with open(os.path.join(tmp, f'{name}.mjs'), 'w', encoding='utf-8') as f:
+                f.write(source)
+        script = os.path.join(tmp, 'run.mjs')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(
+                "import { computeStressSlotsDay, STRESS_SHIFT_ORDER } from './stressSlots.mjs'\n"
+                "import { DEFAULT_GATE_STRESS_WEIGHTS } from './gateStressWeights.mjs'\n"
+                "const flights = JSON.parse(process.argv[2])\n"
+                "const out = {}\n"
+                "for (const peakKey of STRESS_SHIFT_ORDER) {\n"
+                "  for (const lowKey of STRESS_SHIFT_ORDER) {\n"
+                "    out[`${peakKey}/${lowKey}`] = computeStressSlotsDay(\n"
+                "      flights, '2026-02-01', DEFAULT_GATE_STRESS_WEIGHTS, peakKey, lowKey)\n"
+                "  }\n"
+                "}\n"
+                "console.log(JSON.stringify(out))\n"
+            )
+        proc = subprocess.run([node, script, json.dumps(make_flights())],
+                              capture_output=True, text=True, timeout=30, env=dict(os.environ, TZ='Asia/Taipei'))
+        if proc.returncode != 0:
+            print(f"❌ Node.js 執行失敗: {proc.stderr}")
+            return False
+        js_result = json.loads(proc.stdout)
+
+    precomputed = compute_stress_slots(make_flights(), '2026-02-01')
+    for key, js_slots in js_result.items():
+        peak_key, low_key = key.split('/')
+        # 從預先計算的結果取出與直接計算的結果都要與 JS 相同
+        py_slots = pick_stress_slots(precomputed, peak_key, low_key)
+        if compute_stress_slots_day(make_flights(), '2026-02-01', None, peak_key, low_key) != py_slots:
+            print(f"❌ {key}: compute_stress_slots_day 與預先計算的結果不同")
+            return False
+        for kind in ('peak', 'low'):
+            js_list = [(s['startMin'], round(s['score'], 4), s['flightCount'], s['label']) for s in js_slots[kind]]
+            py_list = [(s['start_min'], s['score'], s['flight_count'], s['label']) for s in py_slots[kind]]
+            if js_list != py_list:
+                print(f"❌ {key} {kind} 不一致:\n   JS: {js_list}\n   PY: {py_list}")
+                return False
+
+    print(f"✅ {len(js_result)} 種高峰／離峰班別組合與 JS 一致")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試登機壓力時段\n")
+
+    tests = [
+        test_constants_match_js,
+        test_scoring,
+        test_reuse_previous_result,
+        test_matches_js_output
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
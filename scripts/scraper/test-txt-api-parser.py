@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+測試 fetch-from-txt-api.py 的解析邏輯（使用模擬的全機場文字檔，不連網）
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加當前目錄到路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 直接導入 fetch-from-txt-api.py（需要處理連字符）
+import importlib.util
+spec = importlib.util.spec_from_file_location("fetch_from_txt_api", os.path.join(os.path.dirname(__file__), "fetch-from-txt-api.py"))
+fetch_from_txt_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_from_txt_api)
+
+from synthetic_feed import build_feed_bytes
+from feed_encoding import detect_encoding
+from flight_record import FlightRecord
+
+TaoyuanAirportTxtAPIScraper = fetch_from_txt_api.TaoyuanAirportTxtAPIScraper
+organize_by_date = fetch_from_txt_api.organize_by_date
+iter_feed_lines = fetch_from_txt_api.iter_feed_lines
+iter_file_chunks = fetch_from_txt_api.iter_file_chunks
+
+
+def test_stream_matches_full_parse():
+    """測試串流解析與整檔解析結果相同"""
+    print("=" * 60)
+    print("測試 1: 串流解析與整檔解析一致")
+    print("=" * 60)
+
+    raw = build_feed_bytes(5000)
+    scraper = TaoyuanAirportTxtAPIScraper()
+
+    expected = organize_by_date(scraper.parse_flight_data(raw.decode('big5')))
+
+    with tempfile.NamedTemporaryFile(suffix='.txt', delete=False) as f:
+        f.write(raw)
+        path = f.name
+    try:
+        stats = {}
+        streamed = organize_by_date(scraper.iter_flight_data(
+            iter_feed_lines(iter_file_chunks(path)), stats=stats))
+    finally:
+        os.unlink(path)
+
+    if streamed != expected:
+        print("❌ 串流解析結果與整檔解析不同")
+        return False
+    if stats.get('lines') != 5000 or stats.get('flights', 0) == 0:
+        print(f"❌ 統計資訊錯誤: {stats}")
+        return False
+
+    print("✅ 串流解析結果一致")
+    print(f"   - 讀取行數: {stats['lines']}")
+    print(f"   - 離境航班: {stats['flights']}")
+    return True
+
+
+def test_multibyte_chunk_boundaries():
+    """測試區塊在多位元組字元中間切開時仍能正確解碼"""
+    print("\n" + "=" * 60)
+    print("測試 2: 區塊邊界切開多位元組字元")
+    print("=" * 60)
+
+    raw = build_feed_bytes(200)
+    expected = raw.decode('big5').split('\r\n')[:-1]
+
+    # 7 位元組的區塊必定會切開 Big5 雙位元組字元
+    chunks = [raw[i:i + 7] for i in range(0, len(raw), 7)]
+    lines = [line.rstrip('\r') for line in iter_feed_lines(chunks, encoding='big5')]
+
+    if lines != expected:
+        print("❌ 區塊邊界解碼錯誤")
+        return False
+
+    print("✅ 區塊邊界解碼正確")
+    return True
+
+
+def test_detect_encoding():
+    """測試以位元組判斷編碼"""
+    print("\n" + "=" * 60)
+    print("測試 3: 位元組編碼判斷")
+    print("=" * 60)
+
+    cases = [
+        (build_feed_bytes(100, encoding='big5'), None, 'big5'),
+        (build_feed_bytes(100, encoding='utf-8'), None, 'utf-8'),
+        (b'\xef\xbb\xbf' + build_feed_bytes(100, encoding='utf-8'), None, 'utf-8-sig'),
+        (b'2,D,BR,EVA,178,D16\n', 'utf-8', 'utf-8'),
+        (b'2,D,BR,EVA,178,D16\n', None, 'big5'),
+        (build_feed_bytes(100, encoding='big5'), 'utf-8', 'big5'),
+    ]
+    for raw, preferred, expected in cases:
+        detected = detect_encoding(raw, preferred=preferred)
+        if detected != expected:
+            print(f"❌ 編碼判斷錯誤: {detected} (應該是 {expected}, preferred={preferred})")
+            return False
+
+    print("✅ 編碼判斷正確")
+    return True
+
+
+def test_decode_errors_reported():
+    """測試無法解碼的行會被回報，且亂碼航班會被標記"""
+    print("\n" + "=" * 60)
+    print("測試 4: 回報解碼失敗的行")
+    print("=" * 60)
+
+    lines = build_feed_bytes(50, target_ratio=1.0).split(b'\r\n')[:-1]
+    # 第 3 行的航空公司名稱換成不完整的 Big5 雙位元組
+    parts = lines[2].split(b',')
+    parts[3] = b'\xaa\x0b'
+    lines[2] = b','.join(parts)
+    raw = b'\r\n'.join(lines) + b'\r\n'
+
+    report = {}
+    stats = {}
+    scraper = TaoyuanAirportTxtAPIScraper()
+    flights = list(scraper.iter_flight_data(iter_feed_lines([raw], report=report), stats=stats))
+
+    if report.get('encoding') != 'big5':
+        print(f"❌ 編碼判斷錯誤: {report.get('encoding')}")
+        return False
+    if report.get('decode_errors') != [3]:
+        print(f"❌ 解碼失敗行號錯誤: {report.get('decode_errors')} (應該是 [3])")
+        return False
+    if stats.get('garbled') != [3]:
+        print(f"❌ 亂碼航班行號錯誤: {stats.get('garbled')} (應該是 [3])")
+        return False
+    if len(flights) != 50:
+        print(f"❌ 解析筆數錯誤: {len(flights)} (應該是 50)")
+        return False
+
+    print("✅ 解碼失敗的行已回報")
+    return True
+
+
+def test_records_are_compact():
+    """測試解析結果為 FlightRecord，且重複字串共用同一物件"""
+    print("\n" + "=" * 60)
+    print("測試 5: FlightRecord 與字串 intern")
+    print("=" * 60)
+
+    scraper = TaoyuanAirportTxtAPIScraper()
+    records = scraper.parse_flight_data(build_feed_bytes(2000, target_ratio=0.5).decode('big5'))
+
+    if not records or not all(isinstance(r, FlightRecord) for r in records):
+        print("❌ 解析結果不是 FlightRecord")
+        return False
+
+    by_name = {}
+    for record in records:
+        first = by_name.setdefault(record.airline_name, record.airline_name)
+        if first is not record.airline_name:
+            print(f"❌ 航空公司名稱未 intern: {record.airline_name}")
+            return False
+
+    sample = records[0]
+    if sample.scheduled_datetime.isoformat() != sample.datetime_iso:
+        print(f"❌ 日期時間不一致: {sample.scheduled_datetime.isoformat()} != {sample.datetime_iso}")
+        return False
+
+    print("✅ FlightRecord 正確")
+    print(f"   - 筆數: {len(records)}")
+    print(f"   - 不同航空公司名稱: {len(by_name)}")
+    return True
+
+
+def test_prefilter_keeps_only_target_departures():
+    """測試預先篩選：欄位前後有空白仍能辨識，抵達航班與其他登機門被排除"""
+    print("\n" + "=" * 60)
+    print("測試 6: 預先篩選類型與登機門")
+    print("=" * 60)
+
+    row = '2,{type},BR,長榮航空,178,{gate},2026/02/01,08:30:00,2026/02/01,08:30:00,NRT,Tokyo,東京,出發 DEPARTED,A321'
+    lines = [
+        row.format(type='D', gate='D11'),
+        row.format(type=' D ', gate=' D12R '),
+        row.format(type='A', gate='D11'),
+        row.format(type='D', gate='D1'),
+        row.format(type='D', gate='C11'),
+        '2,D,BR,長榮航空,178,D11',
+    ]
+    scraper = TaoyuanAirportTxtAPIScraper()
+    gates = [record.gate for record in scraper.iter_flight_data(lines)]
+
+    if gates != ['D11', 'D12R']:
+        print(f"❌ 篩選結果錯誤: {gates} (應該是 ['D11', 'D12R'])")
+        return False
+
+    print("✅ 預先篩選正確")
+    return True
+
+
+def main():
+    """執行所有測試"""
+    print("\n🧪 開始測試文字檔解析邏輯\n")
+
+    tests = [
+        test_stream_matches_full_parse,
+        test_multibyte_chunk_boundaries,
+        test_detect_encoding,
+        test_decode_errors_reported,
+        test_records_are_compact,
+        test_prefilter_keeps_only_target_departures
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ 測試執行失敗: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("測試結果")
+    print("=" * 60)
+    print(f"✅ 通過: {passed}")
+    print(f"❌ 失敗: {failed}")
+    print(f"📊 總計: {passed + failed}")
+
+    if failed == 0:
+        print("\n🎉 所有測試通過！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {failed} 個測試失敗")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())